@@ -2,12 +2,25 @@ import hashlib
 import json
 import os
 import struct
+import threading
 import zlib
-from pathlib import Path
+from collections import OrderedDict
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
 from typing import Any
 
+from ...craftgear_common.file_hashing import HashProgress, legacy_model_hash, sha256_file
+from ...craftgear_common.hash_store import HashStore, default_hash_store_path, get_hash_store
+
+from .hash_worker import ModelHashWorker
+from .prompt_graph import PromptGraph, is_link
+from .sidecar_hashes import read_sidecar_sha256
+
 PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
 TEXT_CHUNK_TYPES = {b'tEXt', b'iTXt', b'zTXt'}
+MODEL_HASH_MODES = ('autov2', 'legacy', 'both')
+_CHECKPOINT_LOADERS = frozenset({'CheckpointLoaderSimple', 'CheckpointLoader'})
+_LATENT_SOURCES = frozenset({'EmptyLatentImage'})
+_VOLATILE_KSAMPLER_INPUTS = frozenset({'seed', 'steps', 'cfg', 'sampler_name', 'scheduler', 'denoise'})
 
 SAMPLER_NAME_MAP = {
     'euler': 'Euler',
@@ -31,7 +44,21 @@ SAMPLER_NAME_MAP = {
 }
 
 _HASH_CACHE: dict[str, tuple[int, int, str]] = {}
-_HASH_CACHE_LOADED = False
+_HASH_IDENTITY_CACHE: dict[tuple[int, int, int, int], str] = {}
+# ディスクを取り合いすぎないよう同時に読むファイル数を抑える
+_MAX_HASH_WORKERS = min(4, os.cpu_count() or 1)
+# ノードとバックグラウンドのワーカーが同じファイルを同時に読まないよう、計算中のパスを共有する
+_HASHING_PATHS: set[str] = set()
+_HASHING_CONDITION = threading.Condition()
+_HASHING_WAIT_SECONDS = 0.5
+_PromptFragments = tuple[str, str, str, int | None, int | None, str, str, list[tuple[str, str]]]
+_FRAGMENT_CACHE: OrderedDict[str, _PromptFragments] = OrderedDict()
+_FRAGMENT_CACHE_LOCK = threading.Lock()
+_FRAGMENT_CACHE_SIZE = 32
+
+
+class _HashingCancelled(Exception):
+    pass
 
 
 def read_png_text(png_bytes: bytes) -> dict[str, str]:
@@ -78,6 +105,25 @@ def set_png_text_value(png_bytes: bytes, key: str, value: str) -> bytes:
     return bytes(output)
 
 
+def set_webp_exif(webp_bytes: bytes, exif: bytes) -> bytes:
+    if len(webp_bytes) < 12 or webp_bytes[:4] != b'RIFF' or webp_bytes[8:12] != b'WEBP':
+        return webp_bytes
+    # Pillow と同じく EXIF チャンクには "Exif\0\0" を付けずに格納する
+    payload = exif[6:] if exif.startswith(b'Exif\x00\x00') else exif
+    output = bytearray(b'WEBP')
+    replaced = False
+    for fourcc, data in _iter_riff_chunks(webp_bytes):
+        if fourcc == b'EXIF' and not replaced:
+            data = payload
+            replaced = True
+        output.extend(fourcc + struct.pack('<I', len(data)) + data)
+        if len(data) % 2:
+            output.extend(b'\x00')
+    if not replaced:
+        return webp_bytes
+    return b'RIFF' + struct.pack('<I', len(output)) + bytes(output)
+
+
 def build_a1111_parameters_from_png(png_bytes: bytes) -> str:
     text_map = read_png_text(png_bytes)
     prompt_text = None
@@ -94,21 +140,21 @@ def build_a1111_parameters_from_png(png_bytes: bytes) -> str:
     return build_a1111_parameters_from_prompt(prompt)
 
 
-def build_a1111_parameters_from_prompt(prompt: dict[str, Any]) -> str:
+def build_a1111_parameters_from_prompt(
+    prompt: dict[str, Any],
+    pending_hashes: list[str] | None = None,
+    model_hash: str = 'autov2',
+) -> str:
     if not isinstance(prompt, dict):
         return ''
-    ksampler = _find_node_by_class(prompt, 'KSampler')
-    if not ksampler:
+    model_hash = normalize_model_hash_mode(model_hash)
+    fragments = _get_prompt_fragments(prompt)
+    if fragments is None:
         return ''
-    inputs = ksampler.get('inputs', {})
-    cache: dict[str, str] = {}
-    positive = _resolve_string(inputs.get('positive'), prompt, cache).strip()
-    negative = _resolve_string(inputs.get('negative'), prompt, cache).strip()
-    lora_tags = _collect_lora_tags(prompt, inputs)
-    if lora_tags:
-        positive = _append_lora_tags(positive, lora_tags)
-    width, height = _resolve_latent_size(inputs.get('latent_image'), prompt)
-    model = _resolve_model_name(inputs.get('model'), prompt)
+    ksampler_id, positive, negative, width, height, model, model_path, hash_entries = fragments
+    # 実行ごとに変わる値は、キャッシュではなく今回のプロンプトから読む
+    ksampler = prompt.get(ksampler_id)
+    inputs = ksampler.get('inputs', {}) if isinstance(ksampler, dict) else {}
     sampler_name = _map_sampler_name(inputs.get('sampler_name'))
     scheduler = inputs.get('scheduler')
     steps = inputs.get('steps')
@@ -134,6 +180,10 @@ def build_a1111_parameters_from_prompt(prompt: dict[str, Any]) -> str:
     if width and height:
         params.append(f'Size: {width}x{height}')
     if model:
+        if model_hash != 'autov2':
+            legacy_hash = _build_legacy_model_hash(model_path)
+            if legacy_hash:
+                params.append(f'Model hash: {legacy_hash}')
         params.append(f'Model: {model}')
     if scheduler:
         params.append(f'Scheduler: {scheduler}')
@@ -144,7 +194,8 @@ def build_a1111_parameters_from_prompt(prompt: dict[str, Any]) -> str:
             denoise_value = None
         if denoise_value is not None and denoise_value < 1.0:
             params.append(f'Denoising strength: {_format_number(denoise_value)}')
-    hashes_text = _build_hashes_text(prompt, inputs)
+    # legacy では全体を読む AutoV2 の計算を丸ごと省く
+    hashes_text = '' if model_hash == 'legacy' else _build_hashes_text(hash_entries, pending_hashes)
     if hashes_text:
         params.append(f'Hashes: {hashes_text}')
     if params:
@@ -152,6 +203,65 @@ def build_a1111_parameters_from_prompt(prompt: dict[str, Any]) -> str:
     return '\n'.join(lines)
 
 
+def _get_prompt_fragments(prompt: dict[str, Any]) -> _PromptFragments | None:
+    key = _prompt_fragment_key(prompt)
+    if key:
+        with _FRAGMENT_CACHE_LOCK:
+            fragments = _FRAGMENT_CACHE.get(key)
+            if fragments is not None:
+                _FRAGMENT_CACHE.move_to_end(key)
+                return fragments
+    fragments = _build_prompt_fragments(prompt)
+    if fragments is None or not key:
+        return fragments
+    with _FRAGMENT_CACHE_LOCK:
+        _FRAGMENT_CACHE[key] = fragments
+        while len(_FRAGMENT_CACHE) > _FRAGMENT_CACHE_SIZE:
+            _FRAGMENT_CACHE.popitem(last=False)
+    return fragments
+
+
+def _prompt_fragment_key(prompt: dict[str, Any]) -> str:
+    canonical: dict[str, Any] = {}
+    for node_id, node in prompt.items():
+        if isinstance(node, dict) and node.get('class_type') == 'KSampler':
+            inputs = node.get('inputs', {})
+            if isinstance(inputs, dict):
+                # シードなど実行ごとに変わる入力を除き、キューを重ねても同じキーになるようにする
+                inputs = {name: value for name, value in inputs.items() if name not in _VOLATILE_KSAMPLER_INPUTS}
+                node = {**node, 'inputs': inputs}
+        canonical[str(node_id)] = node
+    try:
+        text = json.dumps(canonical, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    except (TypeError, ValueError):
+        return ''
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _build_prompt_fragments(prompt: dict[str, Any]) -> _PromptFragments | None:
+    # 各項目の抽出はすべて同じ索引を使い、プロンプト全体の走査は 1 回だけにする
+    graph = PromptGraph(prompt)
+    ksampler_id = graph.first_of_class('KSampler')
+    if not ksampler_id:
+        return None
+    inputs = graph.inputs(ksampler_id)
+    cache: dict[str, str] = {}
+    positive = _resolve_string(inputs.get('positive'), graph, cache).strip()
+    negative = _resolve_string(inputs.get('negative'), graph, cache).strip()
+    lora_tags = _collect_lora_tags(graph, inputs)
+    if lora_tags:
+        positive = _append_lora_tags(positive, lora_tags)
+    width, height = _resolve_latent_size(inputs.get('latent_image'), graph)
+    model = _resolve_model_name(inputs.get('model'), graph)
+    # ハッシュ値そのものはファイルの更新を反映できるよう、パスだけを保持して毎回引く
+    model_path = _resolve_checkpoint_path(inputs.get('model'), graph)
+    hash_entries: list[tuple[str, str]] = []
+    if model_path:
+        hash_entries.append(('model', model_path))
+    hash_entries.extend(_collect_lora_paths(graph, inputs))
+    return ksampler_id, positive, negative, width, height, model, model_path, hash_entries
+
+
 def _iter_png_chunks(png_bytes: bytes) -> list[tuple[bytes, bytes, bytes]]:
     chunks = []
     offset = len(PNG_SIGNATURE)
@@ -254,16 +364,25 @@ def _build_chunk(chunk_type: bytes, data: bytes) -> bytes:
     return length + chunk_type + data + crc_bytes
 
 
-def _find_node_by_class(prompt: dict[str, Any], class_type: str) -> dict[str, Any] | None:
-    for node in prompt.values():
-        if isinstance(node, dict) and node.get('class_type') == class_type:
-            return node
-    return None
+def _iter_riff_chunks(webp_bytes: bytes) -> list[tuple[bytes, bytes]]:
+    chunks = []
+    offset = 12
+    end = min(len(webp_bytes), 8 + struct.unpack('<I', webp_bytes[4:8])[0])
+    while offset + 8 <= end:
+        fourcc = webp_bytes[offset : offset + 4]
+        data_length = struct.unpack('<I', webp_bytes[offset + 4 : offset + 8])[0]
+        data_start = offset + 8
+        data_end = data_start + data_length
+        if data_end > end:
+            break
+        chunks.append((fourcc, webp_bytes[data_start:data_end]))
+        offset = data_end + (data_length % 2)
+    return chunks
 
 
-def _resolve_string(value: Any, prompt: dict[str, Any], cache: dict[str, str]) -> str:
-    if _is_link(value):
-        return _resolve_node_output(str(value[0]), prompt, cache)
+def _resolve_string(value: Any, graph: PromptGraph, cache: dict[str, str]) -> str:
+    if is_link(value):
+        return _resolve_node_output(str(value[0]), graph, cache)
     if value is None:
         return ''
     if isinstance(value, (int, float, bool)):
@@ -271,82 +390,71 @@ def _resolve_string(value: Any, prompt: dict[str, Any], cache: dict[str, str]) -
     return str(value)
 
 
-def _resolve_node_output(node_id: str, prompt: dict[str, Any], cache: dict[str, str]) -> str:
+def _resolve_node_output(node_id: str, graph: PromptGraph, cache: dict[str, str]) -> str:
     if node_id in cache:
         return cache[node_id]
-    node = prompt.get(node_id)
-    if not isinstance(node, dict):
-        cache[node_id] = ''
+    # 長いテキストの連鎖でも再帰が深くならないよう、上流のノードから順に解決しておく
+    for upstream_id in graph.postorder(node_id):
+        if upstream_id in cache:
+            continue
+        # 循環したリンクは空文字として扱う
+        cache[upstream_id] = ''
+        cache[upstream_id] = _resolve_single_node_output(upstream_id, graph, cache)
+    return cache.setdefault(node_id, '')
+
+
+def _resolve_single_node_output(node_id: str, graph: PromptGraph, cache: dict[str, str]) -> str:
+    node = graph.node(node_id)
+    if node is None:
         return ''
     class_type = node.get('class_type', '')
-    inputs = node.get('inputs', {})
+    inputs = graph.inputs(node_id)
     result = ''
     if class_type in {'CLIPTextEncode', 'CLIPTextEncodeSDXL', 'CLIPTextEncodeSDXLRefiner'}:
-        result = _resolve_string(inputs.get('text'), prompt, cache)
+        result = _resolve_string(inputs.get('text'), graph, cache)
     elif class_type == 'CommentableMultilineTextNode':
-        text = _resolve_string(inputs.get('text'), prompt, cache)
-        separator = _resolve_string(inputs.get('separator', ','), prompt, cache)
+        text = _resolve_string(inputs.get('text'), graph, cache)
+        separator = _resolve_string(inputs.get('separator', ','), graph, cache)
         result = _apply_commentable_text(text, separator)
     elif class_type == 'JoinTextNode':
-        separator = _resolve_string(inputs.get('separator', ','), prompt, cache)
-        result = _apply_join_text(inputs, separator, prompt, cache)
+        separator = _resolve_string(inputs.get('separator', ','), graph, cache)
+        result = _apply_join_text(inputs, separator, graph, cache)
     elif class_type == 'TagToggleTextNode':
-        text = _resolve_string(inputs.get('text'), prompt, cache)
-        excluded = _resolve_string(inputs.get('excluded_tags', '[]'), prompt, cache)
+        text = _resolve_string(inputs.get('text'), graph, cache)
+        excluded = _resolve_string(inputs.get('excluded_tags', '[]'), graph, cache)
         result = _apply_tag_toggle(text, excluded)
     elif class_type == 'LoadLorasWithTags':
-        tags = _resolve_string(inputs.get('tags', ''), prompt, cache)
+        tags = _resolve_string(inputs.get('tags', ''), graph, cache)
         result = _apply_load_loras_with_tags(inputs, tags)
     elif isinstance(inputs.get('text'), str):
-        result = _resolve_string(inputs.get('text'), prompt, cache)
-    cache[node_id] = result
+        result = _resolve_string(inputs.get('text'), graph, cache)
     return result
 
 
-def _is_link(value: Any) -> bool:
-    if isinstance(value, (list, tuple)) and len(value) >= 2:
-        return isinstance(value[0], (str, int))
-    return False
-
-
-def _collect_lora_tags(prompt: dict[str, Any], ksampler_inputs: dict[str, Any]) -> list[str]:
+def _collect_lora_tags(graph: PromptGraph, ksampler_inputs: dict[str, Any]) -> list[str]:
     entries: list[tuple[str, float]] = []
-    visited: set[str] = set()
     model_link = ksampler_inputs.get('model')
-    if _is_link(model_link):
-        entries.extend(_collect_lora_entries(str(model_link[0]), prompt, visited))
+    if is_link(model_link):
+        for node_id in graph.upstream(str(model_link[0])):
+            entries.extend(_lora_entries_from_node(graph.node(node_id) or {}))
     if not entries:
         return []
     deduped = _dedupe_lora_entries(entries)
     return [f'<lora:{name}:{_format_number(weight)}>' for name, weight in deduped]
 
 
-def _collect_lora_entries(
-    node_id: str, prompt: dict[str, Any], visited: set[str]
-) -> list[tuple[str, float]]:
-    if node_id in visited:
-        return []
-    visited.add(node_id)
-    node = prompt.get(node_id)
-    if not isinstance(node, dict):
-        return []
+def _lora_entries_from_node(node: dict[str, Any]) -> list[tuple[str, float]]:
     class_type = node.get('class_type', '')
     inputs = node.get('inputs', {})
-    entries: list[tuple[str, float]] = []
     if class_type == 'LoadLorasWithTags':
-        entries.extend(_extract_loras_from_load_loras_with_tags(inputs))
-    elif class_type == 'LoraLoader':
+        return _extract_loras_from_load_loras_with_tags(inputs)
+    if class_type == 'LoraLoader':
         entry = _extract_lora_from_loader(inputs)
-        if entry:
-            entries.append(entry)
-    elif class_type == 'LoraLoaderModelOnly':
+        return [entry] if entry else []
+    if class_type == 'LoraLoaderModelOnly':
         entry = _extract_lora_from_loader_model_only(inputs)
-        if entry:
-            entries.append(entry)
-    for value in inputs.values():
-        if _is_link(value):
-            entries.extend(_collect_lora_entries(str(value[0]), prompt, visited))
-    return entries
+        return [entry] if entry else []
+    return []
 
 
 def _extract_loras_from_load_loras_with_tags(
@@ -467,64 +575,71 @@ def _append_lora_tags(positive: str, tags: list[str]) -> str:
     return f'{trimmed}, {tags_text}'
 
 
-def _build_hashes_text(prompt: dict[str, Any], ksampler_inputs: dict[str, Any]) -> str:
-    pairs: list[tuple[str, str]] = []
-    model_path = _resolve_checkpoint_path(ksampler_inputs.get('model'), prompt)
-    if model_path:
-        model_hash = _hash_file_short(model_path)
-        if model_hash:
-            pairs.append(('model', model_hash))
-    lora_pairs = _collect_lora_hashes(prompt, ksampler_inputs)
-    pairs.extend(lora_pairs)
+def normalize_model_hash_mode(value: Any) -> str:
+    text = str(value or '').strip().lower()
+    if text in MODEL_HASH_MODES:
+        return text
+    return 'autov2'
+
+
+def _build_legacy_model_hash(model_path: str) -> str:
+    if not model_path:
+        return ''
+    try:
+        return legacy_model_hash(model_path)
+    except OSError:
+        return ''
+
+
+def _build_hashes_text(
+    path_entries: list[tuple[str, str]],
+    pending_hashes: list[str] | None = None,
+) -> str:
+    if not path_entries:
+        return ''
+    paths = [path for _key, path in path_entries]
+    if pending_hashes is None:
+        # 未計算のファイルはまとめて並列に計算し、ノードの進捗バーと中断に対応させる
+        digests = hash_model_files(paths, interactive=True)
+    else:
+        # 待たずに保存するモードでは、未計算のファイルを呼び出し側へ返すだけにする
+        digests = hash_model_files(paths, cached_only=True)
+        pending_hashes.extend(path for path in dict.fromkeys(paths) if path not in digests)
+    pairs = [(key, digests[path]) for key, path in path_entries if digests.get(path)]
     if not pairs:
         return ''
-    hashes = {key: value for key, value in pairs}
+    hashes = {key: value for key, value in _dedupe_hash_entries(pairs)}
     return json.dumps(hashes)
 
 
-def _collect_lora_hashes(
-    prompt: dict[str, Any],
+def _collect_lora_paths(
+    graph: PromptGraph,
     ksampler_inputs: dict[str, Any],
 ) -> list[tuple[str, str]]:
     entries: list[tuple[str, str]] = []
-    visited: set[str] = set()
     model_link = ksampler_inputs.get('model')
-    if _is_link(model_link):
-        entries.extend(_collect_lora_hash_entries(str(model_link[0]), prompt, visited))
-    return _dedupe_hash_entries(entries)
+    if is_link(model_link):
+        # LoRA タグと同じ走査結果を使い回す
+        for node_id in graph.upstream(str(model_link[0])):
+            entries.extend(_lora_paths_from_node(graph.node(node_id) or {}))
+    return entries
 
 
-def _collect_lora_hash_entries(
-    node_id: str,
-    prompt: dict[str, Any],
-    visited: set[str],
-) -> list[tuple[str, str]]:
-    if node_id in visited:
-        return []
-    visited.add(node_id)
-    node = prompt.get(node_id)
-    if not isinstance(node, dict):
-        return []
+def _lora_paths_from_node(node: dict[str, Any]) -> list[tuple[str, str]]:
     class_type = node.get('class_type', '')
     inputs = node.get('inputs', {})
-    entries: list[tuple[str, str]] = []
     if class_type == 'LoadLorasWithTags':
-        entries.extend(_hashes_from_load_loras_with_tags(inputs))
-    elif class_type == 'LoraLoader':
-        entry = _hash_from_lora_loader(inputs)
-        if entry:
-            entries.append(entry)
-    elif class_type == 'LoraLoaderModelOnly':
-        entry = _hash_from_lora_loader_model_only(inputs)
-        if entry:
-            entries.append(entry)
-    for value in inputs.values():
-        if _is_link(value):
-            entries.extend(_collect_lora_hash_entries(str(value[0]), prompt, visited))
-    return entries
+        return _lora_paths_from_load_loras_with_tags(inputs)
+    if class_type == 'LoraLoader':
+        entry = _lora_path_from_lora_loader(inputs)
+        return [entry] if entry else []
+    if class_type == 'LoraLoaderModelOnly':
+        entry = _lora_path_from_lora_loader_model_only(inputs)
+        return [entry] if entry else []
+    return []
 
 
-def _hashes_from_load_loras_with_tags(
+def _lora_paths_from_load_loras_with_tags(
     inputs: dict[str, Any],
 ) -> list[tuple[str, str]]:
     output: list[tuple[str, str]] = []
@@ -541,14 +656,11 @@ def _hashes_from_load_loras_with_tags(
         weight = _to_float(inputs.get(f'lora_strength_{index}', 1.0))
         if weight is None or _is_zero(weight):
             continue
-        file_hash = _hash_file_short(path)
-        if not file_hash:
-            continue
-        output.append((f'lora:{name}', file_hash))
+        output.append((f'lora:{name}', path))
     return output
 
 
-def _hash_from_lora_loader(inputs: dict[str, Any]) -> tuple[str, str] | None:
+def _lora_path_from_lora_loader(inputs: dict[str, Any]) -> tuple[str, str] | None:
     raw_name = inputs.get('lora_name')
     path = _resolve_lora_path(raw_name)
     if not path:
@@ -561,13 +673,10 @@ def _hash_from_lora_loader(inputs: dict[str, Any]) -> tuple[str, str] | None:
     weight = _select_lora_weight(strength_model, strength_clip)
     if weight is None or _is_zero(weight):
         return None
-    file_hash = _hash_file_short(path)
-    if not file_hash:
-        return None
-    return (f'lora:{name}', file_hash)
+    return (f'lora:{name}', path)
 
 
-def _hash_from_lora_loader_model_only(inputs: dict[str, Any]) -> tuple[str, str] | None:
+def _lora_path_from_lora_loader_model_only(inputs: dict[str, Any]) -> tuple[str, str] | None:
     raw_name = inputs.get('lora_name')
     path = _resolve_lora_path(raw_name)
     if not path:
@@ -578,10 +687,7 @@ def _hash_from_lora_loader_model_only(inputs: dict[str, Any]) -> tuple[str, str]
     strength_model = _to_float(inputs.get('strength_model'))
     if strength_model is None or _is_zero(strength_model):
         return None
-    file_hash = _hash_file_short(path)
-    if not file_hash:
-        return None
-    return (f'lora:{name}', file_hash)
+    return (f'lora:{name}', path)
 
 
 def _dedupe_hash_entries(entries: list[tuple[str, str]]) -> list[tuple[str, str]]:
@@ -595,105 +701,283 @@ def _dedupe_hash_entries(entries: list[tuple[str, str]]) -> list[tuple[str, str]
     return output
 
 
-def _hash_file_short(path: str) -> str:
-    # ハッシュ計算コストを下げるため永続キャッシュを使う
-    _ensure_hash_cache_loaded()
+def hash_model_file(path: str, check_interrupt: Any = None) -> str:
+    return hash_model_files([path], check_interrupt=check_interrupt).get(path, '')
+
+
+def is_model_hash_cached(path: str) -> bool:
     try:
         stat = os.stat(path)
-    except Exception:
-        return ''
+    except OSError:
+        return False
+    if _read_cached_hash(path, stat):
+        return True
+    return bool(_read_stored_hash(_get_hash_store(), path, stat))
+
+
+def hash_model_files(
+    paths: list[str],
+    cached_only: bool = False,
+    interactive: bool = False,
+    check_interrupt: Any = None,
+) -> dict[str, str]:
+    digests: dict[str, str] = {}
+    missing: list[tuple[str, os.stat_result]] = []
+    entries: list[tuple[str, int, int, str, int, int]] = []
+    store: HashStore | None = None
+    for path in dict.fromkeys(paths):
+        try:
+            stat = os.stat(path)
+        except Exception:
+            continue
+        digest = _read_cached_hash(path, stat)
+        if digest:
+            if _HASH_CACHE.get(path) != (stat.st_mtime_ns, stat.st_size, digest):
+                # 名前変更やハードリンクで見つかった場合は、新しいパスでも引けるよう保存しておく
+                entries.append(_stored_hash_entry(path, stat, digest))
+            _remember_hash(path, stat, digest)
+            digests[path] = digest
+            continue
+        if store is None:
+            store = _get_hash_store()
+        digest = _read_stored_hash(store, path, stat)
+        if digest:
+            _remember_hash(path, stat, digest)
+            digests[path] = digest
+            continue
+        missing.append((path, stat))
+    if missing:
+        missing = _apply_sidecar_hashes(missing, digests, entries)
+    if not missing or cached_only:
+        _write_stored_hashes(store, entries)
+        return digests
+    computed = _hash_files_uncached(
+        [path for path, _stat in missing],
+        sum(stat.st_size for _path, stat in missing),
+        interactive,
+        check_interrupt,
+    )
+    for (path, stat), digest in zip(missing, computed):
+        if not digest:
+            continue
+        _remember_hash(path, stat, digest)
+        digests[path] = digest
+        entries.append(_stored_hash_entry(path, stat, digest))
+    # ファイルごとではなく最後に 1 回のトランザクションで保存する
+    _write_stored_hashes(store, entries)
+    return digests
+
+
+def _apply_sidecar_hashes(
+    missing: list[tuple[str, os.stat_result]],
+    digests: dict[str, str],
+    entries: list[tuple[str, int, int, str, int, int]],
+) -> list[tuple[str, os.stat_result]]:
+    remaining: list[tuple[str, os.stat_result]] = []
+    for path, stat in missing:
+        # 全体を読む前に、ダウンロード時に付いてきたハッシュを探す
+        digest = read_sidecar_sha256(path, stat.st_mtime_ns, stat.st_size)[:10]
+        if not digest:
+            remaining.append((path, stat))
+            continue
+        _remember_hash(path, stat, digest)
+        digests[path] = digest
+        entries.append(_stored_hash_entry(path, stat, digest))
+    return remaining
+
+
+def _file_identity(stat: os.stat_result) -> tuple[int, int, int, int] | None:
+    # inode を持たないファイルシステムでは 0 が返るので、その場合はパスだけで引く
+    if not stat.st_ino:
+        return None
+    return (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+def _read_cached_hash(path: str, stat: os.stat_result) -> str:
     cached = _HASH_CACHE.get(path)
     if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
         return cached[2]
-    digest = _hash_file_uncached(path)
-    if digest:
-        _HASH_CACHE[path] = (stat.st_mtime_ns, stat.st_size, digest)
-        _save_hash_cache()
-    return digest
+    identity = _file_identity(stat)
+    if identity is None:
+        return ''
+    return _HASH_IDENTITY_CACHE.get(identity, '')
 
 
-def _hash_file_uncached(path: str) -> str:
+def _remember_hash(path: str, stat: os.stat_result, digest: str) -> None:
+    _HASH_CACHE[path] = (stat.st_mtime_ns, stat.st_size, digest)
+    identity = _file_identity(stat)
+    if identity is not None:
+        _HASH_IDENTITY_CACHE[identity] = digest
+
+
+def _stored_hash_entry(path: str, stat: os.stat_result, digest: str) -> tuple[str, int, int, str, int, int]:
+    return (path, stat.st_mtime_ns, stat.st_size, digest, stat.st_dev, stat.st_ino)
+
+
+def _hash_file_short(path: str) -> str:
+    # ハッシュ計算コストを下げるため永続キャッシュを使う
+    return hash_model_files([path]).get(path, '')
+
+
+def _hash_files_uncached(
+    paths: list[str],
+    total_bytes: int = 0,
+    interactive: bool = False,
+    check_interrupt: Any = None,
+) -> list[str]:
+    on_progress = None
+    if interactive:
+        progress = _create_progress(total_bytes)
+        on_progress = progress.add if progress else None
+        check_interrupt = _interrupt_checker()
+    if len(paths) <= 1:
+        return [_hash_file_uncached(path, on_progress, check_interrupt) for path in paths]
+    # hashlib は大きな update で GIL を手放すので、スレッドでも複数ファイルを同時に読める
+    workers = min(len(paths), _MAX_HASH_WORKERS)
+    cancelled = threading.Event()
+    check = _shared_interrupt_checker(check_interrupt, cancelled)
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='craftgear-hash')
     try:
-        hasher = hashlib.sha256()
-        with open(path, 'rb') as file:
-            for chunk in iter(lambda: file.read(1024 * 1024), b''):
-                hasher.update(chunk)
-        return hasher.hexdigest()[:10]
-    except Exception:
-        return ''
+        futures = [executor.submit(_hash_file_uncached, path, on_progress, check) for path in paths]
+        done, _pending = wait(futures, return_when=FIRST_EXCEPTION)
+        if all(future.exception() is None for future in done):
+            return [future.result() for future in futures]
+        # 中断や失敗のときは、計算中のファイルも次のチャンクで止め、まだ始まっていないファイルは取り消す
+        cancelled.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+        errors = [
+            future.exception()
+            for future in futures
+            if not future.cancelled() and future.exception() is not None
+        ]
+        # 巻き添えで止めたスレッドの例外ではなく、最初の原因を呼び出し元へ返す
+        raise next((error for error in errors if not isinstance(error, _HashingCancelled)), errors[0])
+    finally:
+        cancelled.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _shared_interrupt_checker(check_interrupt: Any, cancelled: threading.Event) -> Any:
+    def check() -> None:
+        if cancelled.is_set():
+            raise _HashingCancelled()
+        if check_interrupt is None:
+            return
+        try:
+            check_interrupt()
+        except BaseException:
+            # ComfyUI は中断を 1 回投げるとフラグを戻すので、他のスレッドにはこちらで伝える
+            cancelled.set()
+            raise
 
+    return check
 
-def _ensure_hash_cache_loaded() -> None:
-    global _HASH_CACHE_LOADED
-    if _HASH_CACHE_LOADED:
-        return
-    _HASH_CACHE_LOADED = True
-    cache_path = _hash_cache_path()
-    if not cache_path or not os.path.isfile(cache_path):
-        return
+
+def _hash_file_uncached(
+    path: str,
+    on_progress: Any = None,
+    check_interrupt: Any = None,
+) -> str:
+    _claim_hashing_path(path, check_interrupt)
     try:
-        with open(cache_path, 'r', encoding='utf-8') as file:
-            payload = json.load(file)
-    except Exception:
-        return
-    entries = payload.get('entries') if isinstance(payload, dict) else None
-    if not isinstance(entries, dict):
-        return
-    for key, value in entries.items():
-        if not isinstance(key, str) or not isinstance(value, dict):
-            continue
-        mtime_ns = value.get('mtime_ns')
-        size = value.get('size')
-        digest = value.get('hash')
-        if not isinstance(mtime_ns, int) or not isinstance(size, int):
-            continue
-        if not isinstance(digest, str) or digest == '':
-            continue
-        _HASH_CACHE[key] = (mtime_ns, size, digest)
+        stat = os.stat(path)
+        # 待っている間にもう一方が計算し終えていれば、読み直さずにその値を使う
+        digest = _read_cached_hash(path, stat)
+        if digest:
+            if on_progress is not None:
+                on_progress(stat.st_size)
+            return digest
+        digest = sha256_file(path, on_progress, check_interrupt)[:10]
+        _remember_hash(path, stat, digest)
+        return digest
+    except OSError:
+        return ''
+    finally:
+        _release_hashing_path(path)
 
 
-def _save_hash_cache() -> None:
-    cache_path = _hash_cache_path()
-    if not cache_path:
-        return
-    entries = {
-        path: {'mtime_ns': mtime_ns, 'size': size, 'hash': digest}
-        for path, (mtime_ns, size, digest) in _HASH_CACHE.items()
-    }
-    payload = {'version': 1, 'entries': entries}
-    tmp_path = f'{cache_path}.tmp'
+def _claim_hashing_path(path: str, check_interrupt: Any = None) -> None:
+    with _HASHING_CONDITION:
+        while path in _HASHING_PATHS:
+            # 待っている間も中断や一時停止の要求には応える
+            if check_interrupt is not None:
+                check_interrupt()
+            _HASHING_CONDITION.wait(_HASHING_WAIT_SECONDS)
+        _HASHING_PATHS.add(path)
+
+
+def _release_hashing_path(path: str) -> None:
+    with _HASHING_CONDITION:
+        _HASHING_PATHS.discard(path)
+        _HASHING_CONDITION.notify_all()
+
+
+def _create_progress(total_bytes: int) -> HashProgress | None:
     try:
-        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
-        with open(tmp_path, 'w', encoding='utf-8') as file:
-            json.dump(payload, file)
-        os.replace(tmp_path, cache_path)
+        import comfy.utils
+
+        # 実行中のノードに結び付けるため、進捗バーは呼び出し元のスレッドで作る
+        progress_bar = comfy.utils.ProgressBar(100)
     except Exception:
+        return None
+
+    def report(done: int, total: int) -> None:
         try:
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
+            progress_bar.update_absolute(done * 100 // total)
         except Exception:
             pass
 
+    return HashProgress(total_bytes, report)
 
-def _hash_cache_path() -> str:
-    root = _custom_nodes_root()
-    if not root:
-        return ''
-    return os.path.join(root, 'craftgear_hash_cache.json')
+
+def _interrupt_checker() -> Any:
+    try:
+        import comfy.model_management
+
+        # 中断ボタンで InterruptProcessingException が投げられ、巨大なモデルの計算も途中で止まる
+        return comfy.model_management.throw_exception_if_processing_interrupted
+    except Exception:
+        return None
 
 
-def _custom_nodes_root() -> str:
+def _get_hash_store() -> HashStore | None:
+    return get_hash_store(_hash_cache_path())
+
+
+def _read_stored_hash(store: HashStore | None, path: str, stat: os.stat_result) -> str:
+    if store is None:
+        return ''
     try:
-        return str(Path(__file__).resolve().parents[2])
+        digest = store.get(path, stat.st_mtime_ns, stat.st_size)
+        if digest or not stat.st_ino:
+            return digest or ''
+        # パスで見つからなければ、移動や名前変更の前に計算した同じ実体を探す
+        digest = store.get_by_identity(stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if digest:
+            store.put(path, stat.st_mtime_ns, stat.st_size, digest, identity=(stat.st_dev, stat.st_ino))
+        return digest or ''
     except Exception:
         return ''
 
 
-def _resolve_checkpoint_path(value: Any, prompt: dict[str, Any]) -> str:
-    if not _is_link(value):
+def _write_stored_hashes(store: HashStore | None, entries: list[tuple[str, int, int, str, int, int]]) -> None:
+    if store is None:
+        return
+    try:
+        store.put_many(entries)
+    except Exception:
+        pass
+
+
+def _hash_cache_path() -> str:
+    return default_hash_store_path()
+
+
+def _resolve_checkpoint_path(value: Any, graph: PromptGraph) -> str:
+    if not is_link(value):
         return ''
     node_id = str(value[0])
-    ckpt_name = _find_upstream_checkpoint(node_id, prompt, set())
+    ckpt_name = _find_upstream_checkpoint(node_id, graph)
     if not ckpt_name:
         return ''
     path = _resolve_model_file_path(str(ckpt_name), 'checkpoints')
@@ -748,14 +1032,14 @@ def _apply_commentable_text(text: str, separator: str) -> str:
 def _apply_join_text(
     inputs: dict[str, Any],
     separator: str,
-    prompt: dict[str, Any],
+    graph: PromptGraph,
     cache: dict[str, str],
 ) -> str:
     parts: list[str] = []
     for key in sorted(inputs.keys(), key=_text_key_index):
         if not key.startswith('text_'):
             continue
-        value = _resolve_string(inputs.get(key), prompt, cache)
+        value = _resolve_string(inputs.get(key), graph, cache)
         if value is None:
             continue
         for line in str(value).splitlines():
@@ -866,11 +1150,11 @@ def _dedupe_tags(values: list[str]) -> list[str]:
     return output
 
 
-def _resolve_model_name(value: Any, prompt: dict[str, Any]) -> str:
-    if not _is_link(value):
+def _resolve_model_name(value: Any, graph: PromptGraph) -> str:
+    if not is_link(value):
         return ''
     node_id = str(value[0])
-    ckpt_name = _find_upstream_checkpoint(node_id, prompt, set())
+    ckpt_name = _find_upstream_checkpoint(node_id, graph)
     if not ckpt_name:
         return ''
     base = os.path.basename(str(ckpt_name))
@@ -880,53 +1164,35 @@ def _resolve_model_name(value: Any, prompt: dict[str, Any]) -> str:
     return base
 
 
-def _find_upstream_checkpoint(
-    node_id: str, prompt: dict[str, Any], visited: set[str]
-) -> str:
-    if node_id in visited:
-        return ''
-    visited.add(node_id)
-    node = prompt.get(node_id)
-    if not isinstance(node, dict):
-        return ''
-    if node.get('class_type') in {'CheckpointLoaderSimple', 'CheckpointLoader'}:
-        inputs = node.get('inputs', {})
-        return str(inputs.get('ckpt_name', '') or inputs.get('model_name', ''))
-    inputs = node.get('inputs', {})
-    for value in inputs.values():
-        if _is_link(value):
-            result = _find_upstream_checkpoint(str(value[0]), prompt, visited)
-            if result:
-                return result
+def _find_upstream_checkpoint(node_id: str, graph: PromptGraph) -> str:
+    for upstream_id in graph.upstream(node_id, _CHECKPOINT_LOADERS):
+        node = graph.node(upstream_id) or {}
+        if node.get('class_type') not in _CHECKPOINT_LOADERS:
+            continue
+        inputs = graph.inputs(upstream_id)
+        name = str(inputs.get('ckpt_name', '') or inputs.get('model_name', ''))
+        if name:
+            return name
     return ''
 
 
-def _resolve_latent_size(value: Any, prompt: dict[str, Any]) -> tuple[int | None, int | None]:
-    if not _is_link(value):
+def _resolve_latent_size(value: Any, graph: PromptGraph) -> tuple[int | None, int | None]:
+    if not is_link(value):
         return None, None
     node_id = str(value[0])
-    return _find_latent_size(node_id, prompt, set())
+    return _find_latent_size(node_id, graph)
 
 
-def _find_latent_size(
-    node_id: str, prompt: dict[str, Any], visited: set[str]
-) -> tuple[int | None, int | None]:
-    if node_id in visited:
-        return None, None
-    visited.add(node_id)
-    node = prompt.get(node_id)
-    if not isinstance(node, dict):
-        return None, None
-    inputs = node.get('inputs', {})
-    if node.get('class_type') == 'EmptyLatentImage':
-        width = inputs.get('width')
-        height = inputs.get('height')
-        return _to_int(width), _to_int(height)
-    for value in inputs.values():
-        if _is_link(value):
-            width, height = _find_latent_size(str(value[0]), prompt, visited)
-            if width and height:
-                return width, height
+def _find_latent_size(node_id: str, graph: PromptGraph) -> tuple[int | None, int | None]:
+    for upstream_id in graph.upstream(node_id, _LATENT_SOURCES):
+        node = graph.node(upstream_id) or {}
+        if node.get('class_type') not in _LATENT_SOURCES:
+            continue
+        inputs = graph.inputs(upstream_id)
+        width = _to_int(inputs.get('width'))
+        height = _to_int(inputs.get('height'))
+        if width and height:
+            return width, height
     return None, None
 
 
@@ -969,3 +1235,10 @@ def _format_number(value: Any) -> str:
         text = f'{value:.6f}'.rstrip('0').rstrip('.')
         return text or '0'
     return str(value)
+
+
+_HASH_WORKER = ModelHashWorker(hash_model_file, is_model_hash_cached)
+
+
+def get_model_hash_worker() -> ModelHashWorker:
+    return _HASH_WORKER
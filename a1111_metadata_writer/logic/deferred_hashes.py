@@ -0,0 +1,126 @@
+import os
+import shutil
+import tempfile
+import threading
+from typing import Any, Callable
+
+from .a1111_metadata import set_png_text_value, set_webp_exif
+from .hash_worker import PRIORITY_REQUESTED, ModelHashWorker
+
+DeferredHashJob = tuple[str, str, dict[str, Any], tuple[str, ...], tuple[int, int], str]
+
+
+class DeferredHashPatcher:
+    def __init__(
+        self,
+        worker: ModelHashWorker,
+        build_parameters: Callable[..., str],
+        build_webp_exif: Callable[[str], bytes],
+    ) -> None:
+        self._worker = worker
+        self._build_parameters = build_parameters
+        self._build_webp_exif = build_webp_exif
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    def submit(
+        self,
+        image_path: str,
+        output_format: str,
+        prompt: dict[str, Any],
+        model_paths: list[str],
+        model_hash: str = 'autov2',
+    ) -> bool:
+        if not model_paths:
+            return False
+        try:
+            stat = os.stat(image_path)
+        except OSError:
+            return False
+        # 保存直後の更新時刻とサイズを覚えておき、後から別の内容に変わっていないか確かめる
+        job = (
+            image_path,
+            output_format,
+            prompt,
+            tuple(model_paths),
+            (stat.st_mtime_ns, stat.st_size),
+            model_hash,
+        )
+        with self._lock:
+            self._pending += 1
+        # 計算はバックグラウンドのワーカーに任せ、プロンプト実行中は止まったまま待つ
+        self._worker.enqueue(model_paths, PRIORITY_REQUESTED, on_complete=lambda: self._complete(job))
+        return True
+
+    def pending(self) -> int:
+        with self._lock:
+            return self._pending
+
+    def run_job(self, job: DeferredHashJob) -> bool:
+        image_path, output_format, prompt, model_paths, saved_stat, model_hash = job
+        missing: list[str] = []
+        try:
+            # ワーカーが計算し終えた値をキャッシュから読むだけにし、ここでは読み込みを始めない
+            parameters = self._build_parameters(prompt, missing, model_hash=model_hash)
+        except Exception:
+            return False
+        if not parameters:
+            return False
+        if output_format == 'webp':
+            metadata = self._build_webp_exif(parameters)
+        else:
+            metadata = parameters
+        return patch_image_metadata(image_path, output_format, metadata, saved_stat)
+
+    def _complete(self, job: DeferredHashJob) -> None:
+        try:
+            self.run_job(job)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+
+def patch_image_metadata(
+    image_path: str,
+    output_format: str,
+    metadata: str | bytes,
+    saved_stat: tuple[int, int],
+) -> bool:
+    try:
+        stat = os.stat(image_path)
+        # 保存後に上書きや編集をされたファイルは書き換えない
+        if (stat.st_mtime_ns, stat.st_size) != saved_stat:
+            return False
+        with open(image_path, 'rb') as file:
+            original = file.read()
+    except OSError:
+        return False
+    if output_format == 'webp' and isinstance(metadata, bytes):
+        patched = set_webp_exif(original, metadata)
+    elif isinstance(metadata, str):
+        patched = set_png_text_value(original, 'parameters', metadata)
+    else:
+        return False
+    if patched == original:
+        return False
+    # 画素データはそのまま、メタデータのチャンクだけを差し替えたバイト列を書き戻す
+    return _replace_file(image_path, patched)
+
+
+def _replace_file(path: str, data: bytes) -> bool:
+    directory = os.path.dirname(path) or '.'
+    temp_path = ''
+    try:
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as file:
+            file.write(data)
+        shutil.copymode(path, temp_path)
+        os.replace(temp_path, path)
+    except OSError:
+        if temp_path:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+        return False
+    return True
@@ -0,0 +1,266 @@
+import heapq
+import itertools
+import os
+import threading
+import time
+from typing import Any, Callable, Iterable
+
+PRIORITY_REQUESTED = 0
+PRIORITY_SCAN = 10
+_BUSY_POLL_SECONDS = 0.5
+
+
+class HashingPaused(Exception):
+    pass
+
+
+class ModelHashWorker:
+    def __init__(
+        self,
+        hash_file: Callable[[str, Callable[[], None]], str],
+        is_cached: Callable[[str], bool],
+        is_busy: Callable[[], bool] | None = None,
+        busy_poll: float = _BUSY_POLL_SECONDS,
+    ) -> None:
+        self.enabled = False
+        self.busy_poll = max(0.0, float(busy_poll))
+        self._hash_file = hash_file
+        self._is_cached = is_cached
+        self._is_busy = is_busy
+        self._lock = threading.Condition()
+        self._pending: list[tuple[int, int, int, str]] = []
+        self._priorities: dict[str, int] = {}
+        self._sizes: dict[str, int] = {}
+        self._sequence = itertools.count()
+        self._scan_provider: Callable[[], Iterable[str]] | None = None
+        self._scan_signature: Any = None
+        self._scanning = False
+        self._current = ''
+        self._hashed = 0
+        self._failed = 0
+        self._hashed_bytes = 0
+        self._last_scan = 0.0
+        # 完了を待つ呼び出し元 (後からの Hashes 書き込みなど) が必要としているパスと、その待ち合わせ
+        self._wanted: set[str] = set()
+        self._waiters: list[tuple[set[str], Callable[[], None]]] = []
+        self._thread: threading.Thread | None = None
+
+    def set_enabled(self, enabled: bool) -> None:
+        with self._lock:
+            self.enabled = bool(enabled)
+            if not self.enabled:
+                # 完了を待たれているパスは、バックグラウンド計算を切っても残す
+                self._pending = [entry for entry in self._pending if entry[3] in self._wanted]
+                heapq.heapify(self._pending)
+                self._priorities = {path: value for path, value in self._priorities.items() if path in self._wanted}
+                self._sizes = {path: value for path, value in self._sizes.items() if path in self._wanted}
+                self._scan_provider = None
+                self._scan_signature = None
+            else:
+                self._ensure_worker()
+            self._lock.notify_all()
+
+    def set_busy_check(self, is_busy: Callable[[], bool] | None) -> None:
+        self._is_busy = is_busy
+
+    def request_scan(self, paths_provider: Callable[[], Iterable[str]], signature: Any = None) -> bool:
+        with self._lock:
+            if not self.enabled:
+                return False
+            # 前回の走査からフォルダが変わっていなければ、一覧とキャッシュの確認をやり直さない
+            if signature is not None and signature == self._scan_signature:
+                return False
+            self._scan_signature = signature
+            # フォルダの列挙とキャッシュ確認は重いので、ワーカースレッド側で行う
+            self._scan_provider = paths_provider
+            self._ensure_worker()
+            self._lock.notify_all()
+        return True
+
+    def enqueue(
+        self,
+        paths: Iterable[str],
+        priority: int = PRIORITY_REQUESTED,
+        on_complete: Callable[[], None] | None = None,
+    ) -> int:
+        candidates: list[tuple[str, int]] = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            candidates.append((path, stat.st_size))
+        with self._lock:
+            if on_complete is None and not self.enabled:
+                return 0
+            if on_complete is not None and candidates:
+                # 完了を待つ要求はバックグラウンド計算の設定に関係なく受け付け、全部終わったら呼び出す
+                waiting = {path for path, _size in candidates}
+                self._wanted.update(waiting)
+                self._waiters.append((waiting, on_complete))
+            added = self._push(candidates, priority)
+            if added:
+                self._ensure_worker()
+                self._lock.notify_all()
+        if on_complete is not None and not candidates:
+            on_complete()
+        return added
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            pending = len(self._priorities)
+            return {
+                'enabled': self.enabled,
+                'scanning': self._scanning,
+                'current': self._current,
+                'pending': pending,
+                'pending_bytes': sum(self._sizes.values()),
+                'hashed': self._hashed,
+                'failed': self._failed,
+                'hashed_bytes': self._hashed_bytes,
+                'last_scan': self._last_scan,
+            }
+
+    def _push(self, candidates: list[tuple[str, int]], priority: int) -> int:
+        added = 0
+        for path, size in candidates:
+            if path == self._current:
+                continue
+            queued = self._priorities.get(path)
+            if queued is not None and queued <= priority:
+                continue
+            # 同じ優先度なら小さいファイルから片付け、キャッシュに載る件数を早く増やす
+            heapq.heappush(self._pending, (priority, size, next(self._sequence), path))
+            self._priorities[path] = priority
+            self._sizes[path] = size
+            added += 1
+        return added
+
+    def _ensure_worker(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(
+            target=self._run,
+            name='craftgear-model-hash',
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                while not (
+                    (self.enabled and self._scan_provider is not None)
+                    or (self._priorities and (self.enabled or self._wanted))
+                ):
+                    self._lock.wait()
+            if not self._wait_while_busy():
+                continue
+            with self._lock:
+                provider = self._scan_provider
+                self._scan_provider = None
+                if provider is not None:
+                    self._scanning = True
+            if provider is not None:
+                self._scan(provider)
+                continue
+            popped = self._pop()
+            if popped is not None:
+                self._hash(*popped)
+
+    def _scan(self, provider: Callable[[], Iterable[str]]) -> None:
+        candidates: list[tuple[str, int]] = []
+        try:
+            for path in provider():
+                if not path or self._is_cached(path):
+                    continue
+                try:
+                    candidates.append((path, os.stat(path).st_size))
+                except OSError:
+                    continue
+        except Exception:
+            candidates = []
+        with self._lock:
+            self._scanning = False
+            self._last_scan = time.time()
+            if self.enabled:
+                self._push(candidates, PRIORITY_SCAN)
+
+    def _pop(self) -> tuple[str, int] | None:
+        with self._lock:
+            while self._pending:
+                priority, _size, _sequence, path = heapq.heappop(self._pending)
+                # 優先度を上げて積み直した古い要素は読み飛ばす
+                if self._priorities.get(path) != priority:
+                    continue
+                del self._priorities[path]
+                del self._sizes[path]
+                self._current = path
+                return path, priority
+        return None
+
+    def _hash(self, path: str, priority: int = PRIORITY_REQUESTED) -> None:
+        digest = ''
+        size = 0
+        try:
+            # ワークフローから要求されたモデルは計算済みのことが多いので先に確かめる
+            if self._is_cached(path):
+                with self._lock:
+                    self._current = ''
+                self._finish(path)
+                return
+            size = os.stat(path).st_size
+            digest = self._hash_file(path, self._check_paused)
+        except HashingPaused:
+            # 途中まで読んだ分は捨て、プロンプトが終わってから同じ優先度でやり直す
+            with self._lock:
+                self._current = ''
+                if self.enabled or path in self._wanted:
+                    self._push([(path, size)], priority)
+            return
+        except Exception:
+            digest = ''
+        with self._lock:
+            self._current = ''
+            if digest:
+                self._hashed += 1
+                self._hashed_bytes += size
+            else:
+                self._failed += 1
+        self._finish(path)
+
+    def _finish(self, path: str) -> None:
+        completed: list[Callable[[], None]] = []
+        with self._lock:
+            if path not in self._wanted:
+                return
+            self._wanted.discard(path)
+            remaining: list[tuple[set[str], Callable[[], None]]] = []
+            for waiting, on_complete in self._waiters:
+                waiting.discard(path)
+                if waiting:
+                    remaining.append((waiting, on_complete))
+                else:
+                    completed.append(on_complete)
+            self._waiters = remaining
+        # 呼び出し先で時間がかかってもキューを止めないよう、ロックの外で呼ぶ
+        for on_complete in completed:
+            try:
+                on_complete()
+            except Exception:
+                pass
+
+    def _check_paused(self) -> None:
+        # チャンクごとに呼ばれ、読み込みの途中でもプロンプトの開始や無効化で手を止める
+        if self._is_busy is not None and self._is_busy():
+            raise HashingPaused()
+        if not self.enabled and self._current not in self._wanted:
+            raise HashingPaused()
+
+    def _wait_while_busy(self) -> bool:
+        while self.enabled or self._wanted:
+            if self._is_busy is None or not self._is_busy():
+                return True
+            # 実行中のプロンプトとディスク帯域を取り合わないよう待つ
+            time.sleep(self.busy_poll)
+        return False
@@ -0,0 +1,85 @@
+from typing import Any
+
+_NO_LEAVES: frozenset[str] = frozenset()
+
+
+def is_link(value: Any) -> bool:
+    if isinstance(value, (list, tuple)) and len(value) >= 2:
+        return isinstance(value[0], (str, int))
+    return False
+
+
+class PromptGraph:
+    def __init__(self, prompt: dict[str, Any]) -> None:
+        self._nodes: dict[str, dict[str, Any]] = {}
+        self._inputs: dict[str, list[str]] = {}
+        self._by_class: dict[str, list[str]] = {}
+        self._walks: dict[tuple[str, frozenset[str]], list[str]] = {}
+        # プロンプトを 1 回だけ走査し、ノードごとの入力先とクラス別の一覧を作る
+        for raw_id, node in prompt.items():
+            if not isinstance(node, dict):
+                continue
+            node_id = str(raw_id)
+            self._nodes[node_id] = node
+            self._by_class.setdefault(str(node.get('class_type', '')), []).append(node_id)
+            inputs = node.get('inputs', {})
+            if not isinstance(inputs, dict):
+                inputs = {}
+            self._inputs[node_id] = [str(value[0]) for value in inputs.values() if is_link(value)]
+
+    def node(self, node_id: str) -> dict[str, Any] | None:
+        return self._nodes.get(node_id)
+
+    def inputs(self, node_id: str) -> dict[str, Any]:
+        node = self._nodes.get(node_id)
+        if node is None:
+            return {}
+        inputs = node.get('inputs', {})
+        return inputs if isinstance(inputs, dict) else {}
+
+    def first_of_class(self, class_type: str) -> str:
+        node_ids = self._by_class.get(class_type)
+        if not node_ids:
+            return ''
+        return node_ids[0]
+
+    def upstream(self, node_id: str, leaves: frozenset[str] = _NO_LEAVES) -> list[str]:
+        key = (node_id, leaves)
+        cached = self._walks.get(key)
+        if cached is not None:
+            return cached
+        # 再帰版と同じ行きがけ順 (入力の並び順) で辿る。leaves のクラスより先へは進まない
+        order: list[str] = []
+        visited: set[str] = set()
+        stack = [node_id]
+        while stack:
+            current = stack.pop()
+            if current in visited:
+                continue
+            visited.add(current)
+            node = self._nodes.get(current)
+            if node is None:
+                continue
+            order.append(current)
+            if node.get('class_type') in leaves:
+                continue
+            stack.extend(reversed(self._inputs[current]))
+        self._walks[key] = order
+        return order
+
+    def postorder(self, node_id: str) -> list[str]:
+        # 入力側のノードが必ず先に来る帰りがけ順。循環していても各ノードは 1 回だけ返す
+        order: list[str] = []
+        visited: set[str] = set()
+        stack: list[tuple[str, bool]] = [(node_id, False)]
+        while stack:
+            current, expanded = stack.pop()
+            if expanded:
+                order.append(current)
+                continue
+            if current in visited or current not in self._nodes:
+                continue
+            visited.add(current)
+            stack.append((current, True))
+            stack.extend((upstream_id, False) for upstream_id in reversed(self._inputs[current]))
+        return order
@@ -0,0 +1,110 @@
+import json
+import os
+import re
+from typing import Any
+
+_SHA256_PATTERN = re.compile(r'\b([0-9a-fA-F]{64})\b')
+_MAX_SIDECAR_BYTES = 8 * 1024 * 1024
+# civitai の sizeKB は小数付きの KiB なので、丸め誤差ぶんだけ許容する
+_SIZE_TOLERANCE_BYTES = 1024
+
+
+def read_sidecar_sha256(model_path: str, mtime_ns: int, size: int) -> str:
+    for sidecar_path in _sha256_sidecar_paths(model_path):
+        if not _is_fresh(sidecar_path, mtime_ns):
+            continue
+        digest = _read_sha256_file(sidecar_path)
+        if digest:
+            return digest
+    file_name = os.path.basename(model_path)
+    for sidecar_path in _civitai_sidecar_paths(model_path):
+        if not _is_fresh(sidecar_path, mtime_ns):
+            continue
+        digest = _find_civitai_sha256(_read_json(sidecar_path), file_name, size)
+        if digest:
+            return digest
+    return ''
+
+
+def _sha256_sidecar_paths(model_path: str) -> list[str]:
+    stem = os.path.splitext(model_path)[0]
+    return [f'{model_path}.sha256', f'{stem}.sha256']
+
+
+def _civitai_sidecar_paths(model_path: str) -> list[str]:
+    stem = os.path.splitext(model_path)[0]
+    return [
+        f'{stem}.civitai.info',
+        f'{stem}.json',
+        os.path.join(os.path.dirname(model_path), 'model_info.json'),
+    ]
+
+
+def _is_fresh(sidecar_path: str, mtime_ns: int) -> bool:
+    try:
+        sidecar_stat = os.stat(sidecar_path)
+    except OSError:
+        return False
+    if sidecar_stat.st_size > _MAX_SIDECAR_BYTES:
+        return False
+    # モデルより古いサイドカーは、差し替え前のファイルのハッシュかもしれないので使わない
+    return sidecar_stat.st_mtime_ns >= mtime_ns
+
+
+def _read_sha256_file(path: str) -> str:
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as file:
+            text = file.read(4096)
+    except OSError:
+        return ''
+    # sha256sum 形式の「ハッシュ  ファイル名」と、ハッシュだけの形式の両方を受け付ける
+    match = _SHA256_PATTERN.search(text)
+    return match.group(1).lower() if match else ''
+
+
+def _read_json(path: str) -> Any:
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def _find_civitai_sha256(data: Any, file_name: str, size: int) -> str:
+    if not isinstance(data, dict):
+        return ''
+    versions = data.get('modelVersions')
+    candidates = versions if isinstance(versions, list) else [data]
+    for version in candidates:
+        if not isinstance(version, dict):
+            continue
+        files = version.get('files')
+        if not isinstance(files, list):
+            continue
+        for file_entry in files:
+            digest = _match_civitai_file(file_entry, file_name, size)
+            if digest:
+                return digest
+    return ''
+
+
+def _match_civitai_file(file_entry: Any, file_name: str, size: int) -> str:
+    if not isinstance(file_entry, dict):
+        return ''
+    if str(file_entry.get('name', '')) != file_name:
+        return ''
+    size_kb = file_entry.get('sizeKB')
+    if not isinstance(size_kb, (int, float)) or isinstance(size_kb, bool):
+        return ''
+    if abs(size_kb * 1024 - size) > _SIZE_TOLERANCE_BYTES:
+        return ''
+    hashes = file_entry.get('hashes')
+    if not isinstance(hashes, dict):
+        return ''
+    for key, value in hashes.items():
+        if str(key).lower() != 'sha256' or not isinstance(value, str):
+            continue
+        match = _SHA256_PATTERN.fullmatch(value.strip())
+        if match:
+            return match.group(1).lower()
+    return ''
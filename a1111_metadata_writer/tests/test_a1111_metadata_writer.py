@@ -4,6 +4,7 @@ import json
 import os
 import sys
 import tempfile
+import threading
 import unittest
 from unittest import mock
 from pathlib import Path
@@ -15,6 +16,7 @@ from a1111_metadata_writer.logic import a1111_metadata as logic
 from a1111_metadata_writer.ui import node as node_module
 from a1111_metadata_writer.ui.node import A1111MetadataWriter
 from a1111_metadata_reader.logic import metadata_parser as reader_logic
+from craftgear_common.hash_store import close_hash_store
 
 try:
     import torch
@@ -395,24 +397,126 @@ class TestA1111MetadataWriter(unittest.TestCase):
 
     def test_hash_cache_is_persistent(self) -> None:
         with tempfile.TemporaryDirectory() as temp_dir:
-            cache_path = os.path.join(temp_dir, 'hash_cache.json')
+            cache_path = os.path.join(temp_dir, 'hash_cache.sqlite3')
             target_path = os.path.join(temp_dir, 'persist.safetensors')
             with open(target_path, 'wb') as file:
                 file.write(b'persist')
             original = logic._hash_file_uncached
-            with mock.patch.object(
-                logic, '_hash_cache_path', return_value=cache_path
-            ), mock.patch.object(
-                logic, '_hash_file_uncached', side_effect=original
-            ) as mocked:
-                first = logic._hash_file_short(target_path)
-                self.assertTrue(os.path.exists(cache_path))
-                self.assertEqual(mocked.call_count, 1)
+            try:
+                with mock.patch.object(
+                    logic, '_hash_cache_path', return_value=cache_path
+                ), mock.patch.object(
+                    logic, '_hash_file_uncached', side_effect=original
+                ) as mocked:
+                    first = logic._hash_file_short(target_path)
+                    self.assertTrue(os.path.exists(cache_path))
+                    self.assertEqual(mocked.call_count, 1)
+                    logic._HASH_CACHE.clear()
+                    close_hash_store()
+                    second = logic._hash_file_short(target_path)
+                    self.assertEqual(first, second)
+                    self.assertEqual(mocked.call_count, 1)
+            finally:
+                close_hash_store()
+
+    def test_hash_model_files_hashes_in_parallel_and_saves_once(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_path = os.path.join(temp_dir, 'hash_cache.sqlite3')
+            paths = []
+            for index in range(3):
+                path = os.path.join(temp_dir, f'model_{index}.safetensors')
+                with open(path, 'wb') as file:
+                    file.write(f'model {index}'.encode('utf-8'))
+                paths.append(path)
+            barrier = threading.Barrier(3, timeout=5)
+            original = logic._hash_file_uncached
+
+            def hash_together(path: str, *args) -> str:
+                # 3 ファイルが同時に計算されていなければ Barrier がタイムアウトする
+                barrier.wait()
+                return original(path, *args)
+
+            try:
+                with mock.patch.object(
+                    logic, '_hash_cache_path', return_value=cache_path
+                ), mock.patch.object(
+                    logic, '_MAX_HASH_WORKERS', 4
+                ), mock.patch.object(
+                    logic, '_hash_file_uncached', side_effect=hash_together
+                ), mock.patch.object(
+                    logic, '_write_stored_hashes', wraps=logic._write_stored_hashes
+                ) as saved:
+                    digests = logic.hash_model_files(paths + [paths[0]])
+                    self.assertEqual(list(digests), paths)
+                    self.assertEqual(
+                        [digests[path] for path in paths],
+                        [original(path) for path in paths],
+                    )
+                    self.assertEqual(saved.call_count, 1)
+                    self.assertEqual(len(saved.call_args.args[1]), 3)
+                    self.assertTrue(all(logic.is_model_hash_cached(path) for path in paths))
+            finally:
+                for path in paths:
+                    logic._HASH_CACHE.pop(path, None)
+                close_hash_store()
+
+    def test_hash_cache_follows_renamed_and_hardlinked_files(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_path = os.path.join(temp_dir, 'hash_cache.sqlite3')
+            original_path = os.path.join(temp_dir, 'old', 'model.safetensors')
+            renamed_path = os.path.join(temp_dir, 'new', 'renamed.safetensors')
+            linked_path = os.path.join(temp_dir, 'linked.safetensors')
+            os.makedirs(os.path.dirname(original_path))
+            with open(original_path, 'wb') as file:
+                file.write(b'moved model')
+            original = logic._hash_file_uncached
+            try:
+                with mock.patch.object(
+                    logic, '_hash_cache_path', return_value=cache_path
+                ), mock.patch.object(
+                    logic, '_hash_file_uncached', side_effect=original
+                ) as mocked:
+                    first = logic._hash_file_short(original_path)
+                    os.renames(original_path, renamed_path)
+                    os.link(renamed_path, linked_path)
+                    logic._HASH_CACHE.clear()
+                    logic._HASH_IDENTITY_CACHE.clear()
+                    self.assertEqual(logic._hash_file_short(renamed_path), first)
+                    self.assertEqual(logic._hash_file_short(linked_path), first)
+                    self.assertEqual(mocked.call_count, 1)
+                    stat = os.stat(renamed_path)
+                    self.assertEqual(logic._get_hash_store().get(renamed_path, stat.st_mtime_ns, stat.st_size), first)
+            finally:
                 logic._HASH_CACHE.clear()
-                logic._HASH_CACHE_LOADED = False
-                second = logic._hash_file_short(target_path)
-                self.assertEqual(first, second)
-                self.assertEqual(mocked.call_count, 1)
+                logic._HASH_IDENTITY_CACHE.clear()
+                close_hash_store()
+
+    def test_hash_cache_imports_legacy_json_once(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_path = os.path.join(temp_dir, 'craftgear_hash_cache.sqlite3')
+            target_path = os.path.join(temp_dir, 'legacy.safetensors')
+            with open(target_path, 'wb') as file:
+                file.write(b'legacy')
+            stat = os.stat(target_path)
+            with open(os.path.join(temp_dir, 'craftgear_hash_cache.json'), 'w', encoding='utf-8') as file:
+                json.dump(
+                    {
+                        'version': 1,
+                        'entries': {
+                            target_path: {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'hash': 'abcdef0123'},
+                        },
+                    },
+                    file,
+                )
+            logic._HASH_CACHE.pop(target_path, None)
+            try:
+                with mock.patch.object(
+                    logic, '_hash_cache_path', return_value=cache_path
+                ), mock.patch.object(logic, '_hash_file_uncached') as mocked:
+                    self.assertEqual(logic._hash_file_short(target_path), 'abcdef0123')
+                    mocked.assert_not_called()
+            finally:
+                close_hash_store()
 
     def test_suffix_false_defaults_to_a1111(self) -> None:
         self.assertEqual(node_module._build_filename_prefix(False), 'ComfyUI_a1111')
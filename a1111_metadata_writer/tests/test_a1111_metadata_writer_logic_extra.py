@@ -5,6 +5,7 @@ import unittest
 from unittest import mock
 
 from a1111_metadata_writer.logic import a1111_metadata as logic
+from a1111_metadata_writer.logic.prompt_graph import PromptGraph
 from a1111_metadata_writer.tests.test_a1111_metadata_writer import BASE_PNG
 
 
@@ -104,17 +105,17 @@ class A1111MetadataWriterLogicExtraTest(unittest.TestCase):
             },
         }
         cache: dict[str, str] = {}
-        result = logic._resolve_string(['3', 0], prompt, cache)
+        result = logic._resolve_string(['3', 0], PromptGraph(prompt), cache)
         self.assertEqual(result, 'alpha, gamma')
 
     def test_resolve_node_output_handles_missing(self) -> None:
         cache: dict[str, str] = {}
-        self.assertEqual(logic._resolve_node_output('missing', {}, cache), '')
+        self.assertEqual(logic._resolve_node_output('missing', PromptGraph({}), cache), '')
         self.assertEqual(cache.get('missing'), '')
 
     def test_resolve_string_numbers(self) -> None:
-        self.assertEqual(logic._resolve_string(1, {}, {}), '1')
-        self.assertEqual(logic._resolve_string(None, {}, {}), '')
+        self.assertEqual(logic._resolve_string(1, PromptGraph({}), {}), '1')
+        self.assertEqual(logic._resolve_string(None, PromptGraph({}), {}), '')
 
     def test_apply_load_loras_with_tags(self) -> None:
         inputs = {
@@ -169,12 +170,13 @@ class A1111MetadataWriterLogicExtraTest(unittest.TestCase):
             '2': {'class_type': 'LoraLoader', 'inputs': {'model': ['1', 0], 'lora_name': 'demo.safetensors', 'strength_model': 1.0}},
             '3': {'class_type': 'EmptyLatentImage', 'inputs': {'width': 512, 'height': 768}},
         }
-        model_name = logic._resolve_model_name(['2', 0], prompt)
+        graph = PromptGraph(prompt)
+        model_name = logic._resolve_model_name(['2', 0], graph)
         self.assertEqual(model_name, 'base')
-        size = logic._resolve_latent_size(['3', 0], prompt)
+        size = logic._resolve_latent_size(['3', 0], graph)
         self.assertEqual(size, (512, 768))
-        self.assertEqual(logic._resolve_model_name(None, prompt), '')
-        self.assertEqual(logic._resolve_latent_size(None, prompt), (None, None))
+        self.assertEqual(logic._resolve_model_name(None, graph), '')
+        self.assertEqual(logic._resolve_latent_size(None, graph), (None, None))
 
     def test_resolve_model_file_path_uses_folder_paths(self) -> None:
         with mock.patch.dict('sys.modules', {'folder_paths': mock.Mock()}):
@@ -1,8 +1,10 @@
 import struct
 import unittest
 import zlib
+from unittest import mock
 
 from a1111_metadata_writer.logic import a1111_metadata as logic
+from a1111_metadata_writer.logic.prompt_graph import PromptGraph
 from a1111_metadata_writer.tests.test_a1111_metadata_writer import build_prompt
 
 
@@ -21,10 +23,36 @@ class A1111MetadataWriterLogicMoreTest(unittest.TestCase):
 
     def test_resolve_node_output_uses_cache(self) -> None:
         cache = {'1': 'cached'}
-        self.assertEqual(logic._resolve_node_output('1', {}, cache), 'cached')
+        self.assertEqual(logic._resolve_node_output('1', PromptGraph({}), cache), 'cached')
 
     def test_build_parameters_with_invalid_denoise(self) -> None:
         prompt = build_prompt()
         prompt['5']['inputs']['denoise'] = 'bad'
         text = logic.build_a1111_parameters_from_prompt(prompt)
         self.assertNotIn('Denoising strength', text)
+
+    def test_fragments_are_reused_across_seeds(self) -> None:
+        prompt = build_prompt()
+        with mock.patch.dict(logic._FRAGMENT_CACHE, clear=True), mock.patch.object(
+            logic, '_build_prompt_fragments', wraps=logic._build_prompt_fragments
+        ) as built:
+            first = logic.build_a1111_parameters_from_prompt(prompt)
+            prompt['5']['inputs'].update({'seed': 456, 'steps': 30, 'cfg': 7, 'denoise': 0.5})
+            second = logic.build_a1111_parameters_from_prompt(prompt)
+            self.assertEqual(built.call_count, 1)
+            self.assertIn('Seed: 123', first)
+            self.assertIn('Steps: 30, Sampler: Euler a, CFG scale: 7, Seed: 456', second)
+            self.assertIn('Denoising strength: 0.5', second)
+            self.assertEqual(first.split('\n')[:2], second.split('\n')[:2])
+            prompt['3']['inputs']['text'] = 'landscape'
+            third = logic.build_a1111_parameters_from_prompt(prompt)
+            self.assertEqual(built.call_count, 2)
+            self.assertTrue(third.startswith('landscape\n'))
+
+    def test_fragment_cache_is_bounded(self) -> None:
+        with mock.patch.dict(logic._FRAGMENT_CACHE, clear=True), mock.patch.object(logic, '_FRAGMENT_CACHE_SIZE', 2):
+            for text in ('a', 'b', 'c'):
+                prompt = build_prompt()
+                prompt['3']['inputs']['text'] = text
+                logic.build_a1111_parameters_from_prompt(prompt)
+            self.assertEqual([fragments[1] for fragments in logic._FRAGMENT_CACHE.values()], ['b', 'c'])
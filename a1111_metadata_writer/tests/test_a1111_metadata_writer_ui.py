@@ -20,6 +20,10 @@ class TestA1111MetadataWriterUi(unittest.TestCase):
         self.assertEqual(required['format'][0], ['png', 'webp'])
         self.assertEqual(required['format'][1]['default'], 'png')
 
+    def test_input_types_defer_hashes_is_optional(self) -> None:
+        optional = node_module.A1111MetadataWriter.INPUT_TYPES()['optional']
+        self.assertEqual(optional['defer_hashes'], ('BOOLEAN', {'default': False}))
+
     def test_build_preview_payload_in_output_dir(self) -> None:
         with tempfile.TemporaryDirectory() as temp_dir:
             subfolder = os.path.join(temp_dir, 'nested')
@@ -341,3 +341,28 @@ class A1111MetadataWriterUiExtraTest(unittest.TestCase):
         self.assertEqual(dummy_image.saved, ('/tmp/out.webp', {'exif': b'exif-bytes'}))
         self.assertEqual(result['result'], ('params', '/tmp/out.webp'))
         self.assertEqual(result['ui']['images'], [preview])
+
+    def test_apply_defers_uncached_hashes(self) -> None:
+        writer = node_module.A1111MetadataWriter()
+        dummy_image = _DummyPilImage()
+        prompt = {'1': {'class_type': 'KSampler', 'inputs': {}}}
+
+        def build_parameters(_prompt, pending_hashes=None, model_hash='autov2'):
+            self.assertEqual(model_hash, 'both')
+            pending_hashes.append('/models/base.safetensors')
+            return 'params'
+
+        with mock.patch.object(
+            node_module.logic, 'build_a1111_parameters_from_prompt', side_effect=build_parameters
+        ), mock.patch.object(node_module, '_image_to_pil', return_value=dummy_image), mock.patch.object(
+            node_module, '_build_output_path', return_value='/tmp/out.png'
+        ), mock.patch.object(
+            node_module, '_build_pnginfo', return_value='pnginfo'
+        ), mock.patch.object(
+            node_module, '_build_preview_payload', return_value=None
+        ), mock.patch.object(
+            node_module._DEFERRED_HASHES, 'submit'
+        ) as submit:
+            result = writer.apply('image', False, '_demo', defer_hashes=True, model_hash='Both', prompt=prompt)
+        submit.assert_called_once_with('/tmp/out.png', 'png', prompt, ['/models/base.safetensors'], 'both')
+        self.assertEqual(result['result'], ('params', '/tmp/out.png'))
@@ -0,0 +1,143 @@
+import hashlib
+import os
+import struct
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from a1111_metadata_writer.logic import a1111_metadata as logic
+from a1111_metadata_writer.logic.deferred_hashes import DeferredHashPatcher, patch_image_metadata
+from a1111_metadata_writer.logic.hash_worker import ModelHashWorker
+from a1111_metadata_writer.tests.test_a1111_metadata_writer import BASE_PNG
+
+
+def _riff_chunk(fourcc: bytes, data: bytes) -> bytes:
+    padding = b'\x00' if len(data) % 2 else b''
+    return fourcc + struct.pack('<I', len(data)) + data + padding
+
+
+def _build_webp(exif: bytes) -> bytes:
+    body = b'WEBP' + _riff_chunk(b'VP8X', b'\x08' + b'\x00' * 9) + _riff_chunk(b'VP8 ', b'pixels!') + _riff_chunk(b'EXIF', exif)
+    return b'RIFF' + struct.pack('<I', len(body)) + body
+
+
+def _build_prompt(model_path: str) -> dict:
+    return {
+        '1': {'inputs': {'ckpt_name': model_path}, 'class_type': 'CheckpointLoaderSimple'},
+        '2': {'inputs': {'text': 'masterpiece'}, 'class_type': 'CLIPTextEncode'},
+        '3': {
+            'inputs': {'seed': 1, 'steps': 20, 'model': ['1', 0], 'positive': ['2', 0]},
+            'class_type': 'KSampler',
+        },
+    }
+
+
+class DeferredHashesTest(unittest.TestCase):
+    def test_pending_hashes_skip_uncached_models(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            model_path = os.path.join(temp_dir, 'base.safetensors')
+            with open(model_path, 'wb') as file:
+                file.write(b'model-data')
+            prompt = _build_prompt(model_path)
+            logic._HASH_CACHE.pop(model_path, None)
+            try:
+                with mock.patch.object(logic, '_get_hash_store', return_value=None):
+                    with mock.patch.object(logic, '_hash_file_uncached') as mocked:
+                        pending: list[str] = []
+                        params = logic.build_a1111_parameters_from_prompt(prompt, pending)
+                        mocked.assert_not_called()
+                    self.assertNotIn('Hashes:', params)
+                    self.assertEqual(pending, [model_path])
+                    logic.hash_model_file(model_path)
+                    pending = []
+                    params = logic.build_a1111_parameters_from_prompt(prompt, pending)
+                model_hash = hashlib.sha256(b'model-data').hexdigest()[:10]
+                self.assertIn(f'Hashes: {{"model": "{model_hash}"}}', params)
+                self.assertEqual(pending, [])
+            finally:
+                logic._HASH_CACHE.pop(model_path, None)
+
+    def test_run_job_patches_png_parameters_only(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            image_path = os.path.join(temp_dir, 'out.png')
+            with open(image_path, 'wb') as file:
+                file.write(logic.set_png_text_value(BASE_PNG, 'parameters', 'Steps: 20'))
+            patcher = DeferredHashPatcher(
+                mock.Mock(),
+                lambda _prompt, pending, model_hash: f'Steps: 20, Model hash: {model_hash}, Hashes: {{"model": "abcdef0123"}}',
+                lambda _parameters: b'',
+            )
+            stat = os.stat(image_path)
+            job = (image_path, 'png', {}, ('/models/base.safetensors',), (stat.st_mtime_ns, stat.st_size), 'both')
+            self.assertTrue(patcher.run_job(job))
+            with open(image_path, 'rb') as file:
+                patched = file.read()
+        self.assertEqual(
+            logic.read_png_text(patched)['parameters'],
+            'Steps: 20, Model hash: both, Hashes: {"model": "abcdef0123"}',
+        )
+        original_idat = [data for chunk_type, data, _ in logic._iter_png_chunks(BASE_PNG) if chunk_type == b'IDAT']
+        patched_idat = [data for chunk_type, data, _ in logic._iter_png_chunks(patched) if chunk_type == b'IDAT']
+        self.assertEqual(patched_idat, original_idat)
+
+    def test_submit_patches_after_worker_hashes_models(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            model_path = os.path.join(temp_dir, 'base.safetensors')
+            with open(model_path, 'wb') as file:
+                file.write(b'model-data')
+            image_path = os.path.join(temp_dir, 'out.png')
+            with open(image_path, 'wb') as file:
+                file.write(BASE_PNG)
+            hashed: list[str] = []
+            worker = ModelHashWorker(lambda path, _check: hashed.append(path) or 'abcdef0123', lambda _path: False)
+            built: list[list[str]] = []
+            done = threading.Event()
+
+            def build(_prompt, pending, model_hash):
+                built.append(pending)
+                done.set()
+                return f'Steps: 20, Model hash: {model_hash}'
+
+            patcher = DeferredHashPatcher(worker, build, lambda _parameters: b'')
+            self.assertTrue(patcher.submit(image_path, 'png', {}, [model_path]))
+            self.assertTrue(done.wait(2))
+            self.assertEqual(hashed, [model_path])
+            # 後からの組み立ては未計算のものを返すだけのリストを渡し、対話的な計算に入らない
+            self.assertEqual(built, [[]])
+            self.assertFalse(worker.enabled)
+
+    def test_patch_skips_file_changed_after_save(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            image_path = os.path.join(temp_dir, 'out.png')
+            with open(image_path, 'wb') as file:
+                file.write(BASE_PNG)
+            stat = os.stat(image_path)
+            saved_stat = (stat.st_mtime_ns, stat.st_size + 1)
+            self.assertFalse(patch_image_metadata(image_path, 'png', 'Steps: 20', saved_stat))
+            with open(image_path, 'rb') as file:
+                self.assertEqual(file.read(), BASE_PNG)
+
+    def test_patch_replaces_webp_exif_chunk(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            image_path = os.path.join(temp_dir, 'out.webp')
+            with open(image_path, 'wb') as file:
+                file.write(_build_webp(b'MM\x00*old'))
+            stat = os.stat(image_path)
+            self.assertTrue(
+                patch_image_metadata(image_path, 'webp', b'Exif\x00\x00MM\x00*newer', (stat.st_mtime_ns, stat.st_size))
+            )
+            with open(image_path, 'rb') as file:
+                patched = file.read()
+        self.assertEqual(patched, _build_webp(b'MM\x00*newer'))
+        self.assertEqual(logic._iter_riff_chunks(patched)[1], (b'VP8 ', b'pixels!'))
+
+    def test_set_webp_exif_keeps_image_without_exif(self) -> None:
+        body = b'WEBP' + _riff_chunk(b'VP8 ', b'pixels')
+        webp = b'RIFF' + struct.pack('<I', len(body)) + body
+        self.assertEqual(logic.set_webp_exif(webp, b'MM\x00*'), webp)
+        self.assertEqual(logic.set_webp_exif(b'not webp', b'MM\x00*'), b'not webp')
+
+
+if __name__ == '__main__':
+    unittest.main()
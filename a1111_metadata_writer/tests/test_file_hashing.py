@@ -0,0 +1,189 @@
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import time
+import types
+import unittest
+from unittest import mock
+
+from a1111_metadata_writer.logic import a1111_metadata as logic
+
+
+class _Interrupted(Exception):
+    pass
+
+
+class WriterFileHashingTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._temp_dir.name, 'model.safetensors')
+        self.data = bytes(range(256)) * 1000
+        with open(self.path, 'wb') as file:
+            file.write(self.data)
+
+    def tearDown(self) -> None:
+        self._temp_dir.cleanup()
+
+    def test_interactive_hashing_uses_comfy_progress_and_interrupt(self) -> None:
+        updates: list[int] = []
+
+        class ProgressBar:
+            def __init__(self, total: int) -> None:
+                self.total = total
+
+            def update_absolute(self, value: int) -> None:
+                updates.append(value)
+
+        interrupted = {'value': False}
+
+        def throw_exception_if_processing_interrupted() -> None:
+            # ComfyUI と同じく、例外を投げるときにフラグを戻す
+            if interrupted['value']:
+                interrupted['value'] = False
+                raise _Interrupted()
+
+        comfy = types.ModuleType('comfy')
+        comfy.utils = types.SimpleNamespace(ProgressBar=ProgressBar)
+        comfy.model_management = types.SimpleNamespace(
+            throw_exception_if_processing_interrupted=throw_exception_if_processing_interrupted
+        )
+        modules = {'comfy': comfy, 'comfy.utils': comfy.utils, 'comfy.model_management': comfy.model_management}
+        with mock.patch.dict(sys.modules, modules), mock.patch.object(
+            logic, '_get_hash_store', return_value=None
+        ), mock.patch.dict(logic._HASH_CACHE, clear=True), mock.patch.dict(logic._HASH_IDENTITY_CACHE, clear=True):
+            digests = logic.hash_model_files([self.path], interactive=True)
+            self.assertEqual(digests[self.path], hashlib.sha256(self.data).hexdigest()[:10])
+            self.assertEqual(updates[-1], 100)
+            logic._HASH_CACHE.clear()
+            logic._HASH_IDENTITY_CACHE.clear()
+            interrupted['value'] = True
+            with self.assertRaises(_Interrupted):
+                logic.hash_model_files([self.path], interactive=True)
+            self.assertEqual(logic._HASH_CACHE, {})
+            # 中断を見ない呼び出し (バックグラウンド計算など) はそのまま計算する
+            self.assertIn(self.path, logic.hash_model_files([self.path]))
+
+    def test_node_waits_for_file_the_worker_is_hashing(self) -> None:
+        started = threading.Event()
+        release = threading.Event()
+        reads: list[str] = []
+        sha256_file = logic.sha256_file
+
+        def slow_sha256_file(path: str, on_progress=None, check_interrupt=None) -> str:
+            reads.append(path)
+            started.set()
+            release.wait(5.0)
+            return sha256_file(path)
+
+        results: dict[str, str] = {}
+        with mock.patch.object(logic, '_get_hash_store', return_value=None), mock.patch.dict(
+            logic._HASH_CACHE, clear=True
+        ), mock.patch.dict(logic._HASH_IDENTITY_CACHE, clear=True), mock.patch.object(
+            logic, 'sha256_file', side_effect=slow_sha256_file
+        ):
+            worker = threading.Thread(target=lambda: results.update(worker=logic.hash_model_file(self.path)))
+            worker.start()
+            self.assertTrue(started.wait(5.0))
+            node = threading.Thread(target=lambda: results.update(node=logic.hash_model_files([self.path])[self.path]))
+            node.start()
+            node.join(0.1)
+            self.assertTrue(node.is_alive())
+            release.set()
+            worker.join(5.0)
+            node.join(5.0)
+        expected = hashlib.sha256(self.data).hexdigest()[:10]
+        self.assertEqual(results, {'worker': expected, 'node': expected})
+        self.assertEqual(reads, [self.path])
+
+    def test_waiting_for_in_flight_file_honours_interrupt(self) -> None:
+        def interrupt() -> None:
+            raise _Interrupted()
+
+        with mock.patch.object(logic, '_HASHING_PATHS', {self.path}), mock.patch.object(
+            logic, 'sha256_file'
+        ) as mocked:
+            with self.assertRaises(_Interrupted):
+                logic._hash_file_uncached(self.path, None, interrupt)
+            mocked.assert_not_called()
+
+    def test_parallel_hashing_raises_the_first_failure(self) -> None:
+        paths = [os.path.join(self._temp_dir.name, f'model_{index}.safetensors') for index in range(3)]
+
+        def hash_file(path: str, on_progress=None, check_interrupt=None) -> str:
+            if path == paths[1]:
+                raise _Interrupted()
+            return 'digest'
+
+        with mock.patch.object(logic, '_MAX_HASH_WORKERS', 4), mock.patch.object(
+            logic, '_hash_file_uncached', side_effect=hash_file
+        ):
+            with self.assertRaises(_Interrupted):
+                logic._hash_files_uncached(paths)
+
+    def test_interrupt_stops_every_parallel_worker(self) -> None:
+        paths = []
+        for index in range(2):
+            path = os.path.join(self._temp_dir.name, f'model_{index}.safetensors')
+            with open(path, 'wb') as file:
+                file.write(self.data)
+            paths.append(path)
+        interrupted = {'value': False}
+        started = threading.Barrier(2, timeout=5)
+
+        def throw_exception_if_processing_interrupted() -> None:
+            if interrupted['value']:
+                interrupted['value'] = False
+                raise _Interrupted()
+
+        def slow_sha256_file(path: str, on_progress=None, check_interrupt=None) -> str:
+            started.wait()
+            if path == paths[0]:
+                interrupted['value'] = True
+            # 中断されなければ 5 秒かけて読み終える大きなファイルの代わり
+            for _ in range(500):
+                check_interrupt()
+                time.sleep(0.01)
+            return 'finished'
+
+        comfy = types.ModuleType('comfy')
+        comfy.model_management = types.SimpleNamespace(
+            throw_exception_if_processing_interrupted=throw_exception_if_processing_interrupted
+        )
+        modules = {'comfy': comfy, 'comfy.model_management': comfy.model_management}
+        with mock.patch.dict(sys.modules, modules), mock.patch.object(
+            logic, '_get_hash_store', return_value=None
+        ), mock.patch.dict(logic._HASH_CACHE, clear=True), mock.patch.dict(
+            logic._HASH_IDENTITY_CACHE, clear=True
+        ), mock.patch.object(logic, '_MAX_HASH_WORKERS', 2), mock.patch.object(
+            logic, 'sha256_file', side_effect=slow_sha256_file
+        ):
+            started_at = time.monotonic()
+            with self.assertRaises(_Interrupted):
+                logic.hash_model_files(paths, interactive=True)
+            self.assertLess(time.monotonic() - started_at, 2.0)
+            self.assertEqual(logic._HASH_CACHE, {})
+
+    def test_legacy_mode_skips_full_hashing(self) -> None:
+        prompt = {
+            '1': {'inputs': {'ckpt_name': self.path}, 'class_type': 'CheckpointLoaderSimple'},
+            '2': {'inputs': {'seed': 1, 'model': ['1', 0]}, 'class_type': 'KSampler'},
+        }
+        legacy = hashlib.sha256(b'').hexdigest()[:8]
+        full = hashlib.sha256(self.data).hexdigest()[:10]
+        with mock.patch.object(logic, '_get_hash_store', return_value=None), mock.patch.dict(
+            logic._HASH_CACHE, clear=True
+        ), mock.patch.dict(logic._HASH_IDENTITY_CACHE, clear=True):
+            with mock.patch.object(logic, '_hash_file_uncached') as mocked:
+                params = logic.build_a1111_parameters_from_prompt(prompt, model_hash='legacy')
+                mocked.assert_not_called()
+            self.assertEqual(params, f'Seed: 1, Model hash: {legacy}, Model: model')
+            params = logic.build_a1111_parameters_from_prompt(prompt, model_hash='both')
+            self.assertEqual(params, f'Seed: 1, Model hash: {legacy}, Model: model, Hashes: {{"model": "{full}"}}')
+            params = logic.build_a1111_parameters_from_prompt(prompt, model_hash='unknown')
+            self.assertEqual(params, f'Seed: 1, Model: model, Hashes: {{"model": "{full}"}}')
+
+
+if __name__ == '__main__':
+    unittest.main()
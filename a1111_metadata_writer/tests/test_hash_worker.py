@@ -0,0 +1,210 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from a1111_metadata_writer.logic.hash_worker import (
+    PRIORITY_REQUESTED,
+    PRIORITY_SCAN,
+    HashingPaused,
+    ModelHashWorker,
+)
+
+
+class ModelHashWorkerTest(unittest.TestCase):
+    def _write(self, path: str, size: int) -> str:
+        with open(path, 'wb') as file:
+            file.write(b'\x00' * size)
+        return path
+
+    def _wait_until(self, predicate, timeout: float = 5.0) -> bool:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if predicate():
+                return True
+            time.sleep(0.01)
+        return False
+
+    def test_disabled_by_default(self) -> None:
+        worker = ModelHashWorker(lambda _path, _check: 'abc', lambda _path: False)
+        self.assertFalse(worker.request_scan(lambda: []))
+        self.assertEqual(worker.enqueue(['/nonexistent/a.safetensors']), 0)
+        self.assertFalse(worker.stats()['enabled'])
+
+    def test_scan_hashes_uncached_files(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cached = self._write(os.path.join(temp_dir, 'cached.safetensors'), 16)
+            fresh = self._write(os.path.join(temp_dir, 'fresh.safetensors'), 32)
+            hashed: list[str] = []
+            worker = ModelHashWorker(
+                lambda path, _check: hashed.append(path) or 'abc',
+                lambda path: path == cached,
+            )
+            worker.set_enabled(True)
+            self.assertTrue(worker.request_scan(lambda: [cached, fresh]))
+            self.assertTrue(self._wait_until(lambda: worker.stats()['hashed'] == 1))
+            stats = worker.stats()
+            self.assertEqual(hashed, [fresh])
+            self.assertEqual(stats['hashed_bytes'], 32)
+            self.assertEqual(stats['pending'], 0)
+            self.assertGreater(stats['last_scan'], 0)
+
+    def test_scan_skips_unchanged_folder_signature(self) -> None:
+        worker = ModelHashWorker(lambda _path, _check: 'abc', lambda _path: True)
+        worker.set_enabled(True)
+        self.assertTrue(worker.request_scan(lambda: [], ('models', 1)))
+        self.assertFalse(worker.request_scan(lambda: [], ('models', 1)))
+        self.assertTrue(worker.request_scan(lambda: [], ('models', 2)))
+        worker.set_enabled(False)
+        worker.set_enabled(True)
+        self.assertTrue(worker.request_scan(lambda: [], ('models', 2)))
+
+    def test_requested_files_run_before_scan_and_small_files_first(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            big = self._write(os.path.join(temp_dir, 'big.safetensors'), 64)
+            small = self._write(os.path.join(temp_dir, 'small.safetensors'), 8)
+            wanted = self._write(os.path.join(temp_dir, 'wanted.safetensors'), 128)
+            busy = [True]
+            hashed: list[str] = []
+            worker = ModelHashWorker(
+                lambda path, _check: hashed.append(path) or 'abc',
+                lambda _path: False,
+                is_busy=lambda: busy[0],
+                busy_poll=0.01,
+            )
+            worker.set_enabled(True)
+            worker.enqueue([big, small], PRIORITY_SCAN)
+            worker.enqueue([wanted], PRIORITY_REQUESTED)
+            self.assertEqual(worker.stats()['pending'], 3)
+            self.assertEqual(worker.stats()['pending_bytes'], 200)
+            busy[0] = False
+            self.assertTrue(self._wait_until(lambda: worker.stats()['hashed'] == 3))
+            self.assertEqual(hashed, [wanted, small, big])
+
+    def test_enqueue_raises_priority_without_duplicates(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            first = self._write(os.path.join(temp_dir, 'a.safetensors'), 8)
+            second = self._write(os.path.join(temp_dir, 'b.safetensors'), 64)
+            busy = [True]
+            hashed: list[str] = []
+            worker = ModelHashWorker(
+                lambda path, _check: hashed.append(path) or 'abc',
+                lambda _path: False,
+                is_busy=lambda: busy[0],
+                busy_poll=0.01,
+            )
+            worker.set_enabled(True)
+            worker.enqueue([first, second], PRIORITY_SCAN)
+            self.assertEqual(worker.enqueue([second], PRIORITY_REQUESTED), 1)
+            self.assertEqual(worker.enqueue([second], PRIORITY_SCAN), 0)
+            self.assertEqual(worker.stats()['pending'], 2)
+            busy[0] = False
+            self.assertTrue(self._wait_until(lambda: worker.stats()['hashed'] == 2))
+            self.assertEqual(hashed, [second, first])
+
+    def test_requested_cached_file_is_skipped(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cached = self._write(os.path.join(temp_dir, 'cached.safetensors'), 8)
+            fresh = self._write(os.path.join(temp_dir, 'fresh.safetensors'), 16)
+            hashed: list[str] = []
+            worker = ModelHashWorker(
+                lambda path, _check: hashed.append(path) or 'abc',
+                lambda path: path == cached,
+            )
+            worker.set_enabled(True)
+            worker.enqueue([cached, fresh])
+            self.assertTrue(self._wait_until(lambda: worker.stats()['hashed'] == 1))
+            self.assertEqual(hashed, [fresh])
+            self.assertEqual(worker.stats()['failed'], 0)
+
+    def test_failed_hash_is_counted(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = self._write(os.path.join(temp_dir, 'a.safetensors'), 8)
+            worker = ModelHashWorker(lambda _path, _check: '', lambda _path: False)
+            worker.set_enabled(True)
+            worker.enqueue([path])
+            self.assertTrue(self._wait_until(lambda: worker.stats()['failed'] == 1))
+            self.assertEqual(worker.stats()['hashed'], 0)
+
+    def test_disable_clears_queue(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = self._write(os.path.join(temp_dir, 'a.safetensors'), 8)
+            started = threading.Event()
+            worker = ModelHashWorker(
+                lambda _path, _check: 'abc',
+                lambda _path: False,
+                is_busy=lambda: started.set() or True,
+                busy_poll=0.01,
+            )
+            worker.set_enabled(True)
+            worker.enqueue([path])
+            self.assertTrue(started.wait(5.0))
+            worker.set_enabled(False)
+            stats = worker.stats()
+            self.assertFalse(stats['enabled'])
+            self.assertEqual(stats['pending'], 0)
+            self.assertEqual(stats['hashed'], 0)
+
+    def test_busy_pauses_mid_file_and_requeues(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = self._write(os.path.join(temp_dir, 'a.safetensors'), 8)
+            busy = [False]
+            calls: list[str] = []
+
+            def hash_file(file_path: str, check_paused) -> str:
+                calls.append(file_path)
+                if len(calls) == 1:
+                    # 1 チャンク目を読んだところでプロンプトが始まった想定
+                    check_paused()
+                    busy[0] = True
+                    check_paused()
+                return 'abc'
+
+            worker = ModelHashWorker(
+                hash_file,
+                lambda _path: False,
+                is_busy=lambda: busy[0],
+                busy_poll=0.01,
+            )
+            worker.set_enabled(True)
+            worker.enqueue([path], PRIORITY_SCAN)
+            self.assertTrue(self._wait_until(lambda: worker.stats()['pending'] == 1 and len(calls) == 1))
+            self.assertEqual(worker.stats()['failed'], 0)
+            self.assertEqual(worker.stats()['current'], '')
+            busy[0] = False
+            self.assertTrue(self._wait_until(lambda: worker.stats()['hashed'] == 1))
+            self.assertEqual(calls, [path, path])
+
+    def test_completion_callback_runs_after_busy_even_when_disabled(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            first = self._write(os.path.join(temp_dir, 'a.safetensors'), 8)
+            second = self._write(os.path.join(temp_dir, 'b.safetensors'), 16)
+            busy = [True]
+            hashed: list[str] = []
+            completed: list[list[str]] = []
+            worker = ModelHashWorker(
+                lambda path, _check: hashed.append(path) or 'abc',
+                lambda _path: False,
+                is_busy=lambda: busy[0],
+                busy_poll=0.01,
+            )
+            worker.enqueue([first, second], on_complete=lambda: completed.append(list(hashed)))
+            time.sleep(0.05)
+            self.assertEqual(hashed, [])
+            self.assertEqual(worker.stats()['pending'], 2)
+            busy[0] = False
+            self.assertTrue(self._wait_until(lambda: completed))
+            self.assertEqual(completed, [[first, second]])
+            self.assertFalse(worker.stats()['enabled'])
+            worker.enqueue(['/nonexistent/c.safetensors'], on_complete=lambda: completed.append([]))
+            self.assertEqual(completed, [[first, second], []])
+
+    def test_disabled_worker_aborts_check(self) -> None:
+        worker = ModelHashWorker(lambda _path, _check: 'abc', lambda _path: False)
+        with self.assertRaises(HashingPaused):
+            worker._check_paused()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import sys
+import unittest
+from unittest import mock
+
+from a1111_metadata_writer.logic import a1111_metadata as logic
+from a1111_metadata_writer.logic.prompt_graph import PromptGraph
+
+
+def _build_deep_prompt(depth: int) -> dict:
+    prompt = {
+        '0': {'class_type': 'CheckpointLoaderSimple', 'inputs': {'ckpt_name': 'base.safetensors'}},
+        't0': {'class_type': 'CommentableMultilineTextNode', 'inputs': {'text': 'masterpiece', 'separator': ','}},
+        'latent': {'class_type': 'EmptyLatentImage', 'inputs': {'width': 512, 'height': 768}},
+    }
+    for index in range(1, depth + 1):
+        prompt[str(index)] = {
+            'class_type': 'LoraLoaderModelOnly',
+            'inputs': {'model': [str(index - 1), 0], 'lora_name': f'lora_{index}.safetensors', 'strength_model': 1.0},
+        }
+        prompt[f't{index}'] = {
+            'class_type': 'JoinTextNode',
+            'inputs': {'text_1': [f't{index - 1}', 0], 'text_2': f'tag{index}', 'separator': ','},
+        }
+    prompt['sampler'] = {
+        'class_type': 'KSampler',
+        'inputs': {
+            'seed': 1,
+            'model': [str(depth), 0],
+            'positive': [f't{depth}', 0],
+            'latent_image': ['latent', 0],
+        },
+    }
+    return prompt
+
+
+class PromptGraphTest(unittest.TestCase):
+    def test_upstream_matches_recursive_preorder(self) -> None:
+        prompt = {
+            'a': {'class_type': 'A', 'inputs': {'x': ['b', 0], 'y': ['c', 0]}},
+            'b': {'class_type': 'B', 'inputs': {'x': ['d', 0]}},
+            'c': {'class_type': 'Stop', 'inputs': {'x': ['e', 0]}},
+            'd': {'class_type': 'D', 'inputs': {'x': ['c', 0], 'y': ['missing', 0]}},
+            'e': {'class_type': 'E', 'inputs': {'x': ['a', 0]}},
+            'f': 'not a node',
+        }
+        graph = PromptGraph(prompt)
+        self.assertEqual(graph.upstream('a'), ['a', 'b', 'd', 'c', 'e'])
+        self.assertEqual(graph.upstream('a', frozenset({'Stop'})), ['a', 'b', 'd', 'c'])
+        self.assertIs(graph.upstream('a'), graph.upstream('a'))
+        self.assertEqual(graph.postorder('a'), ['e', 'c', 'd', 'b', 'a'])
+        self.assertEqual(graph.first_of_class('Stop'), 'c')
+        self.assertEqual(graph.first_of_class('Missing'), '')
+        self.assertIsNone(graph.node('f'))
+
+    def test_deep_graph_does_not_recurse(self) -> None:
+        depth = 3000
+        prompt = _build_deep_prompt(depth)
+        # 再帰で辿ると既定の再帰上限 (1000) を超える深さ
+        self.assertGreater(depth, sys.getrecursionlimit())
+        with mock.patch.object(logic, '_resolve_lora_path', return_value=''):
+            params = logic.build_a1111_parameters_from_prompt(prompt)
+        lines = params.split('\n')
+        self.assertTrue(lines[0].startswith('masterpiece,tag1,tag2,'))
+        self.assertIn(f',tag{depth}, <lora:lora_{depth}:1>, <lora:lora_{depth - 1}:1>', lines[0])
+        self.assertTrue(lines[0].endswith('<lora:lora_1:1>'))
+        self.assertEqual(lines[1], 'Seed: 1, Size: 512x768, Model: base')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from a1111_metadata_writer.logic import a1111_metadata as logic
+from a1111_metadata_writer.logic.sidecar_hashes import read_sidecar_sha256
+
+DIGEST = 'ABCDEF0123456789' * 4
+
+
+class SidecarHashesTest(unittest.TestCase):
+    def _write_model(self, directory: str, size: int = 4096) -> tuple[str, os.stat_result]:
+        path = os.path.join(directory, 'model.safetensors')
+        with open(path, 'wb') as file:
+            file.write(b'\x00' * size)
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns - 10_000_000_000))
+        return path, os.stat(path)
+
+    def _write_json(self, path: str, payload: dict) -> None:
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(payload, file)
+
+    def _civitai_version(self, size: int, name: str = 'model.safetensors') -> dict:
+        return {
+            'files': [
+                {'name': 'other.safetensors', 'sizeKB': 1.0, 'hashes': {'SHA256': '0' * 64}},
+                {'name': name, 'sizeKB': size / 1024, 'hashes': {'AutoV2': 'ABCDEF0123', 'SHA256': DIGEST}},
+            ]
+        }
+
+    def test_reads_sha256sum_sidecar(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path, stat = self._write_model(temp_dir)
+            with open(f'{path}.sha256', 'w', encoding='utf-8') as file:
+                file.write(f'{DIGEST}  model.safetensors\n')
+            self.assertEqual(read_sidecar_sha256(path, stat.st_mtime_ns, stat.st_size), DIGEST.lower())
+
+    def test_reads_civitai_info(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path, stat = self._write_model(temp_dir)
+            self._write_json(os.path.join(temp_dir, 'model.civitai.info'), self._civitai_version(stat.st_size))
+            self.assertEqual(read_sidecar_sha256(path, stat.st_mtime_ns, stat.st_size), DIGEST.lower())
+
+    def test_reads_model_info_with_versions(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path, stat = self._write_model(temp_dir)
+            self._write_json(
+                os.path.join(temp_dir, 'model_info.json'),
+                {'modelVersions': [self._civitai_version(stat.st_size, 'another.safetensors'), self._civitai_version(stat.st_size)]},
+            )
+            self.assertEqual(read_sidecar_sha256(path, stat.st_mtime_ns, stat.st_size), DIGEST.lower())
+
+    def test_rejects_size_mismatch(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path, stat = self._write_model(temp_dir)
+            self._write_json(os.path.join(temp_dir, 'model.civitai.info'), self._civitai_version(stat.st_size * 4))
+            self.assertEqual(read_sidecar_sha256(path, stat.st_mtime_ns, stat.st_size), '')
+
+    def test_rejects_sidecar_older_than_model(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path, stat = self._write_model(temp_dir)
+            sidecar_path = f'{path}.sha256'
+            with open(sidecar_path, 'w', encoding='utf-8') as file:
+                file.write(DIGEST)
+            os.utime(sidecar_path, ns=(stat.st_atime_ns, stat.st_mtime_ns - 1))
+            self.assertEqual(read_sidecar_sha256(path, stat.st_mtime_ns, stat.st_size), '')
+
+    def test_hash_model_files_uses_sidecar_without_reading_model(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path, _stat = self._write_model(temp_dir)
+            with open(os.path.join(temp_dir, 'model.sha256'), 'w', encoding='utf-8') as file:
+                file.write(DIGEST)
+            logic._HASH_CACHE.pop(path, None)
+            try:
+                with mock.patch.object(logic, '_get_hash_store', return_value=None), mock.patch.object(
+                    logic, '_hash_file_uncached'
+                ) as mocked:
+                    self.assertEqual(logic.hash_model_files([path]), {path: DIGEST.lower()[:10]})
+                    mocked.assert_not_called()
+            finally:
+                logic._HASH_CACHE.pop(path, None)
+
+
+if __name__ == '__main__':
+    unittest.main()
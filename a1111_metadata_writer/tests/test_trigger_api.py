@@ -0,0 +1,162 @@
+import importlib
+import os
+import sys
+import tempfile
+import types
+import unittest
+
+
+class _DummyResponse:
+    def __init__(self, data=None, status: int = 200) -> None:
+        self.data = data
+        self.status = status
+
+
+class _DummyWebModule(types.SimpleNamespace):
+    def __init__(self) -> None:
+        super().__init__(
+            Request=object,
+            Response=object,
+            StreamResponse=object,
+            json_response=self.json_response,
+        )
+
+    @staticmethod
+    def json_response(payload, status: int = 200):
+        return _DummyResponse(payload, status=status)
+
+
+class _DummyRoutes:
+    def post(self, _path: str):
+        def decorator(handler):
+            return handler
+
+        return decorator
+
+    def get(self, _path: str):
+        def decorator(handler):
+            return handler
+
+        return decorator
+
+
+class _DummyPromptServer:
+    def __init__(self) -> None:
+        self.routes = _DummyRoutes()
+
+
+class _DummyRequest:
+    def __init__(self, payload=None, raise_error: bool = False) -> None:
+        self._payload = payload if payload is not None else {}
+        self._raise_error = raise_error
+
+    async def json(self):
+        if self._raise_error:
+            raise ValueError('boom')
+        return self._payload
+
+
+class _DummyWorker:
+    def __init__(self) -> None:
+        self.enabled = False
+        self.enqueued: list[tuple[list[str], int]] = []
+        self.scans = 0
+
+    def set_enabled(self, enabled: bool) -> None:
+        self.enabled = enabled
+
+    def set_busy_check(self, _is_busy) -> None:
+        pass
+
+    def enqueue(self, paths, priority):
+        self.enqueued.append((list(paths), priority))
+        return len(self.enqueued[-1][0])
+
+    def request_scan(self, provider, signature=None) -> bool:
+        self.scans += 1
+        self.provider = provider
+        self.signature = signature
+        return True
+
+    def stats(self):
+        return {'enabled': self.enabled, 'pending': 0}
+
+
+class A1111WriterTriggerApiTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self._modules_backup = dict(sys.modules)
+        sys.modules['server'] = types.SimpleNamespace(
+            PromptServer=types.SimpleNamespace(instance=_DummyPromptServer())
+        )
+        web_module = _DummyWebModule()
+        sys.modules['aiohttp'] = types.SimpleNamespace(web=web_module)
+        sys.modules['aiohttp.web'] = web_module
+        sys.modules['folder_paths'] = types.SimpleNamespace(
+            get_filename_list=lambda key: [f'{key}_a.safetensors', 'None'],
+            get_full_path=lambda key, name: f'/models/{key}/{name}',
+        )
+        sys.modules.pop('a1111_metadata_writer.ui.trigger_api', None)
+        self.trigger_api = importlib.import_module('a1111_metadata_writer.ui.trigger_api')
+        self.worker = _DummyWorker()
+        self._original_get_worker = self.trigger_api.logic.get_model_hash_worker
+        self.trigger_api.logic.get_model_hash_worker = lambda: self.worker
+
+    def tearDown(self) -> None:
+        self.trigger_api.logic.get_model_hash_worker = self._original_get_worker
+        sys.modules.clear()
+        sys.modules.update(self._modules_backup)
+
+    async def test_progress_returns_worker_stats(self) -> None:
+        response = await self.trigger_api.load_model_hash_progress(_DummyRequest())
+        self.assertEqual(response.data, {'ok': True, 'enabled': False, 'pending': 0})
+
+    async def test_scan_disabled_does_nothing(self) -> None:
+        response = await self.trigger_api.request_model_hash_scan(_DummyRequest({'enabled': False}))
+        self.assertEqual(response.status, 200)
+        self.assertFalse(self.worker.enabled)
+        self.assertEqual(self.worker.scans, 0)
+
+    async def test_scan_enqueues_requested_models_first(self) -> None:
+        response = await self.trigger_api.request_model_hash_scan(
+            _DummyRequest({'enabled': True, 'lora_names': ['a.safetensors', None], 'checkpoint_names': ['b.safetensors']})
+        )
+        self.assertEqual(response.status, 200)
+        self.assertTrue(self.worker.enabled)
+        self.assertEqual(
+            self.worker.enqueued,
+            [(['/models/loras/a.safetensors'], 0), (['/models/checkpoints/b.safetensors'], 0)],
+        )
+        self.assertEqual(self.worker.scans, 1)
+        self.assertEqual(
+            list(self.worker.provider()),
+            ['/models/loras/loras_a.safetensors', '/models/checkpoints/checkpoints_a.safetensors'],
+        )
+
+    async def test_scan_passes_model_folder_signature(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            nested = os.path.join(temp_dir, 'sdxl')
+            os.mkdir(nested)
+            self.trigger_api.folder_paths.get_folder_paths = lambda key: [temp_dir] if key == 'loras' else []
+            await self.trigger_api.request_model_hash_scan(_DummyRequest({'enabled': True}))
+            first = self.worker.signature
+            self.assertEqual([directory for directory, _mtime in first], [temp_dir, nested])
+            os.utime(nested, ns=(0, 0))
+            await self.trigger_api.request_model_hash_scan(_DummyRequest({'enabled': True}))
+        self.assertNotEqual(self.worker.signature, first)
+
+    async def test_scan_rejects_invalid_names(self) -> None:
+        response = await self.trigger_api.request_model_hash_scan(
+            _DummyRequest({'enabled': True, 'lora_names': 'a.safetensors'})
+        )
+        self.assertEqual(response.status, 400)
+        self.assertEqual(response.data, {'ok': False, 'error': 'invalid_lora_names'})
+
+    async def test_scan_handles_invalid_payload(self) -> None:
+        self.worker.enabled = True
+        response = await self.trigger_api.request_model_hash_scan(_DummyRequest(raise_error=True))
+        self.assertEqual(response.status, 200)
+        self.assertEqual(self.worker.scans, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,6 +4,7 @@ import re
 from typing import Any, ClassVar
 
 from ..logic import a1111_metadata as logic
+from ..logic.deferred_hashes import DeferredHashPatcher
 
 
 def _default_image_path() -> str:
@@ -27,6 +28,10 @@ class A1111MetadataWriter:
                 'suffix': ('STRING', {'default': '_a1111'}),
                 'format': (['png', 'webp'], {'default': 'png'}),
             },
+            'optional': {
+                'defer_hashes': ('BOOLEAN', {'default': False}),
+                'model_hash': (list(logic.MODEL_HASH_MODES), {'default': 'autov2'}),
+            },
             'hidden': {
                 'prompt': 'PROMPT',
                 'extra_pnginfo': 'EXTRA_PNGINFO',
@@ -44,12 +49,17 @@ class A1111MetadataWriter:
         overwrite: bool,
         suffix: str,
         format: str = 'png',
+        defer_hashes: bool = False,
+        model_hash: str = 'autov2',
         prompt: dict[str, Any] | None = None,
         extra_pnginfo: dict[str, Any] | None = None,
     ) -> dict[str, Any]:
         if prompt is None:
             return _build_result('', '', None)
-        parameters = logic.build_a1111_parameters_from_prompt(prompt)
+        # 待たずに保存する場合は、キャッシュにないハッシュを後から書き足す
+        pending_hashes: list[str] | None = [] if defer_hashes is True else None
+        model_hash = logic.normalize_model_hash_mode(model_hash)
+        parameters = logic.build_a1111_parameters_from_prompt(prompt, pending_hashes, model_hash)
         if not parameters:
             return _build_result('', '', None)
         pil_image = _image_to_pil(image)
@@ -64,6 +74,8 @@ class A1111MetadataWriter:
         else:
             pnginfo = _build_pnginfo(prompt, extra_pnginfo, parameters)
             pil_image.save(output_path, pnginfo=pnginfo)
+        if pending_hashes:
+            _DEFERRED_HASHES.submit(output_path, output_format, prompt, pending_hashes, model_hash)
         preview = _build_preview_payload(output_path)
         return _build_result(parameters, output_path, preview)
 
@@ -281,3 +293,10 @@ def _image_to_pil(image: Any):
         data = data[:, :, :3]
     array = np.clip(data * 255.0, 0, 255).astype(np.uint8)
     return Image.fromarray(array)
+
+
+_DEFERRED_HASHES = DeferredHashPatcher(
+    logic.get_model_hash_worker(),
+    logic.build_a1111_parameters_from_prompt,
+    _build_webp_exif,
+)
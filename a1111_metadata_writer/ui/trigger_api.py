@@ -0,0 +1,97 @@
+import asyncio
+import os
+from typing import Any, Iterator
+
+import server
+from aiohttp import web
+
+import folder_paths
+
+from ...craftgear_common.http_routes import is_prompt_running
+
+from ..logic import a1111_metadata as logic
+from ..logic.hash_worker import PRIORITY_REQUESTED
+
+_MODEL_FOLDERS = {
+    'lora_names': 'loras',
+    'checkpoint_names': 'checkpoints',
+}
+
+
+logic.get_model_hash_worker().set_busy_check(is_prompt_running)
+
+
+def _resolve_model_paths(folder_key: str, names: list[Any]) -> list[str]:
+    paths: list[str] = []
+    for name in names:
+        if not isinstance(name, str) or not name or name == 'None':
+            continue
+        try:
+            path = folder_paths.get_full_path(folder_key, name)
+        except Exception:
+            path = None
+        if path:
+            paths.append(path)
+    return paths
+
+
+def _iter_model_files() -> Iterator[str]:
+    for folder_key in _MODEL_FOLDERS.values():
+        try:
+            names = folder_paths.get_filename_list(folder_key)
+        except Exception:
+            continue
+        yield from _resolve_model_paths(folder_key, list(names))
+
+
+def _model_folder_signature() -> tuple[tuple[str, int], ...]:
+    entries: list[tuple[str, int]] = []
+    for folder_key in _MODEL_FOLDERS.values():
+        try:
+            roots = list(folder_paths.get_folder_paths(folder_key))
+        except Exception:
+            continue
+        for root in roots:
+            # ファイルの追加や削除は親フォルダの更新時刻に出るので、フォルダだけを見る
+            for directory, _dirs, _files in os.walk(root, followlinks=True):
+                try:
+                    entries.append((directory, os.stat(directory).st_mtime_ns))
+                except OSError:
+                    continue
+    return tuple(entries)
+
+
+def _progress_payload() -> dict[str, Any]:
+    return {'ok': True, **logic.get_model_hash_worker().stats()}
+
+
+@server.PromptServer.instance.routes.get('/my_custom_node/model_hash_progress')
+async def load_model_hash_progress(_request: web.Request) -> web.Response:
+    return web.json_response(_progress_payload())
+
+
+@server.PromptServer.instance.routes.post('/my_custom_node/model_hash_scan')
+async def request_model_hash_scan(request: web.Request) -> web.Response:
+    try:
+        data: dict[str, Any] = await request.json()
+    except Exception:
+        data = {}
+    if not isinstance(data, dict):
+        data = {}
+    worker = logic.get_model_hash_worker()
+    if 'enabled' in data:
+        worker.set_enabled(data.get('enabled') is True)
+    if not worker.enabled:
+        return web.json_response(_progress_payload())
+    for key, folder_key in _MODEL_FOLDERS.items():
+        names = data.get(key)
+        if names is None:
+            continue
+        if not isinstance(names, list):
+            return web.json_response({'ok': False, 'error': f'invalid_{key}'}, status=400)
+        # 開いているワークフローで使うモデルはフォルダ全体より先に計算する
+        worker.enqueue(_resolve_model_paths(folder_key, names), PRIORITY_REQUESTED)
+    if data.get('scan', True) is not False:
+        signature = await asyncio.get_running_loop().run_in_executor(None, _model_folder_signature)
+        worker.request_scan(_iter_model_files, signature)
+    return web.json_response(_progress_payload())
@@ -0,0 +1,138 @@
+import math
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable
+
+# 保持中のモデルは ComfyUI の「メモリ解放」でも手放せないので、既定では無効にして利用者が予算を決める
+DEFAULT_CHECKPOINT_CACHE_BUDGET_BYTES = 0
+_BYTES_PER_GB = 1024 * 1024 * 1024
+
+
+class CheckpointCache:
+    def __init__(self, budget_bytes: int = DEFAULT_CHECKPOINT_CACHE_BUDGET_BYTES) -> None:
+        self.budget_bytes = max(0, int(budget_bytes))
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[str, int, int, frozenset[str]], tuple[Any, int]] = OrderedDict()
+        self._used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get_or_load(
+        self,
+        path: str,
+        loader: Callable[[], Any],
+        components: frozenset[str] = frozenset(),
+    ) -> Any:
+        file_key = _cache_key(path)
+        if file_key is None:
+            return loader()
+        with self._lock:
+            key = self._find(file_key, components)
+            if key is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+        value = loader()
+        self.put((*file_key, frozenset(components)), value)
+        return value
+
+    def contains(self, path: str, components: frozenset[str] = frozenset()) -> bool:
+        file_key = _cache_key(path)
+        if file_key is None:
+            return False
+        with self._lock:
+            return self._find(file_key, components) is not None
+
+    def put(self, key: tuple[str, int, int, frozenset[str]], value: Any) -> None:
+        # 読み込んだ state dict はおおむねファイルサイズ分の RAM を使う
+        cost = key[2]
+        with self._lock:
+            self._discard_superseded(key)
+            if cost > self.budget_bytes:
+                return
+            self._entries[key] = (value, cost)
+            self._used_bytes += cost
+            self._evict()
+
+    def set_budget(self, budget_bytes: int) -> None:
+        with self._lock:
+            self.budget_bytes = max(0, int(budget_bytes))
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._used_bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "budget_bytes": self.budget_bytes,
+                "used_bytes": self._used_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": [
+                    {"path": path, "size": size, "components": sorted(components)}
+                    for path, _mtime_ns, size, components in reversed(self._entries)
+                ],
+            }
+
+    def _find(
+        self,
+        file_key: tuple[str, int, int],
+        components: frozenset[str],
+    ) -> tuple[str, int, int, frozenset[str]] | None:
+        # 必要な部品をすべて含むエントリなら使い回せる
+        for key in reversed(self._entries):
+            if key[:3] == file_key and components <= key[3]:
+                return key
+        return None
+
+    def _discard_superseded(self, key: tuple[str, int, int, frozenset[str]]) -> None:
+        for existing in list(self._entries):
+            if existing[0] != key[0]:
+                continue
+            if existing[:3] == key[:3] and not existing[3] <= key[3]:
+                continue
+            _value, cost = self._entries.pop(existing)
+            self._used_bytes -= cost
+
+    def _evict(self) -> None:
+        while self._entries and self._used_bytes > self.budget_bytes:
+            _key, (_value, cost) = self._entries.popitem(last=False)
+            self._used_bytes -= cost
+
+
+def _cache_key(path: str) -> tuple[str, int, int] | None:
+    if not path:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+
+def parse_budget_gb(value: Any) -> int | None:
+    try:
+        budget_gb = float(value)
+    except (TypeError, ValueError):
+        return None
+    if not math.isfinite(budget_gb) or budget_gb < 0:
+        return None
+    return int(budget_gb * _BYTES_PER_GB)
+
+
+_CACHE = CheckpointCache()
+
+
+def get_checkpoint_cache() -> CheckpointCache:
+    return _CACHE
@@ -0,0 +1,143 @@
+import os
+import threading
+from typing import Any
+
+from ...craftgear_common.safetensors_header import read_safetensors_header
+
+_DTYPE_LABELS = {
+    "F64": "fp64",
+    "F32": "fp32",
+    "F16": "fp16",
+    "BF16": "bf16",
+    "F8_E4M3": "fp8_e4m3fn",
+    "F8_E5M2": "fp8_e5m2",
+}
+# 先に一致したものを採用するため、より特徴的なキーから並べる
+_ARCHITECTURE_PATTERNS = (
+    ("Flux", ("double_blocks.", "single_blocks.")),
+    ("SD3", ("joint_blocks.",)),
+    ("SDXL", ("conditioner.embedders.1.",)),
+    ("SDXL Refiner", ("conditioner.embedders.0.model.",)),
+    ("SD2", ("cond_stage_model.model.",)),
+    ("SD1", ("cond_stage_model.transformer.",)),
+)
+_COMPONENT_PREFIXES = (
+    ("model", ("model.diffusion_model.",)),
+    ("clip", ("cond_stage_model.", "conditioner.", "text_encoders.")),
+    ("vae", ("first_stage_model.", "vae.")),
+)
+
+
+def summarize_safetensors_header(header: dict[str, Any]) -> dict[str, Any]:
+    metadata = header.get("__metadata__")
+    if not isinstance(metadata, dict):
+        metadata = {}
+    dtype_bytes: dict[str, int] = {}
+    parameters = 0
+    tensors = 0
+    keys: list[str] = []
+    for key, info in header.items():
+        if key == "__metadata__" or not isinstance(info, dict):
+            continue
+        keys.append(key)
+        tensors += 1
+        count = 1
+        for dimension in info.get("shape") or []:
+            try:
+                count *= int(dimension)
+            except (TypeError, ValueError):
+                count = 0
+                break
+        parameters += count
+        offsets = info.get("data_offsets") or [0, 0]
+        try:
+            size = int(offsets[1]) - int(offsets[0])
+        except (TypeError, ValueError, IndexError):
+            size = 0
+        dtype = str(info.get("dtype", ""))
+        dtype_bytes[dtype] = dtype_bytes.get(dtype, 0) + max(0, size)
+    dominant = max(dtype_bytes.items(), key=lambda item: item[1])[0] if dtype_bytes else ""
+    return {
+        "format": "safetensors",
+        "architecture": _detect_architecture(keys, metadata),
+        "dtype": _DTYPE_LABELS.get(dominant, dominant.lower()),
+        "dtypes": {
+            _DTYPE_LABELS.get(dtype, dtype.lower()): size
+            for dtype, size in sorted(dtype_bytes.items(), key=lambda item: -item[1])
+        },
+        "components": _detect_components(keys),
+        "parameters": parameters,
+        "tensors": tensors,
+        "modelspec": {
+            key[len("modelspec."):]: str(value)
+            for key, value in metadata.items()
+            if key.startswith("modelspec.") and key != "modelspec.thumbnail"
+        },
+    }
+
+
+def _detect_architecture(keys: list[str], metadata: dict[str, Any]) -> str:
+    declared = str(metadata.get("modelspec.architecture", "")).strip()
+    if declared:
+        return declared
+    for label, patterns in _ARCHITECTURE_PATTERNS:
+        if any(pattern in key for key in keys for pattern in patterns):
+            return label
+    return "unknown"
+
+
+def _detect_components(keys: list[str]) -> list[str]:
+    components = []
+    for label, prefixes in _COMPONENT_PREFIXES:
+        if any(key.startswith(prefixes) for key in keys):
+            components.append(label)
+    return components
+
+
+class CheckpointHeaderCache:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: dict[str, tuple[int, int, dict[str, Any]]] = {}
+
+    def describe(self, path: str) -> dict[str, Any] | None:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        with self._lock:
+            cached = self._entries.get(path)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+        summary = _describe_file(path)
+        summary["size"] = stat.st_size
+        with self._lock:
+            self._entries[path] = (stat.st_mtime_ns, stat.st_size, summary)
+        return summary
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def _describe_file(path: str) -> dict[str, Any]:
+    extension = os.path.splitext(path)[1].lower()
+    if extension != ".safetensors":
+        # pickle 形式はヘッダーだけを安全に読めないので中身は見ない
+        return {"format": extension.lstrip(".") or "unknown", "architecture": "unknown"}
+    header = read_safetensors_header(path)
+    if header is None:
+        return {"format": "safetensors", "architecture": "unknown", "error": "invalid_header"}
+    return summarize_safetensors_header(header)
+
+
+_HEADER_CACHE = CheckpointHeaderCache()
+
+
+def get_checkpoint_header_cache() -> CheckpointHeaderCache:
+    return _HEADER_CACHE
+
+
+def describe_checkpoint(path: str) -> dict[str, Any] | None:
+    if not path:
+        return None
+    return _HEADER_CACHE.describe(path)
@@ -0,0 +1,46 @@
+from typing import Callable
+
+from ...craftgear_common.page_cache import PageCacheWarmer
+
+DEFAULT_PRELOAD_BUDGET_BYTES = 8 * 1024 * 1024 * 1024
+_BUSY_POLL_SECONDS = 0.5
+
+
+class CheckpointPreloader(PageCacheWarmer):
+    def __init__(
+        self,
+        budget_bytes: int = DEFAULT_PRELOAD_BUDGET_BYTES,
+        is_busy: Callable[[], bool] | None = None,
+        busy_poll: float = _BUSY_POLL_SECONDS,
+    ) -> None:
+        super().__init__(
+            budget_bytes,
+            is_busy=is_busy,
+            busy_poll=busy_poll,
+            latest_only=True,
+            thread_name="craftgear-checkpoint-preload",
+        )
+        self.enabled = False
+
+
+def select_preload_candidate(recent: list[str], slot_names: list[str], active: str) -> str:
+    candidates = [name for name in slot_names if name and name != active]
+    if not candidates:
+        return ""
+    for name in recent:
+        if name in candidates:
+            return name
+    # 履歴がなければスロット順でアクティブの次を選ぶ
+    if active in slot_names:
+        start = slot_names.index(active) + 1
+        for name in slot_names[start:] + slot_names[:start]:
+            if name in candidates:
+                return name
+    return candidates[0]
+
+
+_PRELOADER = CheckpointPreloader()
+
+
+def get_checkpoint_preloader() -> CheckpointPreloader:
+    return _PRELOADER
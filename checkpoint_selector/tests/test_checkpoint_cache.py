@@ -0,0 +1,125 @@
+import os
+import tempfile
+import unittest
+
+from craftgear_common.tests.bootstrap import install
+
+install()
+
+from checkpoint_selector.logic.checkpoint_cache import CheckpointCache, parse_budget_gb  # noqa: E402
+
+
+class CheckpointCacheTest(unittest.TestCase):
+    def _write(self, path: str, size: int) -> None:
+        with open(path, 'wb') as file:
+            file.write(b'\x00' * size)
+
+    def test_reuses_loaded_checkpoint(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'a.safetensors')
+            self._write(path, 16)
+            cache = CheckpointCache(budget_bytes=1024)
+            calls = []
+
+            def loader():
+                calls.append(path)
+                return ('model', 'clip', 'vae')
+
+            self.assertEqual(cache.get_or_load(path, loader), ('model', 'clip', 'vae'))
+            self.assertEqual(cache.get_or_load(path, loader), ('model', 'clip', 'vae'))
+            self.assertEqual(len(calls), 1)
+            self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_disabled_by_default(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'a.safetensors')
+            self._write(path, 16)
+            cache = CheckpointCache()
+            calls = []
+            cache.get_or_load(path, lambda: calls.append(path))
+            cache.get_or_load(path, lambda: calls.append(path))
+            self.assertEqual(len(calls), 2)
+            self.assertEqual(len(cache), 0)
+
+    def test_reloads_after_modification(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'a.safetensors')
+            self._write(path, 16)
+            cache = CheckpointCache(budget_bytes=1024)
+            cache.get_or_load(path, lambda: 'old')
+            self._write(path, 32)
+            self.assertEqual(cache.get_or_load(path, lambda: 'new'), 'new')
+            self.assertEqual(len(cache), 1)
+
+    def test_evicts_least_recently_used_over_budget(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            first = os.path.join(temp_dir, 'a.safetensors')
+            second = os.path.join(temp_dir, 'b.safetensors')
+            third = os.path.join(temp_dir, 'c.safetensors')
+            for path in (first, second, third):
+                self._write(path, 400)
+            cache = CheckpointCache(budget_bytes=1000)
+            cache.get_or_load(first, lambda: 'a')
+            cache.get_or_load(second, lambda: 'b')
+            cache.get_or_load(first, lambda: 'a')
+            cache.get_or_load(third, lambda: 'c')
+            self.assertTrue(cache.contains(first))
+            self.assertFalse(cache.contains(second))
+            self.assertTrue(cache.contains(third))
+
+    def test_skips_files_larger_than_budget(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'big.safetensors')
+            self._write(path, 2048)
+            cache = CheckpointCache(budget_bytes=1024)
+            self.assertEqual(cache.get_or_load(path, lambda: 'big'), 'big')
+            self.assertFalse(cache.contains(path))
+
+    def test_shrinking_budget_evicts(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'a.safetensors')
+            self._write(path, 64)
+            cache = CheckpointCache(budget_bytes=1024)
+            cache.get_or_load(path, lambda: 'a')
+            cache.set_budget(0)
+            self.assertEqual(len(cache), 0)
+            self.assertEqual(cache.stats()['used_bytes'], 0)
+
+    def test_missing_file_bypasses_cache(self) -> None:
+        cache = CheckpointCache(budget_bytes=1024)
+        self.assertEqual(cache.get_or_load('/nonexistent/a.safetensors', lambda: 'x'), 'x')
+        self.assertEqual(len(cache), 0)
+
+    def test_reuses_entry_with_more_components(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'a.safetensors')
+            self._write(path, 16)
+            cache = CheckpointCache(budget_bytes=1024)
+            full = frozenset({'clip', 'vae'})
+            cache.get_or_load(path, lambda: 'full', full)
+            self.assertEqual(cache.get_or_load(path, lambda: 'model', frozenset()), 'full')
+            self.assertEqual(cache.misses, 1)
+
+    def test_loads_again_when_component_missing(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'a.safetensors')
+            self._write(path, 16)
+            cache = CheckpointCache(budget_bytes=1024)
+            cache.get_or_load(path, lambda: 'model', frozenset())
+            full = frozenset({'clip', 'vae'})
+            self.assertEqual(cache.get_or_load(path, lambda: 'full', full), 'full')
+            # 部品の少ないエントリは置き換えられる
+            self.assertEqual(len(cache), 1)
+            self.assertEqual(cache.stats()['used_bytes'], 16)
+
+    def test_parse_budget_gb(self) -> None:
+        self.assertEqual(parse_budget_gb(1), 1024 * 1024 * 1024)
+        self.assertEqual(parse_budget_gb('0.5'), 512 * 1024 * 1024)
+        self.assertEqual(parse_budget_gb(0), 0)
+        self.assertIsNone(parse_budget_gb(-1))
+        self.assertIsNone(parse_budget_gb('abc'))
+        self.assertIsNone(parse_budget_gb(float('inf')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import json
+import os
+import tempfile
+import unittest
+
+from craftgear_common.tests.bootstrap import install
+
+install()
+
+from checkpoint_selector.logic.checkpoint_header import (  # noqa: E402
+    CheckpointHeaderCache,
+    summarize_safetensors_header,
+)
+from craftgear_common.safetensors_header import read_safetensors_header  # noqa: E402
+
+
+def _write_safetensors(path: str, tensors: dict, metadata: dict | None = None) -> None:
+    header = {}
+    offset = 0
+    for key, (dtype, shape, size) in tensors.items():
+        header[key] = {"dtype": dtype, "shape": shape, "data_offsets": [offset, offset + size]}
+        offset += size
+    if metadata is not None:
+        header["__metadata__"] = metadata
+    encoded = json.dumps(header).encode("utf-8")
+    with open(path, "wb") as file:
+        file.write(len(encoded).to_bytes(8, "little"))
+        file.write(encoded)
+        file.write(b"\x00" * offset)
+
+
+class CheckpointHeaderTest(unittest.TestCase):
+    def test_summarizes_sdxl_checkpoint(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "sdxl.safetensors")
+            _write_safetensors(
+                path,
+                {
+                    "model.diffusion_model.input_blocks.0.0.weight": ("F16", [4, 8], 64),
+                    "conditioner.embedders.1.model.ln_final.weight": ("F16", [8], 16),
+                    "first_stage_model.decoder.conv_in.weight": ("F32", [2], 8),
+                },
+            )
+            summary = summarize_safetensors_header(read_safetensors_header(path))
+        self.assertEqual(summary["architecture"], "SDXL")
+        self.assertEqual(summary["dtype"], "fp16")
+        self.assertEqual(summary["dtypes"], {"fp16": 80, "fp32": 8})
+        self.assertEqual(summary["components"], ["model", "clip", "vae"])
+        self.assertEqual(summary["parameters"], 42)
+        self.assertEqual(summary["tensors"], 3)
+
+    def test_prefers_modelspec_architecture(self) -> None:
+        header = {
+            "__metadata__": {
+                "modelspec.architecture": "stable-diffusion-xl-v1-base",
+                "modelspec.title": "Demo",
+                "modelspec.thumbnail": "data:image/png;base64,AAAA",
+            },
+            "double_blocks.0.img_attn.qkv.weight": {
+                "dtype": "BF16",
+                "shape": [2],
+                "data_offsets": [0, 4],
+            },
+        }
+        summary = summarize_safetensors_header(header)
+        self.assertEqual(summary["architecture"], "stable-diffusion-xl-v1-base")
+        self.assertEqual(summary["modelspec"], {"architecture": "stable-diffusion-xl-v1-base", "title": "Demo"})
+
+    def test_detects_flux_from_keys(self) -> None:
+        header = {
+            "model.diffusion_model.double_blocks.0.img_attn.qkv.weight": {
+                "dtype": "F8_E4M3",
+                "shape": [2, 2],
+                "data_offsets": [0, 4],
+            },
+        }
+        summary = summarize_safetensors_header(header)
+        self.assertEqual(summary["architecture"], "Flux")
+        self.assertEqual(summary["dtype"], "fp8_e4m3fn")
+        self.assertEqual(summary["components"], ["model"])
+
+    def test_rejects_invalid_header(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "broken.safetensors")
+            with open(path, "wb") as file:
+                file.write((10).to_bytes(8, "little") + b"not json!!")
+            self.assertIsNone(read_safetensors_header(path))
+            summary = CheckpointHeaderCache().describe(path)
+        self.assertEqual(summary["error"], "invalid_header")
+
+    def test_cache_reuses_until_file_changes(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "a.safetensors")
+            _write_safetensors(path, {"cond_stage_model.transformer.x": ("F16", [2], 4)})
+            cache = CheckpointHeaderCache()
+            first = cache.describe(path)
+            self.assertIs(cache.describe(path), first)
+            self.assertEqual(first["architecture"], "SD1")
+            _write_safetensors(path, {"cond_stage_model.model.x": ("F16", [2, 2], 8)})
+            second = cache.describe(path)
+            self.assertEqual(second["size"], os.path.getsize(path))
+        self.assertEqual(second["architecture"], "SD2")
+
+    def test_non_safetensors_is_not_parsed(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "legacy.ckpt")
+            with open(path, "wb") as file:
+                file.write(b"\x80\x02")
+            summary = CheckpointHeaderCache().describe(path)
+        self.assertEqual(summary, {"format": "ckpt", "architecture": "unknown", "size": 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import os
+import tempfile
+import time
+import unittest
+
+from craftgear_common.tests.bootstrap import install
+
+install()
+
+from checkpoint_selector.logic.checkpoint_preload import (  # noqa: E402
+    CheckpointPreloader,
+    select_preload_candidate,
+)
+
+
+class CheckpointPreloaderTest(unittest.TestCase):
+    def _write(self, path: str, size: int) -> None:
+        with open(path, "wb") as file:
+            file.write(b"\x00" * size)
+
+    def _wait_until_warm(self, preloader: CheckpointPreloader, path: str) -> bool:
+        deadline = time.monotonic() + 5.0
+        while time.monotonic() < deadline:
+            if preloader.is_warm(path):
+                return True
+            time.sleep(0.01)
+        return False
+
+    def test_disabled_by_default(self) -> None:
+        preloader = CheckpointPreloader(budget_bytes=1024)
+        self.assertEqual(preloader.request("/nonexistent/a.safetensors"), "disabled")
+
+    def test_request_over_budget(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "big.safetensors")
+            self._write(path, 2048)
+            preloader = CheckpointPreloader(budget_bytes=1024)
+            preloader.set_enabled(True)
+            self.assertEqual(preloader.request(path), "over_budget")
+
+    def test_request_warms_in_background(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "a.safetensors")
+            self._write(path, 512)
+            preloader = CheckpointPreloader(budget_bytes=1024)
+            preloader.set_enabled(True)
+            self.assertEqual(preloader.request(path), "queued")
+            self.assertTrue(self._wait_until_warm(preloader, path))
+            self.assertEqual(preloader.request(path), "warm")
+
+    def test_backs_off_while_busy(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "a.safetensors")
+            self._write(path, 512)
+            busy = [True]
+            preloader = CheckpointPreloader(
+                budget_bytes=1024,
+                is_busy=lambda: busy[0],
+                busy_poll=0.01,
+            )
+            preloader.set_enabled(True)
+            self.assertEqual(preloader.request(path), "queued")
+            time.sleep(0.1)
+            self.assertFalse(preloader.is_warm(path))
+            busy[0] = False
+            self.assertTrue(self._wait_until_warm(preloader, path))
+
+    def test_budget_evicts_oldest(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            first = os.path.join(temp_dir, "a.safetensors")
+            second = os.path.join(temp_dir, "b.safetensors")
+            self._write(first, 600)
+            self._write(second, 600)
+            preloader = CheckpointPreloader(budget_bytes=1000)
+            preloader.set_enabled(True)
+            self.assertTrue(preloader.warm_now(first))
+            self.assertTrue(preloader.warm_now(second))
+            self.assertFalse(preloader.is_warm(first))
+            self.assertTrue(preloader.is_warm(second))
+
+
+class SelectPreloadCandidateTest(unittest.TestCase):
+    def test_prefers_most_recent_inactive_slot(self) -> None:
+        self.assertEqual(
+            select_preload_candidate(["b", "c", "a"], ["a", "b", "c"], "b"),
+            "c",
+        )
+
+    def test_falls_back_to_next_slot(self) -> None:
+        self.assertEqual(select_preload_candidate([], ["a", "b", "c"], "b"), "c")
+        self.assertEqual(select_preload_candidate([], ["a", "b", "c"], "c"), "a")
+
+    def test_ignores_empty_slots_and_removed_history(self) -> None:
+        self.assertEqual(select_preload_candidate(["x"], ["a", "", ""], "a"), "")
+        self.assertEqual(select_preload_candidate(["x"], ["a", "", "d"], "a"), "d")
+
+
+if __name__ == "__main__":
+    unittest.main()
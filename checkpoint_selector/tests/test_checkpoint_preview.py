@@ -2,10 +2,12 @@ import os
 import tempfile
 import unittest
 
-from checkpoint_selector.logic.checkpoint_preview import (
-    DEFAULT_IMAGE_EXTENSIONS,
-    select_checkpoint_preview_path,
-)
+from craftgear_common.tests.bootstrap import install
+
+install()
+
+from checkpoint_selector.logic.checkpoint_preview import select_checkpoint_preview_path  # noqa: E402
+from craftgear_common.preview_index import DEFAULT_IMAGE_EXTENSIONS  # noqa: E402
 
 
 class CheckpointPreviewSelectionTest(unittest.TestCase):
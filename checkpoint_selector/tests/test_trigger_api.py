@@ -4,6 +4,10 @@ import tempfile
 import types
 import unittest
 
+from craftgear_common.tests.bootstrap import install
+
+install()
+
 
 class _DummyResponse:
     def __init__(self, data=None, status: int = 200, path: str | None = None) -> None:
@@ -16,17 +20,28 @@ class _DummyWebModule(types.SimpleNamespace):
     def __init__(self) -> None:
         super().__init__(
             Request=object,
+            Response=self.Response,
+            StreamResponse=object,
             json_response=self.json_response,
             FileResponse=self.FileResponse,
         )
 
     @staticmethod
-    def json_response(payload, status: int = 200):
-        return _DummyResponse(payload, status=status)
+    def json_response(payload, status: int = 200, headers=None):
+        response = _DummyResponse(payload, status=status)
+        response.headers = headers or {}
+        return response
+
+    class Response(_DummyResponse):
+        def __init__(self, body: bytes = b"", status: int = 200, headers=None) -> None:
+            super().__init__(None, status=status)
+            self.body = body
+            self.headers = headers or {}
 
     class FileResponse(_DummyResponse):
-        def __init__(self, path: str) -> None:
+        def __init__(self, path: str, headers=None) -> None:
             super().__init__(None, status=200, path=path)
+            self.headers = headers or {}
 
 
 class _DummyRoutes:
@@ -36,6 +51,9 @@ class _DummyRoutes:
 
         return decorator
 
+    def get(self, path: str):
+        return self.post(path)
+
 
 class _DummyPromptServer:
     def __init__(self) -> None:
@@ -43,9 +61,11 @@ class _DummyPromptServer:
 
 
 class _DummyRequest:
-    def __init__(self, payload, raise_error: bool = False) -> None:
+    def __init__(self, payload, raise_error: bool = False, headers=None, query=None) -> None:
         self._payload = payload
         self._raise_error = raise_error
+        self.headers = headers or {}
+        self.query = query or {}
 
     async def json(self):
         if self._raise_error:
@@ -212,3 +232,136 @@ class TriggerApiTest(unittest.IsolatedAsyncioTestCase):
                 _DummyRequest({"checkpoint_name": "demo.safetensors"})
             )
             self.assertEqual(response.path, preview_path)
+
+    async def test_get_checkpoint_preview_returns_not_modified(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            ckpt_path = os.path.join(temp_dir, "demo.safetensors")
+            preview_path = os.path.join(temp_dir, "demo.png")
+            for path in (ckpt_path, preview_path):
+                with open(path, "wb") as file:
+                    file.write(b"image")
+            self.trigger_api.folder_paths.get_full_path = (
+                lambda *_args, **_kwargs: ckpt_path
+            )
+            self.trigger_api.select_checkpoint_preview_path = (
+                lambda *_args, **_kwargs: preview_path
+            )
+            query = {"checkpoint_name": "demo.safetensors", "size": "0"}
+            first = await self.trigger_api.get_checkpoint_preview(_DummyRequest(None, query=query))
+            cached = await self.trigger_api.get_checkpoint_preview(
+                _DummyRequest(None, query=query, headers={"If-None-Match": first.headers["ETag"]})
+            )
+        self.assertEqual(first.path, preview_path)
+        self.assertEqual(first.headers["Cache-Control"], "private, no-cache")
+        self.assertEqual(cached.status, 304)
+
+    async def test_load_checkpoint_preview_serves_thumbnail(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            ckpt_path = os.path.join(temp_dir, "demo.safetensors")
+            preview_path = os.path.join(temp_dir, "demo.png")
+            with open(ckpt_path, "wb") as file:
+                file.write(b"")
+            self.trigger_api.folder_paths.get_full_path = (
+                lambda *_args, **_kwargs: ckpt_path
+            )
+            self.trigger_api.select_checkpoint_preview_path = (
+                lambda *_args, **_kwargs: preview_path
+            )
+            original_select_file = self.trigger_api.select_checkpoint_preview_file
+            self.trigger_api.select_checkpoint_preview_file = (
+                lambda _path, _size: ("/cache/thumb.webp", "image/webp")
+            )
+            try:
+                response = await self.trigger_api.load_checkpoint_preview(
+                    _DummyRequest({"checkpoint_name": "demo.safetensors", "size": 256})
+                )
+            finally:
+                self.trigger_api.select_checkpoint_preview_file = original_select_file
+            self.assertEqual(response.path, "/cache/thumb.webp")
+            self.assertEqual(response.headers, {"Content-Type": "image/webp"})
+
+    async def test_checkpoint_cache_budget_update(self) -> None:
+        cache = self.trigger_api.get_checkpoint_cache()
+        original_budget = cache.budget_bytes
+        try:
+            response = await self.trigger_api.update_checkpoint_cache(
+                _DummyRequest({"budget_gb": 2})
+            )
+            self.assertTrue(response.data["ok"])
+            self.assertEqual(response.data["budget_bytes"], 2 * 1024 * 1024 * 1024)
+            response = await self.trigger_api.load_checkpoint_cache_stats(
+                _DummyRequest({})
+            )
+            self.assertEqual(response.data["budget_bytes"], 2 * 1024 * 1024 * 1024)
+        finally:
+            cache.set_budget(original_budget)
+
+    async def test_checkpoint_cache_preload_toggle(self) -> None:
+        preloader = self.trigger_api.get_checkpoint_preloader()
+        try:
+            response = await self.trigger_api.update_checkpoint_cache(
+                _DummyRequest({"preload": True})
+            )
+            self.assertTrue(response.data["preload"]["enabled"])
+            response = await self.trigger_api.update_checkpoint_cache(
+                _DummyRequest({"preload": False})
+            )
+            self.assertFalse(response.data["preload"]["enabled"])
+        finally:
+            preloader.set_enabled(False)
+
+    async def test_load_checkpoint_info_batches_names(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            ckpt_path = os.path.join(temp_dir, "demo.ckpt")
+            with open(ckpt_path, "wb") as file:
+                file.write(b"1234")
+            self.trigger_api.folder_paths.get_full_path = (
+                lambda _category, name: ckpt_path if name == "demo.ckpt" else None
+            )
+            response = await self.trigger_api.load_checkpoint_info(
+                _DummyRequest({"checkpoint_names": ["demo.ckpt", "missing.safetensors"]})
+            )
+        self.assertTrue(response.data["ok"])
+        self.assertEqual(response.data["items"]["demo.ckpt"]["size"], 4)
+        self.assertEqual(
+            response.data["items"]["missing.safetensors"], {"error": "not_found"}
+        )
+
+    async def test_load_checkpoint_info_rejects_invalid_names(self) -> None:
+        response = await self.trigger_api.load_checkpoint_info(
+            _DummyRequest({"checkpoint_names": "demo.ckpt"})
+        )
+        self.assertEqual(response.status, 400)
+
+    async def test_checkpoint_cache_rejects_invalid_budget(self) -> None:
+        response = await self.trigger_api.update_checkpoint_cache(
+            _DummyRequest({"budget_gb": "abc"})
+        )
+        self.assertEqual(response.status, 400)
+        self.assertEqual(response.data, {"ok": False, "error": "invalid_budget"})
+
+    async def test_load_checkpoint_preview_batch_returns_multipart(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            ckpt_path = os.path.join(temp_dir, "demo.safetensors")
+            with open(ckpt_path, "wb") as file:
+                file.write(b"")
+            with open(os.path.join(temp_dir, "demo.png"), "wb") as file:
+                file.write(b"image")
+            self.trigger_api.folder_paths.get_full_path = (
+                lambda _folder, name: ckpt_path if name == "demo.safetensors" else None
+            )
+            response = await self.trigger_api.load_checkpoint_preview_batch(
+                _DummyRequest({"checkpoint_names": ["demo.safetensors", "missing.ckpt"]})
+            )
+        content_type = response.headers["Content-Type"]
+        self.assertTrue(content_type.startswith("multipart/form-data; boundary="))
+        self.assertIn(b'name="demo.safetensors"; filename="demo.png"', response.body)
+        self.assertIn(b"\r\n\r\nimage\r\n", response.body)
+        self.assertNotIn(b"missing.ckpt", response.body)
+
+    async def test_load_checkpoint_preview_batch_rejects_invalid_names(self) -> None:
+        response = await self.trigger_api.load_checkpoint_preview_batch(
+            _DummyRequest({"checkpoint_names": "demo.ckpt"})
+        )
+        self.assertEqual(response.status, 400)
+        self.assertEqual(response.data, {"ok": False, "error": "invalid_checkpoint_names"})
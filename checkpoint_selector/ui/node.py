@@ -5,7 +5,12 @@ from typing import Any, ClassVar
 import comfy.sd
 import folder_paths
 
+from ..logic.checkpoint_cache import get_checkpoint_cache
+from ..logic.checkpoint_preload import get_checkpoint_preloader, select_preload_candidate
+
 MAX_CHECKPOINT_STACK = 20
+MAX_RECENT_CHECKPOINTS = MAX_CHECKPOINT_STACK
+_COMPONENT_TOGGLES = {"load_clip": "clip", "load_vae": "vae"}
 
 
 def _normalize_checkpoint_name(value: Any) -> str:
@@ -125,7 +130,19 @@ def _resolve_active_slot(kwargs: dict[str, Any]) -> int:
     return 1
 
 
+def _resolve_components(kwargs: dict[str, Any]) -> frozenset[str]:
+    # 入力に無い古いワークフローでは従来どおりすべて読み込む
+    return frozenset(
+        component
+        for name, component in _COMPONENT_TOGGLES.items()
+        if kwargs.get(name, True) is not False
+    )
+
+
 class CheckpointSelector:
+    def __init__(self) -> None:
+        self.recent_checkpoints: list[str] = []
+
     @classmethod
     def INPUT_TYPES(cls) -> dict[str, dict[str, Any]]:
         base_options = folder_paths.get_filename_list("checkpoints")
@@ -139,6 +156,8 @@ class CheckpointSelector:
             required[f"slot_active_{index}"] = ("BOOLEAN", {"default": index == 1})
         optional: dict[str, Any] = {
             "model_json": ("STRING", {"default": "{}", "forceInput": True}),
+            "load_clip": ("BOOLEAN", {"default": True}),
+            "load_vae": ("BOOLEAN", {"default": True}),
         }
         return {"required": required, "optional": optional}
 
@@ -189,11 +208,42 @@ class CheckpointSelector:
         if not ckpt_path:
             # パス解決できないと ComfyUI 側で None が渡り例外になるため
             raise ValueError(f"Checkpoint not found: {ckpt_name}")
+        # load_clip / load_vae が False の部品は読み込まずにメモリと時間を節約する
+        components = _resolve_components(kwargs)
         # ComfyUI の標準ローダーと同じ解決方法に合わせる
-        result = comfy.sd.load_checkpoint_guess_config(
+        result = get_checkpoint_cache().get_or_load(
             ckpt_path,
-            output_vae=True,
-            output_clip=True,
-            embedding_directory=folder_paths.get_folder_paths("embeddings"),
+            lambda: comfy.sd.load_checkpoint_guess_config(
+                ckpt_path,
+                output_vae="vae" in components,
+                output_clip="clip" in components,
+                embedding_directory=folder_paths.get_folder_paths("embeddings"),
+            )[:3],
+            components,
         )
-        return result[:3]
+        self._remember_recent(ckpt_name)
+        self._schedule_preload(kwargs, options, ckpt_name)
+        return result
+
+    def _remember_recent(self, ckpt_name: str) -> None:
+        if ckpt_name in self.recent_checkpoints:
+            self.recent_checkpoints.remove(ckpt_name)
+        self.recent_checkpoints.insert(0, ckpt_name)
+        del self.recent_checkpoints[MAX_RECENT_CHECKPOINTS:]
+
+    def _schedule_preload(self, kwargs: dict[str, Any], options: list[str], active: str) -> str:
+        preloader = get_checkpoint_preloader()
+        if not preloader.enabled:
+            return ""
+        slot_names = [
+            _resolve_checkpoint(kwargs.get(f"ckpt_name_{index}", ""), options)
+            for index in range(1, MAX_CHECKPOINT_STACK + 1)
+        ]
+        candidate = select_preload_candidate(self.recent_checkpoints, slot_names, active)
+        if not candidate:
+            return ""
+        candidate_path = folder_paths.get_full_path("checkpoints", candidate)
+        if not candidate_path or get_checkpoint_cache().contains(candidate_path):
+            return ""
+        preloader.request(candidate_path)
+        return candidate
@@ -1,3 +1,4 @@
+import asyncio
 import os
 import subprocess
 import sys
@@ -8,12 +9,36 @@ import server
 import folder_paths
 from aiohttp import web
 
+from ...craftgear_common.http_compression import json_response
+from ...craftgear_common.http_routes import is_prompt_running, preview_file_response
+from ...craftgear_common.preview_batch import (
+    DEFAULT_BATCH_PREVIEW_SIZE,
+    collect_preview_batch,
+    encode_multipart_previews,
+    parse_batch_names,
+)
+from ...craftgear_common.preview_index import DEFAULT_IMAGE_EXTENSIONS
+
+from ..logic.checkpoint_cache import get_checkpoint_cache, parse_budget_gb
+from ..logic.checkpoint_header import describe_checkpoint
+from ..logic.checkpoint_preload import get_checkpoint_preloader
 from ..logic.checkpoint_preview import (
-    DEFAULT_IMAGE_EXTENSIONS,
+    select_checkpoint_preview_file,
     select_checkpoint_preview_path,
 )
 
 
+get_checkpoint_preloader().set_busy_check(is_prompt_running)
+
+
+def _cache_stats() -> dict[str, Any]:
+    return {
+        "ok": True,
+        **get_checkpoint_cache().stats(),
+        "preload": get_checkpoint_preloader().stats(),
+    }
+
+
 def _open_folder(path: str) -> bool:
     try:
         if sys.platform.startswith("win"):
@@ -51,12 +76,9 @@ async def open_checkpoint_folder(request: web.Request) -> web.Response:
     return web.json_response({"ok": opened})
 
 
-@server.PromptServer.instance.routes.post("/my_custom_node/checkpoint_preview")
-async def load_checkpoint_preview(request: web.Request) -> web.StreamResponse:
-    try:
-        data: dict[str, Any] = await request.json()
-    except Exception:
-        data = {}
+async def _checkpoint_preview_response(
+    request: web.Request, data: Any
+) -> web.StreamResponse:
     checkpoint_name = (
         data.get("checkpoint_name") if isinstance(data, dict) else ""
     )
@@ -72,4 +94,97 @@ async def load_checkpoint_preview(request: web.Request) -> web.StreamResponse:
     )
     if not preview_path:
         return web.json_response({"ok": False, "error": "no_preview"}, status=404)
-    return web.FileResponse(preview_path)
+    return await preview_file_response(
+        request, preview_path, data.get("size"), select_checkpoint_preview_file
+    )
+
+
+@server.PromptServer.instance.routes.post("/my_custom_node/checkpoint_preview")
+async def load_checkpoint_preview(request: web.Request) -> web.StreamResponse:
+    try:
+        data: dict[str, Any] = await request.json()
+    except Exception:
+        data = {}
+    return await _checkpoint_preview_response(request, data)
+
+
+@server.PromptServer.instance.routes.get("/my_custom_node/checkpoint_preview")
+async def get_checkpoint_preview(request: web.Request) -> web.StreamResponse:
+    return await _checkpoint_preview_response(request, dict(request.query))
+
+
+def _checkpoint_preview_batch(checkpoint_names: list[str], size: Any) -> tuple[bytes, str]:
+    entries = collect_preview_batch(
+        checkpoint_names,
+        lambda name: folder_paths.get_full_path("checkpoints", name),
+        size,
+    )
+    return encode_multipart_previews(entries)
+
+
+@server.PromptServer.instance.routes.post("/my_custom_node/checkpoint_preview_batch")
+async def load_checkpoint_preview_batch(request: web.Request) -> web.Response:
+    try:
+        data: dict[str, Any] = await request.json()
+    except Exception:
+        data = {}
+    if not isinstance(data, dict):
+        data = {}
+    checkpoint_names = parse_batch_names(data.get("checkpoint_names"))
+    if checkpoint_names is None:
+        return web.json_response({"ok": False, "error": "invalid_checkpoint_names"}, status=400)
+    body, content_type = await asyncio.get_running_loop().run_in_executor(
+        None, _checkpoint_preview_batch, checkpoint_names, data.get("size", DEFAULT_BATCH_PREVIEW_SIZE)
+    )
+    return web.Response(body=body, headers={"Content-Type": content_type})
+
+
+@server.PromptServer.instance.routes.get("/my_custom_node/checkpoint_cache")
+async def load_checkpoint_cache_stats(_request: web.Request) -> web.Response:
+    return web.json_response(_cache_stats())
+
+
+@server.PromptServer.instance.routes.post("/my_custom_node/checkpoint_cache")
+async def update_checkpoint_cache(request: web.Request) -> web.Response:
+    try:
+        data: dict[str, Any] = await request.json()
+    except Exception:
+        data = {}
+    if not isinstance(data, dict):
+        data = {}
+    if "budget_gb" in data:
+        budget_bytes = parse_budget_gb(data.get("budget_gb"))
+        if budget_bytes is None:
+            return web.json_response({"ok": False, "error": "invalid_budget"}, status=400)
+        get_checkpoint_cache().set_budget(budget_bytes)
+    if "preload" in data:
+        get_checkpoint_preloader().set_enabled(data.get("preload") is True)
+    return web.json_response(_cache_stats())
+
+
+def _describe_checkpoints(checkpoint_names: list[str]) -> dict[str, Any]:
+    items: dict[str, Any] = {}
+    for checkpoint_name in checkpoint_names:
+        ckpt_path = folder_paths.get_full_path("checkpoints", checkpoint_name)
+        summary = describe_checkpoint(ckpt_path) if ckpt_path else None
+        items[checkpoint_name] = summary if summary is not None else {"error": "not_found"}
+    return items
+
+
+@server.PromptServer.instance.routes.post("/my_custom_node/checkpoint_info")
+async def load_checkpoint_info(request: web.Request) -> web.Response:
+    try:
+        data: dict[str, Any] = await request.json()
+    except Exception:
+        data = {}
+    names = data.get("checkpoint_names") if isinstance(data, dict) else None
+    if names is None:
+        names = folder_paths.get_filename_list("checkpoints")
+    if not isinstance(names, list):
+        return web.json_response({"ok": False, "error": "invalid_checkpoint_names"}, status=400)
+    checkpoint_names = [str(name) for name in names if name and name != "None"]
+    # 初回はファイル数ぶんヘッダーを読むのでイベントループを塞がない
+    items = await asyncio.get_running_loop().run_in_executor(
+        None, _describe_checkpoints, checkpoint_names
+    )
+    return json_response(request, {"ok": True, "items": items})
@@ -0,0 +1,120 @@
+import base64
+import binascii
+import os
+import tempfile
+import threading
+
+from .preview_thumbnails import get_thumbnail_cache, thumbnail_key
+from .safetensors_header import read_safetensors_metadata
+
+_THUMBNAIL_METADATA_KEY = 'modelspec.thumbnail'
+_EMBEDDED_DIRECTORY_NAME = 'embedded'
+_MAX_EMBEDDED_BYTES = 16 * 1024 * 1024
+_IMAGE_EXTENSIONS = {
+    'image/png': '.png',
+    'image/jpeg': '.jpg',
+    'image/jpg': '.jpg',
+    'image/webp': '.webp',
+    'image/gif': '.gif',
+}
+
+
+def decode_image_data_uri(value: object) -> tuple[str, bytes] | None:
+    if not isinstance(value, str) or not value.startswith('data:'):
+        return None
+    header, separator, payload = value.partition(',')
+    if not separator:
+        return None
+    parameters = header[len('data:'):].split(';')
+    extension = _IMAGE_EXTENSIONS.get(parameters[0].strip().lower())
+    if extension is None or 'base64' not in parameters[1:]:
+        return None
+    # base64 は元データの約 4/3 なので、デコード前に大きすぎるものを弾く
+    if len(payload) > _MAX_EMBEDDED_BYTES * 4 // 3 + 4:
+        return None
+    try:
+        data = base64.b64decode(payload, validate=False)
+    except (binascii.Error, ValueError):
+        return None
+    if not data:
+        return None
+    return extension, data
+
+
+class EmbeddedPreviewCache:
+    def __init__(self, root: str) -> None:
+        self.root = root
+        self._lock = threading.Lock()
+        self._results: dict[str, tuple[int, int, str | None]] = {}
+
+    def extract(self, model_path: str) -> str | None:
+        if not self.root or os.path.splitext(model_path)[1].lower() != '.safetensors':
+            return None
+        try:
+            stat = os.stat(model_path)
+        except OSError:
+            return None
+        with self._lock:
+            cached = self._results.get(model_path)
+        # 埋め込みなしの結果も覚えておき、同じファイルのヘッダーを何度も読まない
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            if cached[2] is None or os.path.isfile(cached[2]):
+                return cached[2]
+        return self._refresh(model_path, stat)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._results.clear()
+
+    def _refresh(self, model_path: str, stat: os.stat_result) -> str | None:
+        key = thumbnail_key(model_path, stat.st_mtime_ns, stat.st_size, 0)
+        directory = os.path.join(self.root, _EMBEDDED_DIRECTORY_NAME, key[:2])
+        preview_path = _find_decoded(directory, key)
+        if preview_path is None:
+            # ヘッダーだけを読み、テンソル本体には触れない
+            decoded = decode_image_data_uri(
+                read_safetensors_metadata(model_path).get(_THUMBNAIL_METADATA_KEY)
+            )
+            if decoded is not None:
+                preview_path = _write_decoded(directory, key, *decoded)
+        with self._lock:
+            self._results[model_path] = (stat.st_mtime_ns, stat.st_size, preview_path)
+        return preview_path
+
+
+def _find_decoded(directory: str, key: str) -> str | None:
+    for extension in sorted(set(_IMAGE_EXTENSIONS.values())):
+        path = os.path.join(directory, f'{key}{extension}')
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def _write_decoded(directory: str, key: str, extension: str, data: bytes) -> str | None:
+    preview_path = os.path.join(directory, f'{key}{extension}')
+    temp_path = ''
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=extension)
+        with os.fdopen(fd, 'wb') as file:
+            file.write(data)
+        os.replace(temp_path, preview_path)
+    except OSError:
+        if temp_path:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+        return None
+    return preview_path
+
+
+_EMBEDDED_PREVIEWS = EmbeddedPreviewCache(get_thumbnail_cache().root)
+
+
+def get_embedded_preview_cache() -> EmbeddedPreviewCache:
+    return _EMBEDDED_PREVIEWS
+
+
+def extract_embedded_preview(model_path: str) -> str | None:
+    return _EMBEDDED_PREVIEWS.extract(model_path)
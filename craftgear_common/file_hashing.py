@@ -0,0 +1,70 @@
+import hashlib
+import threading
+from typing import Callable
+
+_CHUNK_SIZE = 4 * 1024 * 1024
+_PROGRESS_STEPS = 100
+_LEGACY_HASH_OFFSET = 0x100000
+_LEGACY_HASH_SIZE = 0x10000
+
+
+class HashProgress:
+    def __init__(
+        self,
+        total_bytes: int,
+        report: Callable[[int, int], None],
+        steps: int = _PROGRESS_STEPS,
+    ) -> None:
+        self.total_bytes = max(1, int(total_bytes))
+        self.steps = max(1, int(steps))
+        self._report = report
+        self._lock = threading.Lock()
+        self._done = 0
+        self._last_step = -1
+
+    def add(self, size: int) -> None:
+        with self._lock:
+            self._done = min(self.total_bytes, self._done + size)
+            step = self._done * self.steps // self.total_bytes
+            # 並列に読んでいても、UI への通知は進捗が 1 段進んだときだけにする
+            if step == self._last_step:
+                return
+            self._last_step = step
+            done = self._done
+        self._report(done, self.total_bytes)
+
+
+def sha256_file(
+    path: str,
+    on_progress: Callable[[int], None] | None = None,
+    check_interrupt: Callable[[], None] | None = None,
+    chunk_size: int = _CHUNK_SIZE,
+) -> str:
+    if on_progress is None and check_interrupt is None and hasattr(hashlib, 'file_digest'):
+        # 途中で止める必要がなければ、標準ライブラリの読み込みループに任せる
+        with open(path, 'rb') as file:
+            return hashlib.file_digest(file, 'sha256').hexdigest()
+    hasher = hashlib.sha256()
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    with open(path, 'rb', buffering=0) as file:
+        while True:
+            # 中断は例外で呼び出し元へ伝え、途中までのハッシュは捨てる
+            if check_interrupt is not None:
+                check_interrupt()
+            size = file.readinto(buffer)
+            if not size:
+                break
+            # 同じバッファを使い回し、チャンクごとに bytes を作らない
+            hasher.update(view[:size])
+            if on_progress is not None:
+                on_progress(size)
+    return hasher.hexdigest()
+
+
+def legacy_model_hash(path: str) -> str:
+    # A1111 の旧 "Model hash" は 1 MiB 目から 64 KiB だけを読むので、ファイルサイズに関係なく一瞬で終わる
+    with open(path, 'rb') as file:
+        file.seek(_LEGACY_HASH_OFFSET)
+        data = file.read(_LEGACY_HASH_SIZE)
+    return hashlib.sha256(data).hexdigest()[:8]
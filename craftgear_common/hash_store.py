@@ -0,0 +1,282 @@
+import contextlib
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator
+
+DEFAULT_ALGORITHM = 'autov2'
+SHA256_ALGORITHM = 'sha256'
+_BUSY_TIMEOUT_SECONDS = 30.0
+_PRUNE_BATCH_SIZE = 500
+_MODEL_FOLDER_KEYS = ('checkpoints', 'loras')
+
+
+class HashStore:
+    def __init__(self, path: str, timeout: float = _BUSY_TIMEOUT_SECONDS) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        # 別スレッドからも使うので接続は 1 本にしてロックで直列化する
+        self._connection = sqlite3.connect(
+            path,
+            timeout=timeout,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        with self._lock:
+            # WAL なら読み取りが書き込みを待たず、複数プロセスからの更新も busy_timeout で順番に通る
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('PRAGMA synchronous=NORMAL')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS file_hashes ('
+                ' path TEXT NOT NULL,'
+                ' algorithm TEXT NOT NULL,'
+                ' mtime_ns INTEGER NOT NULL,'
+                ' size INTEGER NOT NULL,'
+                ' digest TEXT NOT NULL,'
+                ' PRIMARY KEY (path, algorithm))'
+            )
+            # 移動や名前変更、ハードリンクでも同じ実体を引けるよう、パスとは別に inode でも引けるようにする
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS file_identities ('
+                ' device INTEGER NOT NULL,'
+                ' inode INTEGER NOT NULL,'
+                ' algorithm TEXT NOT NULL,'
+                ' mtime_ns INTEGER NOT NULL,'
+                ' size INTEGER NOT NULL,'
+                ' digest TEXT NOT NULL,'
+                ' PRIMARY KEY (device, inode, algorithm))'
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            row = self._connection.execute('SELECT COUNT(*) FROM file_hashes').fetchone()
+        return int(row[0])
+
+    def get(self, path: str, mtime_ns: int, size: int, algorithm: str = DEFAULT_ALGORITHM) -> str | None:
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT digest FROM file_hashes'
+                ' WHERE path = ? AND algorithm = ? AND mtime_ns = ? AND size = ?',
+                (path, algorithm, mtime_ns, size),
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_by_identity(
+        self,
+        device: int,
+        inode: int,
+        mtime_ns: int,
+        size: int,
+        algorithm: str = DEFAULT_ALGORITHM,
+    ) -> str | None:
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT digest FROM file_identities'
+                ' WHERE device = ? AND inode = ? AND algorithm = ? AND mtime_ns = ? AND size = ?',
+                (device, inode, algorithm, mtime_ns, size),
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(
+        self,
+        path: str,
+        mtime_ns: int,
+        size: int,
+        digest: str,
+        algorithm: str = DEFAULT_ALGORITHM,
+        identity: tuple[int, int] | None = None,
+    ) -> None:
+        entry = (path, mtime_ns, size, digest, *identity) if identity else (path, mtime_ns, size, digest)
+        self.put_many([entry], algorithm)
+
+    def put_many(
+        self,
+        entries: Iterable[tuple[Any, ...]],
+        algorithm: str = DEFAULT_ALGORITHM,
+    ) -> int:
+        rows = []
+        identity_rows = []
+        # (path, mtime_ns, size, digest) に続けて (device, inode) があれば実体の行も書く
+        for path, mtime_ns, size, digest, *identity in entries:
+            if not digest:
+                continue
+            rows.append((path, algorithm, mtime_ns, size, digest))
+            if len(identity) == 2 and identity[1]:
+                identity_rows.append((identity[0], identity[1], algorithm, mtime_ns, size, digest))
+        if not rows:
+            return 0
+        with self._lock:
+            with self._transaction():
+                # 1 件ずつの upsert なので、ファイル全体を書き直していた JSON より他プロセスとぶつかりにくい
+                self._connection.executemany(
+                    'INSERT INTO file_hashes (path, algorithm, mtime_ns, size, digest)'
+                    ' VALUES (?, ?, ?, ?, ?)'
+                    ' ON CONFLICT (path, algorithm) DO UPDATE SET'
+                    ' mtime_ns = excluded.mtime_ns, size = excluded.size, digest = excluded.digest',
+                    rows,
+                )
+                self._connection.executemany(
+                    'INSERT INTO file_identities (device, inode, algorithm, mtime_ns, size, digest)'
+                    ' VALUES (?, ?, ?, ?, ?, ?)'
+                    ' ON CONFLICT (device, inode, algorithm) DO UPDATE SET'
+                    ' mtime_ns = excluded.mtime_ns, size = excluded.size, digest = excluded.digest',
+                    identity_rows,
+                )
+        return len(rows)
+
+    def prune_missing(
+        self,
+        roots: Iterable[str],
+        exists: Callable[[str], bool] = os.path.isfile,
+    ) -> int:
+        # 他の ComfyUI と共有していても、このプロセスから見えるモデルフォルダ配下の行だけを消す
+        prefixes = tuple(
+            os.path.join(os.path.normcase(os.path.abspath(root)), '')
+            for root in roots
+            if root and os.path.isdir(root)
+        )
+        if not prefixes:
+            return 0
+        with self._lock:
+            paths = [row[0] for row in self._connection.execute('SELECT DISTINCT path FROM file_hashes')]
+        # 存在確認はロックの外で行い、ハッシュ計算側を待たせない
+        # file_identities は移動後のファイルを引くために残す（inode が再利用されれば上書きされる）
+        missing = [
+            path for path in paths
+            if os.path.normcase(os.path.abspath(path)).startswith(prefixes) and not exists(path)
+        ]
+        for start in range(0, len(missing), _PRUNE_BATCH_SIZE):
+            batch = missing[start:start + _PRUNE_BATCH_SIZE]
+            with self._lock:
+                with self._transaction():
+                    self._connection.executemany(
+                        'DELETE FROM file_hashes WHERE path = ?',
+                        [(path,) for path in batch],
+                    )
+        return len(missing)
+
+    def import_json(self, json_path: str) -> int:
+        try:
+            with open(json_path, 'r', encoding='utf-8') as file:
+                payload = json.load(file)
+        except (OSError, ValueError):
+            return 0
+        entries = payload.get('entries') if isinstance(payload, dict) else None
+        if not isinstance(entries, dict):
+            return 0
+        rows = []
+        for path, value in entries.items():
+            if not isinstance(path, str) or not isinstance(value, dict):
+                continue
+            mtime_ns = value.get('mtime_ns')
+            size = value.get('size')
+            digest = value.get('hash')
+            if not isinstance(mtime_ns, int) or not isinstance(size, int):
+                continue
+            if not isinstance(digest, str) or digest == '':
+                continue
+            rows.append((path, mtime_ns, size, digest))
+        return self.put_many(rows)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    @contextlib.contextmanager
+    def _transaction(self) -> Iterator[None]:
+        # 書き込みロックを先に取り、途中で他プロセスに割り込まれて失敗しないようにする
+        self._connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except BaseException:
+            self._connection.execute('ROLLBACK')
+            raise
+        self._connection.execute('COMMIT')
+
+
+def open_hash_store(path: str, legacy_json_path: str = '') -> HashStore | None:
+    if not path:
+        return None
+    is_new = not os.path.exists(path)
+    try:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        store = HashStore(path)
+    except (OSError, sqlite3.Error):
+        return None
+    if is_new and legacy_json_path and os.path.isfile(legacy_json_path):
+        # 旧 JSON キャッシュは初回だけ取り込み、元ファイルは残しておく
+        try:
+            store.import_json(legacy_json_path)
+        except sqlite3.Error:
+            pass
+    return store
+
+
+_HASH_STORE: HashStore | None = None
+_HASH_STORE_LOCK = threading.Lock()
+
+
+def get_hash_store(path: str | None = None) -> HashStore | None:
+    # メタデータのハッシュと LoRA の内容キーで 1 つのデータベースを共有する
+    global _HASH_STORE
+    cache_path = default_hash_store_path() if path is None else path
+    with _HASH_STORE_LOCK:
+        if _HASH_STORE is not None and _HASH_STORE.path == cache_path:
+            return _HASH_STORE
+        if _HASH_STORE is not None:
+            _HASH_STORE.close()
+            _HASH_STORE = None
+        store = open_hash_store(cache_path, _legacy_json_path(cache_path))
+        if store is None:
+            return None
+        _HASH_STORE = store
+    # 消えたモデルの行は起動後にバックグラウンドで掃除する
+    threading.Thread(
+        target=_prune_hash_store,
+        args=(store,),
+        name='craftgear-hash-prune',
+        daemon=True,
+    ).start()
+    return store
+
+
+def close_hash_store() -> None:
+    global _HASH_STORE
+    with _HASH_STORE_LOCK:
+        if _HASH_STORE is not None:
+            _HASH_STORE.close()
+            _HASH_STORE = None
+
+
+def default_hash_store_path() -> str:
+    try:
+        return str(Path(__file__).resolve().parents[1] / 'craftgear_hash_cache.sqlite3')
+    except Exception:
+        return ''
+
+
+def _legacy_json_path(cache_path: str) -> str:
+    if not cache_path:
+        return ''
+    return os.path.join(os.path.dirname(cache_path), 'craftgear_hash_cache.json')
+
+
+def _prune_hash_store(store: HashStore) -> None:
+    try:
+        store.prune_missing(_local_model_roots())
+    except Exception:
+        pass
+
+
+def _local_model_roots() -> list[str]:
+    try:
+        import folder_paths
+
+        roots: list[str] = []
+        for folder_key in _MODEL_FOLDER_KEYS:
+            roots.extend(folder_paths.get_folder_paths(folder_key))
+        return roots
+    except Exception:
+        return []
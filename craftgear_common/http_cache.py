@@ -0,0 +1,74 @@
+import email.utils
+import hashlib
+import os
+from typing import Iterable, Mapping
+
+CACHE_CONTROL = 'private, no-cache'
+
+
+def file_validators(path: str) -> tuple[str, float] | None:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    # aiohttp の FileResponse と同じ形式にしておけば、どちらの ETag が送られても一致する
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"', stat.st_mtime
+
+
+def combined_validators(paths: Iterable[str], salt: str = '') -> tuple[str, float] | None:
+    digest = hashlib.sha256(salt.encode('utf-8'))
+    latest = 0.0
+    found = False
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        found = True
+        latest = max(latest, stat.st_mtime)
+        digest.update(
+            f'{os.path.abspath(path)}\0{stat.st_mtime_ns}\0{stat.st_size}\0'.encode('utf-8', 'surrogatepass')
+        )
+    if not found:
+        return None
+    return f'"{digest.hexdigest()[:32]}"', latest
+
+
+def sidecar_json_paths(model_path: str) -> list[str]:
+    base_dir = os.path.dirname(model_path)
+    try:
+        with os.scandir(base_dir or '.') as entries:
+            return sorted(entry.path for entry in entries if entry.name.lower().endswith('.json'))
+    except OSError:
+        return []
+
+
+def cache_headers(etag: str, last_modified: float) -> dict[str, str]:
+    return {
+        'ETag': etag,
+        'Last-Modified': email.utils.formatdate(last_modified, usegmt=True),
+        'Cache-Control': CACHE_CONTROL,
+    }
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = [candidate.strip() for candidate in if_none_match.split(',')]
+    if '*' in candidates:
+        return True
+    # If-None-Match は弱い比較なので W/ の有無は無視する
+    normalized = etag.removeprefix('W/')
+    return any(candidate.removeprefix('W/') == normalized for candidate in candidates)
+
+
+def is_not_modified(headers: Mapping[str, str], etag: str, last_modified: float) -> bool:
+    if_none_match = headers.get('If-None-Match')
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = headers.get('If-Modified-Since')
+    if not if_modified_since:
+        return False
+    try:
+        since = email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return False
+    return int(last_modified) <= since
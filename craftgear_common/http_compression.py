@@ -0,0 +1,113 @@
+import gzip
+import json
+from typing import Any
+
+try:
+    import brotli
+except Exception:
+    brotli = None
+
+COMPRESSION_THRESHOLD_BYTES = 4 * 1024
+_GZIP_LEVEL = 6
+# 応答のたびに圧縮するので、圧縮率より速度を優先した品質にする
+_BROTLI_QUALITY = 5
+
+
+def _parse_accept_encoding(accept_encoding: str) -> dict[str, float]:
+    accepted: dict[str, float] = {}
+    for item in accept_encoding.split(','):
+        coding, *parameters = [part.strip() for part in item.split(';')]
+        if not coding:
+            continue
+        quality = 1.0
+        for parameter in parameters:
+            name, _separator, value = parameter.partition('=')
+            if name.strip().lower() != 'q':
+                continue
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        accepted[coding.lower()] = quality
+    return accepted
+
+
+def select_content_encoding(accept_encoding: str) -> str | None:
+    accepted = _parse_accept_encoding(accept_encoding or '')
+    available = ['br', 'gzip'] if brotli is not None else ['gzip']
+    best: str | None = None
+    best_quality = 0.0
+    for coding in available:
+        quality = accepted.get(coding, accepted.get('*', 0.0))
+        # 同じ q なら先に並べた br を優先する
+        if quality > best_quality:
+            best = coding
+            best_quality = quality
+    return best
+
+
+def compress_body(body: bytes, encoding: str) -> bytes:
+    if encoding == 'br' and brotli is not None:
+        return brotli.compress(body, quality=_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=_GZIP_LEVEL, mtime=0)
+
+
+def compress_json_payload(
+    payload: Any,
+    accept_encoding: str,
+    threshold: int = COMPRESSION_THRESHOLD_BYTES,
+) -> tuple[bytes, str] | None:
+    encoding = select_content_encoding(accept_encoding)
+    if encoding is None:
+        return None
+    body = json.dumps(payload).encode('utf-8')
+    if len(body) < threshold:
+        return None
+    return compress_body(body, encoding), encoding
+
+
+def build_compressed_json(
+    payload: Any,
+    accept_encoding: str,
+    headers: dict[str, str] | None = None,
+    threshold: int = COMPRESSION_THRESHOLD_BYTES,
+) -> tuple[bytes, dict[str, str]] | None:
+    compressed = compress_json_payload(payload, accept_encoding, threshold)
+    if compressed is None:
+        return None
+    body, encoding = compressed
+    response_headers = dict(headers or {})
+    etag = response_headers.get('ETag')
+    # 圧縮でバイト列が変わるので、ETag は弱い検証子として送る
+    if etag and not etag.startswith('W/'):
+        response_headers['ETag'] = f'W/{etag}'
+    response_headers.update(
+        {
+            'Content-Type': 'application/json; charset=utf-8',
+            'Content-Encoding': encoding,
+            'Vary': 'Accept-Encoding',
+        }
+    )
+    return body, response_headers
+
+
+def server_compresses_responses() -> bool:
+    # ComfyUI 本体の圧縮が有効なら二重に圧縮しない
+    try:
+        from comfy.cli_args import args
+    except Exception:
+        return False
+    return bool(getattr(args, 'enable_compress_response_body', False))
+
+
+def json_response(request: Any, payload: Any, headers: dict[str, str] | None = None) -> Any:
+    # aiohttp はサーバー上でだけ必要なので、呼ばれたときに読み込む
+    from aiohttp import web
+
+    compressed = None
+    if not server_compresses_responses():
+        compressed = build_compressed_json(payload, request.headers.get('Accept-Encoding', ''), headers)
+    if compressed is None:
+        return web.json_response(payload, headers={**(headers or {}), 'Vary': 'Accept-Encoding'})
+    body, response_headers = compressed
+    return web.Response(body=body, headers=response_headers)
@@ -0,0 +1,36 @@
+import asyncio
+from typing import Any, Callable
+
+import server
+from aiohttp import web
+
+from .http_cache import cache_headers, file_validators, is_not_modified
+
+
+def is_prompt_running() -> bool:
+    try:
+        prompt_queue = server.PromptServer.instance.prompt_queue
+        return prompt_queue.get_tasks_remaining() > 0
+    except Exception:
+        return False
+
+
+async def preview_file_response(
+    request: web.Request,
+    preview_path: str,
+    size: Any,
+    select_file: Callable[[str, Any], tuple[str, str | None]],
+) -> web.StreamResponse:
+    # 縮小画像の生成は CPU とディスクを使うのでイベントループの外で行う
+    file_path, content_type = await asyncio.get_running_loop().run_in_executor(
+        None, select_file, preview_path, size
+    )
+    headers: dict[str, str] = {}
+    validators = file_validators(file_path)
+    if validators is not None:
+        headers = cache_headers(*validators)
+        if is_not_modified(request.headers, *validators):
+            return web.Response(status=304, headers=headers)
+    if content_type:
+        headers['Content-Type'] = content_type
+    return web.FileResponse(file_path, headers=headers)
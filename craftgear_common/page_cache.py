@@ -0,0 +1,167 @@
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable
+
+_CHUNK_SIZE = 4 * 1024 * 1024
+_BUSY_POLL_SECONDS = 0.5
+
+
+class PageCacheWarmer:
+    def __init__(
+        self,
+        budget_bytes: int,
+        is_busy: Callable[[], bool] | None = None,
+        busy_poll: float = _BUSY_POLL_SECONDS,
+        chunk_pause: float = 0.0,
+        latest_only: bool = False,
+        thread_name: str = 'craftgear-page-cache',
+    ) -> None:
+        self.budget_bytes = max(0, int(budget_bytes))
+        self.enabled = True
+        self.busy_poll = max(0.0, float(busy_poll))
+        self.chunk_pause = max(0.0, float(chunk_pause))
+        self._is_busy = is_busy
+        self._latest_only = latest_only
+        self._thread_name = thread_name
+        self._lock = threading.Condition()
+        self._pending: deque[str] = deque()
+        self._warmed: OrderedDict[str, tuple[int, int]] = OrderedDict()
+        self._warmed_bytes = 0
+        self._thread: threading.Thread | None = None
+
+    def set_enabled(self, enabled: bool) -> None:
+        with self._lock:
+            self.enabled = bool(enabled)
+            if not self.enabled:
+                self._pending.clear()
+
+    def set_busy_check(self, is_busy: Callable[[], bool] | None) -> None:
+        self._is_busy = is_busy
+
+    def request(self, path: str) -> str:
+        if not self.enabled:
+            return 'disabled'
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return 'not_found'
+        if stat.st_size > self.budget_bytes:
+            return 'over_budget'
+        with self._lock:
+            if self._warmed.get(path) == (stat.st_mtime_ns, stat.st_size):
+                self._warmed.move_to_end(path)
+                return 'warm'
+            if self._latest_only:
+                # 投機的な先読みなので古い要求は捨てて最新の候補だけを扱う
+                self._pending.clear()
+            elif path in self._pending:
+                return 'queued'
+            self._pending.append(path)
+            self._ensure_worker()
+            self._lock.notify()
+        return 'queued'
+
+    def is_warm(self, path: str) -> bool:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        with self._lock:
+            return self._warmed.get(path) == (stat.st_mtime_ns, stat.st_size)
+
+    def warm_now(self, path: str) -> bool:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        if stat.st_size > self.budget_bytes:
+            return False
+        if not self._warm_page_cache(path):
+            return False
+        with self._lock:
+            self._remember(path, stat.st_mtime_ns, stat.st_size)
+        return True
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'budget_bytes': self.budget_bytes,
+                'warmed_bytes': self._warmed_bytes,
+                'pending': list(self._pending),
+                'warmed': list(reversed(self._warmed)),
+            }
+
+    def _ensure_worker(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(
+            target=self._run,
+            name=self._thread_name,
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _run(self) -> None:
+        _lower_current_thread_priority()
+        while True:
+            with self._lock:
+                while not self._pending:
+                    self._lock.wait()
+                path = self._pending.popleft()
+            self.warm_now(path)
+
+    def _wait_while_busy(self) -> bool:
+        while self.enabled:
+            if self._is_busy is None or not self._is_busy():
+                return True
+            time.sleep(self.busy_poll)
+        return False
+
+    def _warm_page_cache(self, path: str) -> bool:
+        try:
+            with open(path, 'rb', buffering=0) as file:
+                fadvise = getattr(os, 'posix_fadvise', None)
+                if fadvise is not None:
+                    try:
+                        fadvise(file.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+                    except OSError:
+                        pass
+                buffer = bytearray(_CHUNK_SIZE)
+                view = memoryview(buffer)
+                while True:
+                    # 実行中のプロンプトとディスク帯域を取り合わないよう待つ
+                    if not self._wait_while_busy():
+                        return False
+                    if not file.readinto(view):
+                        break
+                    if self.chunk_pause:
+                        time.sleep(self.chunk_pause)
+        except OSError:
+            return False
+        return True
+
+    def _remember(self, path: str, mtime_ns: int, size: int) -> None:
+        previous = self._warmed.pop(path, None)
+        if previous is not None:
+            self._warmed_bytes -= previous[1]
+        self._warmed[path] = (mtime_ns, size)
+        self._warmed_bytes += size
+        # 予算を超えたら古いものから管理対象外にする (ページキャッシュの解放は OS に任せる)
+        while self._warmed_bytes > self.budget_bytes and len(self._warmed) > 1:
+            _old_path, (_old_mtime, old_size) = self._warmed.popitem(last=False)
+            self._warmed_bytes -= old_size
+
+
+def _lower_current_thread_priority() -> None:
+    setpriority = getattr(os, 'setpriority', None)
+    get_native_id = getattr(threading, 'get_native_id', None)
+    if setpriority is None or get_native_id is None:
+        return
+    try:
+        # Linux では PRIO_PROCESS にスレッド ID を渡すとそのスレッドだけ nice が下がる
+        setpriority(os.PRIO_PROCESS, get_native_id(), 19)
+    except (OSError, AttributeError):
+        pass
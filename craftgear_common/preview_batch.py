@@ -0,0 +1,83 @@
+import mimetypes
+import os
+import secrets
+from typing import Any, Callable, Iterable
+
+from .preview_index import DEFAULT_IMAGE_EXTENSIONS, select_preview_path
+from .preview_thumbnails import select_preview_file
+
+MAX_BATCH_PREVIEWS = 200
+MAX_BATCH_BYTES = 32 * 1024 * 1024
+DEFAULT_BATCH_PREVIEW_SIZE = 256
+
+
+def parse_batch_names(value: Any, max_items: int = MAX_BATCH_PREVIEWS) -> list[str] | None:
+    if not isinstance(value, list):
+        return None
+    names: list[str] = []
+    for name in value:
+        if not isinstance(name, str) or not name or name == 'None' or name in names:
+            continue
+        names.append(name)
+        if len(names) >= max_items:
+            break
+    return names
+
+
+def collect_preview_batch(
+    names: Iterable[str],
+    resolve_model_path: Callable[[str], str | None],
+    size_value: Any = DEFAULT_BATCH_PREVIEW_SIZE,
+    max_bytes: int = MAX_BATCH_BYTES,
+) -> list[tuple[str, str, str, bytes]]:
+    entries: list[tuple[str, str, str, bytes]] = []
+    total = 0
+    for name in names:
+        model_path = resolve_model_path(name)
+        if not model_path or not os.path.exists(model_path):
+            continue
+        preview_path = select_preview_path(model_path, DEFAULT_IMAGE_EXTENSIONS)
+        if not preview_path:
+            continue
+        file_path, content_type = select_preview_file(preview_path, size_value)
+        try:
+            with open(file_path, 'rb') as file:
+                data = file.read()
+        except OSError:
+            continue
+        # 縮小できない巨大な元画像が混ざってもレスポンスが膨らみすぎないよう打ち切る
+        if entries and total + len(data) > max_bytes:
+            break
+        total += len(data)
+        content_type = content_type or mimetypes.guess_type(file_path)[0] or 'application/octet-stream'
+        entries.append((name, os.path.basename(file_path), content_type, data))
+    return entries
+
+
+def encode_multipart_previews(
+    entries: Iterable[tuple[str, str, str, bytes]],
+    boundary: str | None = None,
+) -> tuple[bytes, str]:
+    boundary = boundary or f'craftgear-{secrets.token_hex(16)}'
+    chunks: list[bytes] = []
+    for name, filename, content_type, data in entries:
+        disposition = (
+            f'form-data; name="{_quote_disposition(name)}"; '
+            f'filename="{_quote_disposition(filename)}"'
+        )
+        chunks.append(
+            (
+                f'--{boundary}\r\n'
+                f'Content-Disposition: {disposition}\r\n'
+                f'Content-Type: {content_type}\r\n\r\n'
+            ).encode('utf-8', 'surrogatepass')
+        )
+        chunks.append(data)
+        chunks.append(b'\r\n')
+    chunks.append(f'--{boundary}--\r\n'.encode('ascii'))
+    return b''.join(chunks), f'multipart/form-data; boundary={boundary}'
+
+
+def _quote_disposition(value: str) -> str:
+    # ブラウザの FormData と同じく引用符と改行だけをパーセントエンコードする
+    return value.replace('"', '%22').replace('\r', '%0D').replace('\n', '%0A')
@@ -0,0 +1,139 @@
+import os
+import threading
+from typing import Iterable
+
+from .embedded_preview import extract_embedded_preview
+
+DEFAULT_IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp")
+_PREVIEW_HINTS = ("preview", "thumb")
+_NAME_SEPARATORS = ("_", "-", ".", " ")
+
+
+class DirectoryPreviews:
+    __slots__ = ("base_dir", "best_by_stem", "fallback")
+
+    def __init__(self, base_dir: str, image_names: list[str]) -> None:
+        self.base_dir = base_dir
+        ordered = sorted(image_names, key=str.lower)
+        matches: dict[str, list[str]] = {}
+        for name in ordered:
+            for stem in _matching_model_stems(name):
+                matches.setdefault(stem, []).append(name)
+        self.best_by_stem = {stem: _pick_preview(names) for stem, names in matches.items()}
+        self.fallback = _pick_preview(ordered) if ordered else None
+
+    def lookup(self, model_base: str, use_fallback: bool = True) -> str | None:
+        selected = self.best_by_stem.get(model_base.lower(), self.fallback if use_fallback else None)
+        if not selected:
+            return None
+        return os.path.join(self.base_dir, selected)
+
+
+class PreviewIndex:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._directories: dict[tuple[str, frozenset[str]], tuple[int, DirectoryPreviews]] = {}
+
+    def select(
+        self,
+        model_path: str,
+        supported_extensions: Iterable[str],
+        use_fallback: bool = True,
+    ) -> str | None:
+        if not model_path or not os.path.exists(model_path):
+            return None
+        base_dir = os.path.dirname(model_path)
+        if not os.path.isdir(base_dir):
+            return None
+        model_base = os.path.splitext(os.path.basename(model_path))[0]
+        if not model_base:
+            return None
+        previews = self._directory(base_dir, _normalize_extensions(supported_extensions))
+        if previews is None:
+            return None
+        return previews.lookup(model_base, use_fallback)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._directories.clear()
+
+    def _directory(self, base_dir: str, extensions: frozenset[str]) -> DirectoryPreviews | None:
+        try:
+            dir_mtime = os.stat(base_dir).st_mtime_ns
+        except OSError:
+            return None
+        key = (base_dir, extensions)
+        with self._lock:
+            cached = self._directories.get(key)
+        # ファイルの追加・削除・リネームはディレクトリの mtime に反映される
+        if cached is not None and cached[0] == dir_mtime:
+            return cached[1]
+        previews = DirectoryPreviews(base_dir, _scan_images(base_dir, extensions))
+        with self._lock:
+            self._directories[key] = (dir_mtime, previews)
+        return previews
+
+
+def _normalize_extensions(supported_extensions: Iterable[str]) -> frozenset[str]:
+    return frozenset(
+        ext.lower() if ext.startswith(".") else f".{ext.lower()}"
+        for ext in supported_extensions
+    )
+
+
+def _scan_images(base_dir: str, extensions: frozenset[str]) -> list[str]:
+    names = []
+    try:
+        with os.scandir(base_dir) as entries:
+            for entry in entries:
+                if os.path.splitext(entry.name)[1].lower() not in extensions:
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                except OSError:
+                    continue
+                names.append(entry.name)
+    except OSError:
+        return []
+    return names
+
+
+def _matching_model_stems(filename: str) -> list[str]:
+    base = os.path.splitext(filename)[0]
+    if not base:
+        return []
+    base_lower = base.lower()
+    # "alpha_v2.preview.png" は "alpha" / "alpha_v2" / "alpha_v2.preview" のどれにも一致する
+    stems = [base_lower[:index] for index, char in enumerate(base_lower) if index and char in _NAME_SEPARATORS]
+    stems.append(base_lower)
+    return stems
+
+
+def _has_preview_hint(filename: str) -> bool:
+    base = os.path.splitext(os.path.basename(filename))[0]
+    base_lower = base.lower()
+    return any(hint in base_lower for hint in _PREVIEW_HINTS)
+
+
+def _pick_preview(ordered_names: list[str]) -> str:
+    hinted = [name for name in ordered_names if _has_preview_hint(name)]
+    return (hinted or ordered_names)[0]
+
+
+_PREVIEW_INDEX = PreviewIndex()
+
+
+def get_preview_index() -> PreviewIndex:
+    return _PREVIEW_INDEX
+
+
+def select_preview_path(model_path: str, supported_extensions: Iterable[str]) -> str | None:
+    matched = _PREVIEW_INDEX.select(model_path, supported_extensions, use_fallback=False)
+    if matched:
+        return matched
+    # 名前の一致する画像がなければ、フォルダ内の別画像より埋め込みサムネイルを優先する
+    embedded = extract_embedded_preview(model_path)
+    if embedded:
+        return embedded
+    return _PREVIEW_INDEX.select(model_path, supported_extensions)
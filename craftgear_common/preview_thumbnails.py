@@ -0,0 +1,224 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+try:
+    from PIL import Image, ImageOps, features
+except Exception:
+    Image = None
+    ImageOps = None
+    features = None
+
+THUMBNAIL_SIZES = (256, 512, 1024)
+_THUMBNAIL_QUALITY = 80
+_CACHE_DIRECTORY_NAME = 'craftgear_thumbnail_cache'
+_MAX_CACHE_BYTES = 512 * 1024 * 1024
+# 上限を超えたら古いものから消し、少し余裕を残して次の掃除までの間隔を空ける
+_PRUNE_TARGET_RATIO = 0.9
+_PRUNE_INTERVAL_BYTES = 32 * 1024 * 1024
+_ACCESS_TOUCH_SECONDS = 3600
+
+
+def resolve_thumbnail_size(value: Any) -> int | None:
+    try:
+        requested = int(float(value))
+    except (TypeError, ValueError):
+        return None
+    if requested <= 0:
+        return None
+    for size in THUMBNAIL_SIZES:
+        if requested <= size:
+            return size
+    # 高密度画面のズームでも数 MB の元画像は送らず、最大のサムネイルに揃える
+    return THUMBNAIL_SIZES[-1]
+
+
+class ThumbnailCache:
+    def __init__(self, root: str, quality: int = _THUMBNAIL_QUALITY, max_bytes: int = _MAX_CACHE_BYTES) -> None:
+        self.root = root
+        self.quality = quality
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._written_bytes = 0
+        self._pruned = False
+        self._pruning = False
+
+    def get_or_create(self, source_path: str, size: int) -> tuple[str, str] | None:
+        if Image is None or not self.root:
+            return None
+        try:
+            stat = os.stat(source_path)
+        except OSError:
+            return None
+        extension, content_type = _thumbnail_format()
+        # 元画像ごとのフォルダにまとめ、更新前のサムネイルをすぐ見つけて消せるようにする
+        directory = self._source_directory(source_path)
+        fingerprint = _source_fingerprint(stat)
+        thumbnail_path = os.path.join(directory, f'{size}-{fingerprint}{extension}')
+        try:
+            cached = os.stat(thumbnail_path)
+        except OSError:
+            cached = None
+        if cached is not None:
+            _touch(thumbnail_path, cached)
+            return thumbnail_path, content_type
+        if not self._render(source_path, thumbnail_path, size, extension):
+            return None
+        _remove_stale_thumbnails(directory, fingerprint)
+        try:
+            self._note_written(os.path.getsize(thumbnail_path))
+        except OSError:
+            pass
+        return thumbnail_path, content_type
+
+    def prune(self) -> int:
+        if not self.root:
+            return 0
+        entries: list[tuple[float, int, str]] = []
+        total = 0
+        for directory, _names, files in os.walk(self.root):
+            for name in files:
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_atime, stat.st_size, path))
+                total += stat.st_size
+        if total <= self.max_bytes:
+            return 0
+        # 最後に使った時刻 (atime) が古いものから消す
+        target = int(self.max_bytes * _PRUNE_TARGET_RATIO)
+        removed = 0
+        for _accessed, file_size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= file_size
+            removed += 1
+        return removed
+
+    def _source_directory(self, source_path: str) -> str:
+        key = hashlib.sha256(os.path.abspath(source_path).encode('utf-8', 'surrogatepass')).hexdigest()
+        return os.path.join(self.root, key[:2], key)
+
+    def _note_written(self, file_size: int) -> None:
+        with self._lock:
+            self._written_bytes += file_size
+            # 起動後の最初の書き込みと、一定量書くごとにだけ全体を数える
+            if self._pruning or (self._pruned and self._written_bytes < _PRUNE_INTERVAL_BYTES):
+                return
+            self._pruning = True
+            self._written_bytes = 0
+        threading.Thread(target=self._prune_in_background, name='craftgear-thumbnail-prune', daemon=True).start()
+
+    def _prune_in_background(self) -> None:
+        try:
+            self.prune()
+        except Exception:
+            pass
+        finally:
+            with self._lock:
+                self._pruning = False
+                self._pruned = True
+
+    def _render(self, source_path: str, thumbnail_path: str, size: int, extension: str) -> bool:
+        directory = os.path.dirname(thumbnail_path)
+        temp_path = ''
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with Image.open(source_path) as source:
+                image = ImageOps.exif_transpose(source)
+                image.thumbnail((size, size), Image.LANCZOS)
+                if extension == '.jpg':
+                    image = image.convert('RGB')
+                elif image.mode not in ('RGB', 'RGBA'):
+                    image = image.convert('RGBA')
+                fd, temp_path = tempfile.mkstemp(dir=directory, suffix=extension)
+                with os.fdopen(fd, 'wb') as file:
+                    image.save(file, format='WEBP' if extension == '.webp' else 'JPEG', quality=self.quality)
+            # 同時リクエストでも書きかけのファイルを返さないよう置き換えで公開する
+            os.replace(temp_path, thumbnail_path)
+        except Exception:
+            if temp_path:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+            return False
+        return True
+
+
+def thumbnail_key(source_path: str, mtime_ns: int, file_size: int, size: int) -> str:
+    source = f'{os.path.abspath(source_path)}\0{mtime_ns}\0{file_size}\0{size}'
+    return hashlib.sha256(source.encode('utf-8', 'surrogatepass')).hexdigest()
+
+
+def _source_fingerprint(stat: os.stat_result) -> str:
+    return hashlib.sha256(f'{stat.st_mtime_ns}\0{stat.st_size}'.encode('ascii')).hexdigest()[:16]
+
+
+def _remove_stale_thumbnails(directory: str, fingerprint: str) -> None:
+    try:
+        with os.scandir(directory) as entries:
+            names = [entry.name for entry in entries]
+    except OSError:
+        return
+    for name in names:
+        # 書き込み中の一時ファイルは "-" を含まないので触らない
+        _size, separator, rest = os.path.splitext(name)[0].partition('-')
+        if not separator or rest == fingerprint:
+            continue
+        try:
+            os.remove(os.path.join(directory, name))
+        except OSError:
+            pass
+
+
+def _touch(path: str, stat: os.stat_result) -> None:
+    # 掃除で最近使ったものを残すため atime だけを進める (mtime は ETag に使うので変えない)
+    if time.time() - stat.st_atime < _ACCESS_TOUCH_SECONDS:
+        return
+    try:
+        os.utime(path, ns=(time.time_ns(), stat.st_mtime_ns))
+    except OSError:
+        pass
+
+
+def _thumbnail_format() -> tuple[str, str]:
+    try:
+        if features is not None and features.check('webp'):
+            return '.webp', 'image/webp'
+    except Exception:
+        pass
+    return '.jpg', 'image/jpeg'
+
+
+def _default_cache_root() -> str:
+    try:
+        return str(Path(__file__).resolve().parents[1] / _CACHE_DIRECTORY_NAME)
+    except Exception:
+        return ''
+
+
+_THUMBNAIL_CACHE = ThumbnailCache(_default_cache_root())
+
+
+def get_thumbnail_cache() -> ThumbnailCache:
+    return _THUMBNAIL_CACHE
+
+
+def select_preview_file(preview_path: str, size_value: Any) -> tuple[str, str | None]:
+    size = resolve_thumbnail_size(size_value)
+    if size is not None:
+        thumbnail = _THUMBNAIL_CACHE.get_or_create(preview_path, size)
+        if thumbnail is not None:
+            return thumbnail
+    return preview_path, None
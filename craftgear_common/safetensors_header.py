@@ -0,0 +1,34 @@
+import json
+import os
+from typing import Any
+
+_MAX_HEADER_BYTES = 100 * 1024 * 1024
+
+
+def read_safetensors_header(path: str) -> dict[str, Any] | None:
+    if os.path.splitext(path)[1].lower() != '.safetensors':
+        return None
+    try:
+        with open(path, 'rb') as file:
+            header_size_bytes = file.read(8)
+            if len(header_size_bytes) != 8:
+                return None
+            header_size = int.from_bytes(header_size_bytes, 'little', signed=False)
+            # 壊れたファイルで巨大な領域を確保しないよう、ヘッダーの長さに上限を設ける
+            if header_size <= 0 or header_size > _MAX_HEADER_BYTES:
+                return None
+            header = file.read(header_size)
+        header_json = json.loads(header)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(header_json, dict):
+        return None
+    return header_json
+
+
+def read_safetensors_metadata(path: str) -> dict[str, Any]:
+    header = read_safetensors_header(path)
+    metadata = header.get('__metadata__') if header else None
+    if isinstance(metadata, dict):
+        return metadata
+    return {}
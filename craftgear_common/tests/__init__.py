@@ -0,0 +1,3 @@
+from .bootstrap import install
+
+install()
@@ -0,0 +1,63 @@
+import importlib
+import importlib.abc
+import importlib.machinery
+import sys
+from pathlib import Path
+
+# ノードは craftgear_common を相対 import するので、テストでも親パッケージの下で読み込む
+PARENT_PACKAGE = 'craftgear_nodes'
+ALIASED_PACKAGES = frozenset(
+    ('a1111_metadata_writer', 'checkpoint_selector', 'craftgear_common', 'load_loras_with_tags')
+)
+
+_ROOT = Path(__file__).resolve().parents[2]
+_exposed: set[str] = set()
+
+
+class _ParentLoader(importlib.abc.Loader):
+    def create_module(self, spec):
+        return None
+
+    def exec_module(self, module) -> None:
+        # ルートの __init__.py は torch などを読み込むため実行しない
+        return None
+
+
+class _AliasLoader(importlib.abc.Loader):
+    def __init__(self, target: str) -> None:
+        self._target = target
+        self._spec = None
+
+    def create_module(self, spec):
+        # テストが sys.modules から外して読み直した場合は、実体も読み直す
+        if self._target in _exposed:
+            sys.modules.pop(self._target, None)
+        module = importlib.import_module(self._target)
+        _exposed.add(self._target)
+        self._spec = module.__spec__
+        return module
+
+    def exec_module(self, module) -> None:
+        module.__spec__ = self._spec
+
+
+class _AliasFinder(importlib.abc.MetaPathFinder):
+    def find_spec(self, fullname, path, target=None):
+        if fullname == PARENT_PACKAGE:
+            spec = importlib.machinery.ModuleSpec(fullname, _ParentLoader(), is_package=True)
+            spec.submodule_search_locations = [str(_ROOT)]
+            return spec
+        parts = fullname.split('.')
+        if len(parts) < 2 or parts[0] not in ALIASED_PACKAGES or parts[1] == 'tests':
+            return None
+        return importlib.machinery.ModuleSpec(
+            fullname,
+            _AliasLoader(f'{PARENT_PACKAGE}.{fullname}'),
+            is_package=(_ROOT.joinpath(*parts) / '__init__.py').is_file(),
+        )
+
+
+def install() -> None:
+    if any(isinstance(finder, _AliasFinder) for finder in sys.meta_path):
+        return
+    sys.meta_path.insert(0, _AliasFinder())
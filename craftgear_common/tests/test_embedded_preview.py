@@ -0,0 +1,99 @@
+import base64
+import json
+import os
+import tempfile
+import unittest
+
+from craftgear_common import embedded_preview, preview_index
+from craftgear_common.embedded_preview import EmbeddedPreviewCache, decode_image_data_uri
+from craftgear_common.preview_index import DEFAULT_IMAGE_EXTENSIONS, get_preview_index
+
+_IMAGE_BYTES = b'\x89PNG\r\n\x1a\nembedded'
+
+
+def _write_safetensors(path: str, metadata: dict) -> None:
+    header = json.dumps({'__metadata__': metadata}).encode('utf-8')
+    with open(path, 'wb') as file:
+        file.write(len(header).to_bytes(8, 'little'))
+        file.write(header)
+
+
+def _data_uri(mime: str = 'image/png', data: bytes = _IMAGE_BYTES) -> str:
+    return f'data:{mime};base64,{base64.b64encode(data).decode("ascii")}'
+
+
+class EmbeddedPreviewTest(unittest.TestCase):
+    def setUp(self) -> None:
+        get_preview_index().clear()
+
+    def test_decode_image_data_uri(self) -> None:
+        self.assertEqual(decode_image_data_uri(_data_uri()), ('.png', _IMAGE_BYTES))
+        self.assertEqual(decode_image_data_uri(_data_uri('image/jpeg'))[0], '.jpg')
+        self.assertIsNone(decode_image_data_uri(_data_uri('text/plain')))
+        self.assertIsNone(decode_image_data_uri('data:image/png,raw'))
+        self.assertIsNone(decode_image_data_uri('https://example.com/a.png'))
+        self.assertIsNone(decode_image_data_uri('data:image/png;base64,%%%'))
+        self.assertIsNone(decode_image_data_uri(None))
+
+    def test_extract_decodes_once_and_remembers_missing(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = EmbeddedPreviewCache(os.path.join(temp_dir, 'cache'))
+            model_path = os.path.join(temp_dir, 'model.safetensors')
+            plain_path = os.path.join(temp_dir, 'plain.safetensors')
+            _write_safetensors(model_path, {'modelspec.thumbnail': _data_uri()})
+            _write_safetensors(plain_path, {'ss_network_dim': '16'})
+            reads = []
+            original_read = embedded_preview.read_safetensors_metadata
+            embedded_preview.read_safetensors_metadata = lambda path: reads.append(path) or original_read(path)
+            try:
+                first = cache.extract(model_path)
+                second = cache.extract(model_path)
+                self.assertIsNone(cache.extract(plain_path))
+                self.assertIsNone(cache.extract(plain_path))
+                cache.clear()
+                # 再起動後もデコード済みファイルがあればヘッダーは読まない
+                third = cache.extract(model_path)
+            finally:
+                embedded_preview.read_safetensors_metadata = original_read
+            self.assertEqual(first, second)
+            self.assertEqual(first, third)
+            self.assertTrue(first.endswith('.png'))
+            with open(first, 'rb') as file:
+                self.assertEqual(file.read(), _IMAGE_BYTES)
+        self.assertEqual(reads, [model_path, plain_path])
+
+    def test_extract_ignores_other_formats(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = EmbeddedPreviewCache(temp_dir)
+            model_path = os.path.join(temp_dir, 'model.ckpt')
+            with open(model_path, 'wb') as file:
+                file.write(b'')
+            self.assertIsNone(cache.extract(model_path))
+            self.assertIsNone(cache.extract(os.path.join(temp_dir, 'missing.safetensors')))
+
+    def test_select_preview_path_prefers_matching_sidecar_then_embedded(self) -> None:
+        cache = embedded_preview.get_embedded_preview_cache()
+        original_root = cache.root
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache.root = os.path.join(temp_dir, 'cache')
+            cache.clear()
+            try:
+                model_dir = os.path.join(temp_dir, 'models')
+                os.makedirs(model_dir)
+                alpha_path = os.path.join(model_dir, 'alpha.safetensors')
+                beta_path = os.path.join(model_dir, 'beta.safetensors')
+                _write_safetensors(alpha_path, {'modelspec.thumbnail': _data_uri()})
+                _write_safetensors(beta_path, {'modelspec.thumbnail': _data_uri()})
+                with open(os.path.join(model_dir, 'beta.png'), 'wb') as file:
+                    file.write(b'')
+                alpha_preview = preview_index.select_preview_path(alpha_path, DEFAULT_IMAGE_EXTENSIONS)
+                beta_preview = preview_index.select_preview_path(beta_path, DEFAULT_IMAGE_EXTENSIONS)
+            finally:
+                cache.root = original_root
+                cache.clear()
+            self.assertTrue(alpha_preview.startswith(os.path.join(temp_dir, 'cache', 'embedded')))
+            self.assertEqual(beta_preview, os.path.join(model_dir, 'beta.png'))
+
+
+if __name__ == '__main__':
+    unittest.main()
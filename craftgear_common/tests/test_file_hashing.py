@@ -0,0 +1,68 @@
+import hashlib
+import os
+import tempfile
+import unittest
+
+from craftgear_common.file_hashing import HashProgress, legacy_model_hash, sha256_file
+
+
+class _Interrupted(Exception):
+    pass
+
+
+class FileHashingTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._temp_dir.name, 'model.safetensors')
+        self.data = bytes(range(256)) * 1000
+        with open(self.path, 'wb') as file:
+            file.write(self.data)
+
+    def tearDown(self) -> None:
+        self._temp_dir.cleanup()
+
+    def test_digest_matches_hashlib_with_and_without_callbacks(self) -> None:
+        expected = hashlib.sha256(self.data).hexdigest()
+        self.assertEqual(sha256_file(self.path), expected)
+        sizes: list[int] = []
+        self.assertEqual(sha256_file(self.path, sizes.append, lambda: None, chunk_size=4096), expected)
+        self.assertEqual(sum(sizes), len(self.data))
+        self.assertEqual(max(sizes), 4096)
+
+    def test_progress_reports_only_when_step_changes(self) -> None:
+        reports: list[tuple[int, int]] = []
+        progress = HashProgress(1000, lambda done, total: reports.append((done, total)), steps=4)
+        for _ in range(10):
+            progress.add(100)
+        progress.add(500)
+        self.assertEqual(reports, [(100, 1000), (300, 1000), (500, 1000), (800, 1000), (1000, 1000)])
+
+    def test_interrupt_stops_reading(self) -> None:
+        calls: list[int] = []
+        interrupted = {'value': False}
+
+        def check_interrupt() -> None:
+            calls.append(1)
+            if len(calls) == 3:
+                interrupted['value'] = True
+            # ComfyUI と同じく、例外を投げるときにフラグを戻す
+            if interrupted['value']:
+                interrupted['value'] = False
+                raise _Interrupted()
+
+        with self.assertRaises(_Interrupted):
+            sha256_file(self.path, None, check_interrupt, chunk_size=4096)
+        self.assertEqual(len(calls), 3)
+
+    def test_legacy_model_hash_reads_fixed_window(self) -> None:
+        large_path = os.path.join(self._temp_dir.name, 'large.safetensors')
+        data = os.urandom(0x100000 + 0x20000)
+        with open(large_path, 'wb') as file:
+            file.write(data)
+        self.assertEqual(legacy_model_hash(large_path), hashlib.sha256(data[0x100000:0x110000]).hexdigest()[:8])
+        # 1 MiB 未満のファイルは A1111 と同じく空データのハッシュになる
+        self.assertEqual(legacy_model_hash(self.path), hashlib.sha256(b'').hexdigest()[:8])
+
+
+if __name__ == '__main__':
+    unittest.main()
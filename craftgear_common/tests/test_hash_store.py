@@ -0,0 +1,169 @@
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import unittest
+
+from craftgear_common.hash_store import HashStore, open_hash_store
+
+
+def _write_rows(path: str, prefix: str, count: int) -> None:
+    store = HashStore(path)
+    try:
+        for index in range(count):
+            store.put(f'/{prefix}/{index}.safetensors', index, index, f'{prefix}{index:04d}')
+    finally:
+        store.close()
+
+
+class HashStoreTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._temp_dir.name, 'hashes.sqlite3')
+
+    def tearDown(self) -> None:
+        self._temp_dir.cleanup()
+
+    def test_get_requires_matching_fingerprint(self) -> None:
+        store = HashStore(self.path)
+        try:
+            store.put('/models/a.safetensors', 10, 100, 'aaaaaaaaaa')
+            self.assertEqual(store.get('/models/a.safetensors', 10, 100), 'aaaaaaaaaa')
+            self.assertIsNone(store.get('/models/a.safetensors', 11, 100))
+            self.assertIsNone(store.get('/models/a.safetensors', 10, 101))
+            self.assertIsNone(store.get('/models/a.safetensors', 10, 100, algorithm='other'))
+            store.put('/models/a.safetensors', 11, 100, 'bbbbbbbbbb')
+            self.assertEqual(store.get('/models/a.safetensors', 11, 100), 'bbbbbbbbbb')
+            self.assertEqual(len(store), 1)
+            mode = store._connection.execute('PRAGMA journal_mode').fetchone()[0]
+            self.assertEqual(mode, 'wal')
+        finally:
+            store.close()
+
+    def test_put_many_writes_in_one_transaction(self) -> None:
+        store = HashStore(self.path)
+        try:
+            written = store.put_many([('/a', 1, 1, 'a'), ('/b', 2, 2, 'b'), ('/c', 3, 3, '')])
+            self.assertEqual(written, 2)
+            self.assertEqual(len(store), 2)
+        finally:
+            store.close()
+
+    def test_prune_missing_removes_deleted_files(self) -> None:
+        existing = os.path.join(self._temp_dir.name, 'kept.safetensors')
+        deleted = os.path.join(self._temp_dir.name, 'deleted.safetensors')
+        with open(existing, 'wb') as file:
+            file.write(b'')
+        store = HashStore(self.path)
+        try:
+            store.put_many([(existing, 1, 1, 'kept'), (deleted, 1, 1, 'gone')])
+            self.assertEqual(store.prune_missing([self._temp_dir.name]), 1)
+            self.assertEqual(store.get(existing, 1, 1), 'kept')
+            self.assertEqual(len(store), 1)
+        finally:
+            store.close()
+
+    def test_prune_missing_keeps_rows_outside_local_roots(self) -> None:
+        # 別マシンの ComfyUI が書いた行は、こちらで stat できなくても残す
+        root = os.path.join(self._temp_dir.name, 'models')
+        os.makedirs(root)
+        rows = [
+            ('/elsewhere/a.safetensors', 1, 1, 'a'),
+            (os.path.join(self._temp_dir.name, 'models_other', 'b.safetensors'), 1, 1, 'b'),
+            (os.path.join(root, 'c.safetensors'), 1, 1, 'c'),
+        ]
+        store = HashStore(self.path)
+        try:
+            store.put_many(rows)
+            self.assertEqual(store.prune_missing([]), 0)
+            self.assertEqual(store.prune_missing([os.path.join(self._temp_dir.name, 'not_mounted')]), 0)
+            self.assertEqual(store.prune_missing([root]), 1)
+            self.assertEqual(store.get('/elsewhere/a.safetensors', 1, 1), 'a')
+            self.assertEqual(len(store), 2)
+        finally:
+            store.close()
+
+    def test_identity_survives_prune_of_old_path(self) -> None:
+        store = HashStore(self.path)
+        try:
+            old_a = os.path.join(self._temp_dir.name, 'a.safetensors')
+            old_b = os.path.join(self._temp_dir.name, 'b.safetensors')
+            store.put_many([(old_a, 5, 50, 'moved', 7, 42), (old_b, 5, 50, 'noinode', 7, 0)])
+            self.assertEqual(store.get_by_identity(7, 42, 5, 50), 'moved')
+            self.assertIsNone(store.get_by_identity(7, 42, 6, 50))
+            self.assertIsNone(store.get_by_identity(7, 0, 5, 50))
+            self.assertEqual(store.prune_missing([self._temp_dir.name]), 2)
+            self.assertEqual(len(store), 0)
+            self.assertEqual(store.get_by_identity(7, 42, 5, 50), 'moved')
+            store.put('/new/a.safetensors', 6, 50, 'changed', identity=(7, 42))
+            self.assertEqual(store.get_by_identity(7, 42, 6, 50), 'changed')
+            self.assertIsNone(store.get_by_identity(7, 42, 5, 50))
+        finally:
+            store.close()
+
+    def test_threads_share_one_store(self) -> None:
+        store = HashStore(self.path)
+        try:
+            threads = [
+                threading.Thread(
+                    target=lambda prefix=prefix: [
+                        store.put(f'/{prefix}/{index}', index, index, f'{prefix}{index}') for index in range(50)
+                    ]
+                )
+                for prefix in ('a', 'b', 'c', 'd')
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(len(store), 200)
+        finally:
+            store.close()
+
+    def test_processes_write_concurrently(self) -> None:
+        HashStore(self.path).close()
+        context = multiprocessing.get_context('spawn')
+        processes = [context.Process(target=_write_rows, args=(self.path, prefix, 40)) for prefix in ('p', 'q')]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(timeout=60)
+            self.assertEqual(process.exitcode, 0)
+        store = HashStore(self.path)
+        try:
+            self.assertEqual(len(store), 80)
+            self.assertEqual(store.get('/q/39.safetensors', 39, 39), 'q0039')
+        finally:
+            store.close()
+
+    def test_open_hash_store_imports_legacy_json_only_when_new(self) -> None:
+        legacy_path = os.path.join(self._temp_dir.name, 'legacy.json')
+        with open(legacy_path, 'w', encoding='utf-8') as file:
+            json.dump(
+                {
+                    'version': 1,
+                    'entries': {
+                        '/models/a.safetensors': {'mtime_ns': 1, 'size': 2, 'hash': 'abcdef0123'},
+                        '/models/bad.safetensors': {'mtime_ns': 'x', 'size': 2, 'hash': 'abc'},
+                    },
+                },
+                file,
+            )
+        store = open_hash_store(self.path, legacy_path)
+        try:
+            self.assertEqual(store.get('/models/a.safetensors', 1, 2), 'abcdef0123')
+            self.assertEqual(len(store), 1)
+            store.put('/models/a.safetensors', 1, 2, 'fedcba9876')
+        finally:
+            store.close()
+        store = open_hash_store(self.path, legacy_path)
+        try:
+            self.assertEqual(store.get('/models/a.safetensors', 1, 2), 'fedcba9876')
+        finally:
+            store.close()
+        self.assertIsNone(open_hash_store(''))
+
+
+if __name__ == '__main__':
+    unittest.main()
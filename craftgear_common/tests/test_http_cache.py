@@ -0,0 +1,65 @@
+import email.utils
+import os
+import tempfile
+import unittest
+
+from craftgear_common import http_cache
+
+
+class HttpCacheTest(unittest.TestCase):
+    def test_file_validators_match_aiohttp_format(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'preview.png')
+            with open(path, 'wb') as file:
+                file.write(b'image')
+            stat = os.stat(path)
+            etag, last_modified = http_cache.file_validators(path)
+        self.assertEqual(etag, f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"')
+        self.assertEqual(last_modified, stat.st_mtime)
+        self.assertIsNone(http_cache.file_validators(path))
+
+    def test_combined_validators_change_with_any_file(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            model_path = os.path.join(temp_dir, 'model.safetensors')
+            sidecar_path = os.path.join(temp_dir, 'model.json')
+            with open(model_path, 'wb') as file:
+                file.write(b'')
+            self.assertEqual(http_cache.sidecar_json_paths(model_path), [])
+            first = http_cache.combined_validators([model_path, sidecar_path], 'salt')
+            with open(sidecar_path, 'w', encoding='utf-8') as file:
+                file.write('{}')
+            self.assertEqual(http_cache.sidecar_json_paths(model_path), [sidecar_path])
+            second = http_cache.combined_validators([model_path, sidecar_path], 'salt')
+            other_salt = http_cache.combined_validators([model_path, sidecar_path], 'other')
+        self.assertNotEqual(first[0], second[0])
+        self.assertNotEqual(second[0], other_salt[0])
+        self.assertIsNone(http_cache.combined_validators([model_path]))
+
+    def test_etag_matches_weak_and_lists(self) -> None:
+        self.assertTrue(http_cache.etag_matches('"a", "b"', '"b"'))
+        self.assertTrue(http_cache.etag_matches('W/"a"', '"a"'))
+        self.assertTrue(http_cache.etag_matches('*', '"a"'))
+        self.assertFalse(http_cache.etag_matches('"a"', '"b"'))
+
+    def test_is_not_modified_prefers_etag(self) -> None:
+        last_modified = 1_700_000_000.5
+        since = email.utils.formatdate(last_modified, usegmt=True)
+        self.assertTrue(http_cache.is_not_modified({'If-Modified-Since': since}, '"a"', last_modified))
+        self.assertFalse(
+            http_cache.is_not_modified({'If-Modified-Since': since}, '"a"', last_modified + 10)
+        )
+        self.assertFalse(
+            http_cache.is_not_modified({'If-None-Match': '"b"', 'If-Modified-Since': since}, '"a"', last_modified)
+        )
+        self.assertFalse(http_cache.is_not_modified({'If-Modified-Since': 'garbage'}, '"a"', last_modified))
+        self.assertFalse(http_cache.is_not_modified({}, '"a"', last_modified))
+
+    def test_cache_headers(self) -> None:
+        headers = http_cache.cache_headers('"a"', 0)
+        self.assertEqual(headers['ETag'], '"a"')
+        self.assertEqual(headers['Last-Modified'], 'Thu, 01 Jan 1970 00:00:00 GMT')
+        self.assertEqual(headers['Cache-Control'], 'private, no-cache')
+
+
+if __name__ == '__main__':
+    unittest.main()
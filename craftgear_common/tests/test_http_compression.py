@@ -0,0 +1,91 @@
+import gzip
+import json
+import sys
+import types
+import unittest
+from unittest import mock
+
+from craftgear_common import http_compression
+
+
+class HttpCompressionTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._original_brotli = http_compression.brotli
+
+    def tearDown(self) -> None:
+        http_compression.brotli = self._original_brotli
+
+    def test_select_content_encoding_without_brotli(self) -> None:
+        http_compression.brotli = None
+        self.assertEqual(http_compression.select_content_encoding('gzip, deflate, br'), 'gzip')
+        self.assertEqual(http_compression.select_content_encoding('*'), 'gzip')
+        self.assertIsNone(http_compression.select_content_encoding('br, deflate'))
+        self.assertIsNone(http_compression.select_content_encoding('gzip;q=0'))
+        self.assertIsNone(http_compression.select_content_encoding(''))
+
+    def test_select_content_encoding_prefers_brotli_by_quality(self) -> None:
+        http_compression.brotli = object()
+        self.assertEqual(http_compression.select_content_encoding('gzip, br'), 'br')
+        self.assertEqual(http_compression.select_content_encoding('gzip;q=1.0, br;q=0.5'), 'gzip')
+        self.assertEqual(http_compression.select_content_encoding('br;q=bad, gzip;q=0.1'), 'gzip')
+
+    def test_compress_json_payload_applies_threshold(self) -> None:
+        http_compression.brotli = None
+        payload = {'triggers': [f'tag_{index}' for index in range(500)]}
+        compressed = http_compression.compress_json_payload(payload, 'gzip')
+        self.assertIsNotNone(compressed)
+        body, encoding = compressed
+        self.assertEqual(encoding, 'gzip')
+        self.assertEqual(json.loads(gzip.decompress(body)), payload)
+        self.assertLess(len(body), len(json.dumps(payload)))
+        self.assertIsNone(http_compression.compress_json_payload({'triggers': []}, 'gzip'))
+        self.assertIsNone(http_compression.compress_json_payload(payload, 'identity'))
+
+    def test_build_compressed_json_weakens_etag(self) -> None:
+        http_compression.brotli = None
+        body, headers = http_compression.build_compressed_json(
+            {'value': 'x' * 100},
+            'gzip',
+            {'ETag': '"abc"', 'Cache-Control': 'private, no-cache'},
+            threshold=10,
+        )
+        self.assertEqual(json.loads(gzip.decompress(body)), {'value': 'x' * 100})
+        self.assertEqual(
+            headers,
+            {
+                'ETag': 'W/"abc"',
+                'Cache-Control': 'private, no-cache',
+                'Content-Type': 'application/json; charset=utf-8',
+                'Content-Encoding': 'gzip',
+                'Vary': 'Accept-Encoding',
+            },
+        )
+
+    def test_json_response_skips_compression_when_server_compresses(self) -> None:
+        http_compression.brotli = None
+
+        class _Response:
+            def __init__(self, body: bytes = b'', headers=None) -> None:
+                self.body = body
+                self.headers = headers or {}
+
+        def _json_response(payload, headers=None):
+            response = _Response(headers=headers)
+            response.data = payload
+            return response
+
+        web = types.SimpleNamespace(Response=_Response, json_response=_json_response)
+        request = types.SimpleNamespace(headers={'Accept-Encoding': 'gzip'})
+        payload = {'value': 'x' * 5000}
+        with mock.patch.dict(sys.modules, {'aiohttp': types.SimpleNamespace(web=web)}):
+            compressed = http_compression.json_response(request, payload)
+            with mock.patch.object(http_compression, 'server_compresses_responses', return_value=True):
+                plain = http_compression.json_response(request, payload)
+        self.assertEqual(compressed.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(json.loads(gzip.decompress(compressed.body)), payload)
+        self.assertEqual(plain.data, payload)
+        self.assertEqual(plain.headers, {'Vary': 'Accept-Encoding'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import importlib
+import sys
+import types
+import unittest
+
+
+class _DummyWebModule(types.SimpleNamespace):
+    def __init__(self) -> None:
+        super().__init__(
+            Request=object,
+            Response=object,
+            StreamResponse=object,
+            FileResponse=object,
+        )
+
+
+class _DummyQueue:
+    def __init__(self, remaining) -> None:
+        self.remaining = remaining
+
+    def get_tasks_remaining(self) -> int:
+        if isinstance(self.remaining, Exception):
+            raise self.remaining
+        return self.remaining
+
+
+class HttpRoutesTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._modules_backup = dict(sys.modules)
+        self.prompt_server = types.SimpleNamespace()
+        sys.modules['server'] = types.SimpleNamespace(
+            PromptServer=types.SimpleNamespace(instance=self.prompt_server)
+        )
+        web_module = _DummyWebModule()
+        sys.modules['aiohttp'] = types.SimpleNamespace(web=web_module)
+        sys.modules['aiohttp.web'] = web_module
+        sys.modules.pop('craftgear_common.http_routes', None)
+        self.http_routes = importlib.import_module('craftgear_common.http_routes')
+
+    def tearDown(self) -> None:
+        sys.modules.clear()
+        sys.modules.update(self._modules_backup)
+
+    def test_is_prompt_running_follows_queue(self) -> None:
+        self.assertFalse(self.http_routes.is_prompt_running())
+        self.prompt_server.prompt_queue = _DummyQueue(0)
+        self.assertFalse(self.http_routes.is_prompt_running())
+        self.prompt_server.prompt_queue = _DummyQueue(2)
+        self.assertTrue(self.http_routes.is_prompt_running())
+        self.prompt_server.prompt_queue = _DummyQueue(RuntimeError('boom'))
+        self.assertFalse(self.http_routes.is_prompt_running())
+
+
+if __name__ == '__main__':
+    unittest.main()
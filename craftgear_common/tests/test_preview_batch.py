@@ -0,0 +1,83 @@
+import email.parser
+import email.policy
+import os
+import tempfile
+import unittest
+
+from craftgear_common import preview_batch
+from craftgear_common.preview_index import get_preview_index
+
+
+def _write(path: str, data: bytes = b'') -> None:
+    with open(path, 'wb') as file:
+        file.write(data)
+
+
+class PreviewBatchTest(unittest.TestCase):
+    def setUp(self) -> None:
+        get_preview_index().clear()
+
+    def test_parse_batch_names_filters_and_caps(self) -> None:
+        self.assertIsNone(preview_batch.parse_batch_names('a.safetensors'))
+        self.assertEqual(
+            preview_batch.parse_batch_names(['a', '', None, 'None', 'a', 3, 'b', 'c'], max_items=2),
+            ['a', 'b'],
+        )
+
+    def test_collect_preview_batch_skips_missing(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            _write(os.path.join(temp_dir, 'alpha.safetensors'))
+            _write(os.path.join(temp_dir, 'alpha.png'), b'alpha-image')
+            beta_dir = os.path.join(temp_dir, 'beta')
+            os.makedirs(beta_dir)
+            _write(os.path.join(beta_dir, 'beta.safetensors'))
+            paths = {
+                'alpha.safetensors': os.path.join(temp_dir, 'alpha.safetensors'),
+                'beta/beta.safetensors': os.path.join(beta_dir, 'beta.safetensors'),
+            }
+            entries = preview_batch.collect_preview_batch(
+                ['alpha.safetensors', 'beta/beta.safetensors', 'missing.safetensors'],
+                paths.get,
+                size_value=None,
+            )
+        self.assertEqual(entries, [('alpha.safetensors', 'alpha.png', 'image/png', b'alpha-image')])
+
+    def test_collect_preview_batch_stops_at_byte_budget(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            paths = {}
+            for name in ('a', 'b', 'c'):
+                model_dir = os.path.join(temp_dir, name)
+                os.makedirs(model_dir)
+                paths[name] = os.path.join(model_dir, f'{name}.safetensors')
+                _write(paths[name])
+                _write(os.path.join(model_dir, f'{name}.jpg'), b'x' * 10)
+            entries = preview_batch.collect_preview_batch(['a', 'b', 'c'], paths.get, None, max_bytes=25)
+        self.assertEqual([entry[0] for entry in entries], ['a', 'b'])
+
+    def test_encode_multipart_previews_round_trips(self) -> None:
+        body, content_type = preview_batch.encode_multipart_previews(
+            [
+                ('sub/alpha "v2".safetensors', 'alpha.webp', 'image/webp', b'\x00\r\n--data'),
+                ('ベータ.safetensors', 'beta.png', 'image/png', b'beta'),
+            ],
+            boundary='test-boundary',
+        )
+        self.assertEqual(content_type, 'multipart/form-data; boundary=test-boundary')
+        message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+            f'Content-Type: {content_type}\r\n\r\n'.encode('ascii') + body
+        )
+        parts = list(message.iter_parts())
+        self.assertEqual(
+            [part.get_param('name', header='content-disposition') for part in parts],
+            ['sub/alpha %22v2%22.safetensors', 'ベータ.safetensors'],
+        )
+        self.assertEqual([part.get_content_type() for part in parts], ['image/webp', 'image/png'])
+        self.assertEqual([part.get_payload(decode=True) for part in parts], [b'\x00\r\n--data', b'beta'])
+
+    def test_encode_multipart_previews_empty(self) -> None:
+        body, _content_type = preview_batch.encode_multipart_previews([], boundary='b')
+        self.assertEqual(body, b'--b--\r\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+
+from craftgear_common import preview_index
+from craftgear_common.preview_index import (
+    DEFAULT_IMAGE_EXTENSIONS,
+    DirectoryPreviews,
+    PreviewIndex,
+)
+
+
+class PreviewIndexTest(unittest.TestCase):
+    def _touch(self, path: str) -> None:
+        with open(path, "wb") as file:
+            file.write(b"")
+
+    def _bump_dir_mtime(self, path: str) -> None:
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    def test_scans_directory_once_for_many_models(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            names = [f"model{index}" for index in range(5)]
+            for name in names:
+                self._touch(os.path.join(temp_dir, f"{name}.safetensors"))
+                self._touch(os.path.join(temp_dir, f"{name}.preview.png"))
+            scans = []
+            original_scan = preview_index._scan_images
+            preview_index._scan_images = lambda *args: scans.append(args) or original_scan(*args)
+            try:
+                index = PreviewIndex()
+                for name in names:
+                    result = index.select(
+                        os.path.join(temp_dir, f"{name}.safetensors"),
+                        DEFAULT_IMAGE_EXTENSIONS,
+                    )
+                    self.assertEqual(result, os.path.join(temp_dir, f"{name}.preview.png"))
+            finally:
+                preview_index._scan_images = original_scan
+            self.assertEqual(len(scans), 1)
+
+    def test_rescans_after_directory_changes(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            model_path = os.path.join(temp_dir, "alpha.safetensors")
+            self._touch(model_path)
+            index = PreviewIndex()
+            self.assertIsNone(index.select(model_path, DEFAULT_IMAGE_EXTENSIONS))
+            preview_path = os.path.join(temp_dir, "alpha.png")
+            self._touch(preview_path)
+            self._bump_dir_mtime(temp_dir)
+            self.assertEqual(index.select(model_path, DEFAULT_IMAGE_EXTENSIONS), preview_path)
+
+    def test_matches_prefix_up_to_separator(self) -> None:
+        previews = DirectoryPreviews("/models", ["alpha_v2.preview.png", "alphabet.png"])
+        self.assertEqual(previews.lookup("alpha"), os.path.join("/models", "alpha_v2.preview.png"))
+        self.assertEqual(previews.lookup("ALPHA_V2"), os.path.join("/models", "alpha_v2.preview.png"))
+        self.assertEqual(previews.lookup("alphabet"), os.path.join("/models", "alphabet.png"))
+
+    def test_falls_back_to_hinted_image(self) -> None:
+        previews = DirectoryPreviews("/models", ["beta.png", "gamma_thumb.jpg"])
+        self.assertEqual(previews.lookup("alpha"), os.path.join("/models", "gamma_thumb.jpg"))
+        self.assertIsNone(DirectoryPreviews("/models", []).lookup("alpha"))
+
+
+if __name__ == "__main__":
+    unittest.main()
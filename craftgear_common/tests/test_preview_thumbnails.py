@@ -0,0 +1,120 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from craftgear_common import preview_thumbnails
+from craftgear_common.preview_thumbnails import (
+    ThumbnailCache,
+    resolve_thumbnail_size,
+    thumbnail_key,
+)
+
+try:
+    from PIL import Image
+except Exception:
+    Image = None
+
+
+class ResolveThumbnailSizeTest(unittest.TestCase):
+    def test_snaps_up_to_fixed_sizes(self) -> None:
+        self.assertEqual(resolve_thumbnail_size(1), 256)
+        self.assertEqual(resolve_thumbnail_size('300'), 512)
+        self.assertEqual(resolve_thumbnail_size(1024), 1024)
+
+    def test_clamps_oversize_requests_to_largest_size(self) -> None:
+        self.assertEqual(resolve_thumbnail_size(1440), 1024)
+        self.assertEqual(resolve_thumbnail_size('4096'), 1024)
+
+    def test_returns_none_for_original(self) -> None:
+        self.assertIsNone(resolve_thumbnail_size(None))
+        self.assertIsNone(resolve_thumbnail_size(''))
+        self.assertIsNone(resolve_thumbnail_size(0))
+        self.assertIsNone(resolve_thumbnail_size('abc'))
+
+
+class ThumbnailCacheTest(unittest.TestCase):
+    def test_key_changes_with_source_fingerprint(self) -> None:
+        first = thumbnail_key('/a/b.png', 1, 10, 256)
+        self.assertEqual(first, thumbnail_key('/a/b.png', 1, 10, 256))
+        self.assertNotEqual(first, thumbnail_key('/a/b.png', 2, 10, 256))
+        self.assertNotEqual(first, thumbnail_key('/a/b.png', 1, 10, 512))
+
+    def test_select_preview_file_falls_back_to_original(self) -> None:
+        original_cache = preview_thumbnails._THUMBNAIL_CACHE
+        preview_thumbnails._THUMBNAIL_CACHE = ThumbnailCache('')
+        try:
+            self.assertEqual(
+                preview_thumbnails.select_preview_file('/a/b.png', 256),
+                ('/a/b.png', None),
+            )
+        finally:
+            preview_thumbnails._THUMBNAIL_CACHE = original_cache
+
+    def test_source_change_removes_stale_thumbnails(self) -> None:
+        def render(_source_path: str, thumbnail_path: str, size: int, _extension: str) -> bool:
+            os.makedirs(os.path.dirname(thumbnail_path), exist_ok=True)
+            with open(thumbnail_path, 'wb') as file:
+                file.write(b'x' * size)
+            return True
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            source = os.path.join(temp_dir, 'preview.png')
+            with open(source, 'wb') as file:
+                file.write(b'first')
+            cache = ThumbnailCache(os.path.join(temp_dir, 'cache'))
+            with mock.patch.object(preview_thumbnails, 'Image', object()), mock.patch.object(
+                cache, '_render', side_effect=render
+            ), mock.patch.object(cache, '_note_written'):
+                small = cache.get_or_create(source, 256)[0]
+                large = cache.get_or_create(source, 512)[0]
+                self.assertEqual(os.path.dirname(small), os.path.dirname(large))
+                with open(source, 'wb') as file:
+                    file.write(b'second version')
+                fresh = cache.get_or_create(source, 256)[0]
+            self.assertNotEqual(fresh, small)
+            self.assertEqual(os.listdir(os.path.dirname(fresh)), [os.path.basename(fresh)])
+
+    def test_prune_removes_least_recently_used_over_budget(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = ThumbnailCache(temp_dir, max_bytes=150)
+            paths = []
+            for index in range(3):
+                path = os.path.join(temp_dir, f'{index:02x}', f'{index}.webp')
+                os.makedirs(os.path.dirname(path))
+                with open(path, 'wb') as file:
+                    file.write(b'x' * 100)
+                # 1 番目を最近使ったことにする
+                accessed = 3000 if index == 1 else 1000 + index
+                os.utime(path, (accessed, 1000))
+                paths.append(path)
+            self.assertEqual(cache.prune(), 2)
+            self.assertEqual([os.path.exists(path) for path in paths], [False, True, False])
+            self.assertEqual(cache.prune(), 0)
+
+    @unittest.skipIf(Image is None, 'PIL is required')
+    def test_creates_downscaled_thumbnail_once(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            source = os.path.join(temp_dir, 'preview.png')
+            Image.new('RGB', (1200, 600), (255, 0, 0)).save(source)
+            cache = ThumbnailCache(os.path.join(temp_dir, 'cache'))
+            thumbnail_path, content_type = cache.get_or_create(source, 256)
+            self.assertTrue(content_type.startswith('image/'))
+            with Image.open(thumbnail_path) as thumbnail:
+                self.assertEqual(thumbnail.size, (256, 128))
+            mtime = os.stat(thumbnail_path).st_mtime_ns
+            self.assertEqual(cache.get_or_create(source, 256)[0], thumbnail_path)
+            self.assertEqual(os.stat(thumbnail_path).st_mtime_ns, mtime)
+
+    @unittest.skipIf(Image is None, 'PIL is required')
+    def test_returns_none_for_broken_image(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            source = os.path.join(temp_dir, 'broken.png')
+            with open(source, 'wb') as file:
+                file.write(b'not an image')
+            cache = ThumbnailCache(os.path.join(temp_dir, 'cache'))
+            self.assertIsNone(cache.get_or_create(source, 256))
+
+
+if __name__ == '__main__':
+    unittest.main()
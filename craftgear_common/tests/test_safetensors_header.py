@@ -0,0 +1,61 @@
+import json
+import os
+import tempfile
+import unittest
+
+from craftgear_common.safetensors_header import read_safetensors_header, read_safetensors_metadata
+
+
+class SafetensorsHeaderTest(unittest.TestCase):
+    def test_read_safetensors_header_returns_tensors_and_metadata(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'model.safetensors')
+            header = {'__metadata__': {'ss_network_dim': '16'}, 'w': {'dtype': 'F16', 'shape': [2], 'data_offsets': [0, 4]}}
+            payload = json.dumps(header).encode('utf-8')
+            with open(path, 'wb') as file:
+                file.write(len(payload).to_bytes(8, 'little'))
+                file.write(payload)
+                file.write(b'\x00' * 4)
+            self.assertEqual(read_safetensors_header(path), header)
+            self.assertEqual(read_safetensors_metadata(path), {'ss_network_dim': '16'})
+            huge_path = os.path.join(temp_dir, 'huge.safetensors')
+            with open(huge_path, 'wb') as file:
+                file.write((1 << 40).to_bytes(8, 'little'))
+            self.assertIsNone(read_safetensors_header(huge_path))
+
+    def test_read_safetensors_metadata_invalid(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            txt_path = os.path.join(temp_dir, 'demo.txt')
+            with open(txt_path, 'wb') as file:
+                file.write(b'')
+            self.assertEqual(read_safetensors_metadata(txt_path), {})
+            bad_path = os.path.join(temp_dir, 'bad.safetensors')
+            with open(bad_path, 'wb') as file:
+                file.write(b'1234')
+            self.assertEqual(read_safetensors_metadata(bad_path), {})
+            zero_path = os.path.join(temp_dir, 'zero.safetensors')
+            with open(zero_path, 'wb') as file:
+                file.write((0).to_bytes(8, 'little'))
+            self.assertEqual(read_safetensors_metadata(zero_path), {})
+
+    def test_read_safetensors_metadata_invalid_json(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'bad.safetensors')
+            payload = b'{not-json'
+            with open(path, 'wb') as file:
+                file.write(len(payload).to_bytes(8, 'little'))
+                file.write(payload)
+            self.assertEqual(read_safetensors_metadata(path), {})
+
+    def test_read_safetensors_metadata_non_dict(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'meta.safetensors')
+            payload = json.dumps({'__metadata__': 'oops'}).encode('utf-8')
+            with open(path, 'wb') as file:
+                file.write(len(payload).to_bytes(8, 'little'))
+                file.write(payload)
+            self.assertEqual(read_safetensors_metadata(path), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
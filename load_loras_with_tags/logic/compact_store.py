@@ -0,0 +1,167 @@
+from array import array
+from typing import Iterable, Iterator
+
+
+class TagTable:
+    __slots__ = ('_ids', '_tags', '_refs', '_free')
+
+    def __init__(self) -> None:
+        self._ids: dict[str, int] = {}
+        self._tags: list[str | None] = []
+        self._refs = array('I')
+        self._free: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def intern(self, tag: str) -> int:
+        tag_id = self._ids.get(tag)
+        if tag_id is None:
+            # 解放済みの id を使い回し、追加と削除を繰り返しても表が伸び続けないようにする
+            if self._free:
+                tag_id = self._free.pop()
+                self._tags[tag_id] = tag
+            else:
+                tag_id = len(self._tags)
+                self._tags.append(tag)
+                self._refs.append(0)
+            self._ids[tag] = tag_id
+        self._refs[tag_id] += 1
+        return tag_id
+
+    def release(self, tag_id: int) -> None:
+        refs = self._refs[tag_id] - 1
+        self._refs[tag_id] = refs
+        if refs:
+            return
+        tag = self._tags[tag_id]
+        self._tags[tag_id] = None
+        del self._ids[tag]
+        self._free.append(tag_id)
+
+    def lookup(self, tag: str) -> int | None:
+        return self._ids.get(tag)
+
+    def tag(self, tag_id: int) -> str:
+        return self._tags[tag_id]
+
+
+class CatalogEntry:
+    __slots__ = ('name', 'path', 'size', 'mtime_ns', 'dir_mtime_ns')
+
+    def __init__(self, name: str, path: str, size: int, mtime_ns: int, dir_mtime_ns: int = 0) -> None:
+        self.name = name
+        self.path = path
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.dir_mtime_ns = dir_mtime_ns
+
+    def signature(self) -> tuple[int, int, int]:
+        return (self.mtime_ns, self.size, self.dir_mtime_ns)
+
+
+class TriggerRecord:
+    __slots__ = ('tag_ids', 'counts')
+
+    def __init__(self, tag_ids: array, counts: array) -> None:
+        self.tag_ids = tag_ids
+        self.counts = counts
+
+    def __len__(self) -> int:
+        return len(self.tag_ids)
+
+
+class PostingList:
+    __slots__ = ('lora_ids', 'counts')
+
+    def __init__(self) -> None:
+        self.lora_ids = array('I')
+        self.counts = array('d')
+
+    def __len__(self) -> int:
+        return len(self.lora_ids)
+
+    def add(self, lora_id: int, count: float) -> None:
+        self.lora_ids.append(lora_id)
+        self.counts.append(float(count))
+
+    def remove(self, lora_id: int) -> bool:
+        try:
+            index = self.lora_ids.index(lora_id)
+        except ValueError:
+            return False
+        del self.lora_ids[index]
+        del self.counts[index]
+        return True
+
+    def items(self) -> Iterator[tuple[int, float]]:
+        return zip(self.lora_ids, self.counts)
+
+
+class CompactTriggerStore:
+    def __init__(self, tags: TagTable | None = None) -> None:
+        self.tags = tags if tags is not None else TagTable()
+        self._records: dict[str, TriggerRecord] = {}
+        self._catalog: dict[str, CatalogEntry] = {}
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, lora_name: object) -> bool:
+        return lora_name in self._records
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._records))
+
+    def put(self, lora_name: str, frequencies: Iterable[tuple[str, float]]) -> None:
+        tag_ids = array('I')
+        counts = array('d')
+        for tag, count in frequencies:
+            tag_ids.append(self.tags.intern(tag))
+            counts.append(float(count))
+        # 新しい id を取ってから古い参照を外し、両方にあるタグの id を変えない
+        self._release(self._records.get(lora_name))
+        self._records[lora_name] = TriggerRecord(tag_ids, counts)
+
+    def put_catalog_entry(
+        self,
+        name: str,
+        path: str,
+        size: int,
+        mtime_ns: int,
+        dir_mtime_ns: int = 0,
+    ) -> None:
+        self._catalog[name] = CatalogEntry(name, path, size, mtime_ns, dir_mtime_ns)
+
+    def catalog_entry(self, name: str) -> CatalogEntry | None:
+        return self._catalog.get(name)
+
+    def remove(self, lora_name: str) -> bool:
+        self._catalog.pop(lora_name, None)
+        record = self._records.pop(lora_name, None)
+        self._release(record)
+        return record is not None
+
+    def record(self, lora_name: str) -> TriggerRecord | None:
+        return self._records.get(lora_name)
+
+    def frequencies(self, lora_name: str) -> list[tuple[str, float]]:
+        record = self._records.get(lora_name)
+        if record is None:
+            return []
+        return [
+            (self.tags.tag(tag_id), count)
+            for tag_id, count in zip(record.tag_ids, record.counts)
+        ]
+
+    def triggers(self, lora_name: str) -> list[str]:
+        record = self._records.get(lora_name)
+        if record is None:
+            return []
+        return [self.tags.tag(tag_id) for tag_id in record.tag_ids]
+
+    def _release(self, record: TriggerRecord | None) -> None:
+        if record is None:
+            return
+        for tag_id in record.tag_ids:
+            self.tags.release(tag_id)
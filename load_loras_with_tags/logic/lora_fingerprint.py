@@ -0,0 +1,63 @@
+import os
+import threading
+
+from ...craftgear_common.file_hashing import sha256_file
+from ...craftgear_common.hash_store import DEFAULT_ALGORITHM, SHA256_ALGORITHM, HashStore, get_hash_store
+
+_DIGEST_CACHE: dict[str, tuple[int, int, str]] = {}
+_DIGEST_LOCK = threading.Lock()
+
+
+def lora_content_key(lora_path: str) -> str:
+    # 同一内容のファイルを 1 つの state dict に寄せるため、SHA-256 全体をキーにする
+    try:
+        stat = os.stat(lora_path)
+    except OSError:
+        return lora_path
+    with _DIGEST_LOCK:
+        cached = _DIGEST_CACHE.get(lora_path)
+    if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return f'sha256:{cached[2]}'
+    store = get_hash_store()
+    # 再起動後も読み直さないよう、永続キャッシュにある全体ハッシュを先に探す
+    digest = _read_stored_digest(store, lora_path, stat)
+    if not digest:
+        try:
+            digest = sha256_file(lora_path)
+        except OSError:
+            return lora_path
+        _write_stored_digest(store, lora_path, stat, digest)
+    with _DIGEST_LOCK:
+        _DIGEST_CACHE[lora_path] = (stat.st_mtime_ns, stat.st_size, digest)
+    return f'sha256:{digest}'
+
+
+def _read_stored_digest(store: HashStore | None, lora_path: str, stat: os.stat_result) -> str:
+    if store is None:
+        return ''
+    try:
+        digest = store.get(lora_path, stat.st_mtime_ns, stat.st_size, SHA256_ALGORITHM)
+        if digest or not stat.st_ino:
+            return digest or ''
+        # 移動や名前変更の前に計算した同じ実体を探す
+        digest = store.get_by_identity(
+            stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size, SHA256_ALGORITHM
+        )
+        if digest:
+            _write_stored_digest(store, lora_path, stat, digest)
+        return digest or ''
+    except Exception:
+        return ''
+
+
+def _write_stored_digest(store: HashStore | None, lora_path: str, stat: os.stat_result, digest: str) -> None:
+    if store is None:
+        return
+    entry = (lora_path, stat.st_mtime_ns, stat.st_size)
+    identity = (stat.st_dev, stat.st_ino)
+    try:
+        store.put_many([(*entry, digest, *identity)], SHA256_ALGORITHM)
+        # メタデータ書き込みの AutoV2 は先頭 10 桁なので、同じ計算結果をそのまま渡しておく
+        store.put_many([(*entry, digest[:10], *identity)], DEFAULT_ALGORITHM)
+    except Exception:
+        pass
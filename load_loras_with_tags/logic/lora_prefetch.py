@@ -0,0 +1,37 @@
+from typing import Callable
+
+from ...craftgear_common.page_cache import PageCacheWarmer
+
+DEFAULT_PREFETCH_BUDGET_BYTES = 4 * 1024 * 1024 * 1024
+_CHUNK_PAUSE_SECONDS = 0.001
+_BUSY_POLL_SECONDS = 0.5
+
+
+class LoraPrefetcher(PageCacheWarmer):
+    def __init__(
+        self,
+        budget_bytes: int = DEFAULT_PREFETCH_BUDGET_BYTES,
+        chunk_pause: float = _CHUNK_PAUSE_SECONDS,
+        is_busy: Callable[[], bool] | None = None,
+        busy_poll: float = _BUSY_POLL_SECONDS,
+    ) -> None:
+        super().__init__(
+            budget_bytes,
+            is_busy=is_busy,
+            busy_poll=busy_poll,
+            chunk_pause=chunk_pause,
+            thread_name='craftgear-lora-prefetch',
+        )
+
+
+_PREFETCHER = LoraPrefetcher()
+
+
+def get_lora_prefetcher() -> LoraPrefetcher:
+    return _PREFETCHER
+
+
+def request_lora_prefetch(lora_path: str) -> str:
+    if not lora_path:
+        return 'not_found'
+    return _PREFETCHER.request(lora_path)
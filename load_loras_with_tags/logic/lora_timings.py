@@ -0,0 +1,138 @@
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+TIMING_STAGES = ('catalog', 'triggers', 'load', 'patch')
+DEFAULT_TIMING_WINDOW = 200
+_PERCENTILES = (50, 90, 99)
+
+
+class LoraTimingRecorder:
+    def __init__(self) -> None:
+        self.totals: dict[str, float] = {stage: 0.0 for stage in TIMING_STAGES}
+        self.loras: dict[str, dict[str, Any]] = {}
+
+    @contextmanager
+    def measure(self, stage: str, lora_name: str = '', lora_path: str = '') -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start, lora_name, lora_path)
+
+    def add(self, stage: str, seconds: float, lora_name: str = '', lora_path: str = '') -> None:
+        elapsed_ms = max(0.0, seconds) * 1000.0
+        self.totals[stage] = self.totals.get(stage, 0.0) + elapsed_ms
+        if not lora_name:
+            return
+        entry = self.loras.get(lora_name)
+        if entry is None:
+            entry = {
+                'name': lora_name,
+                'folder': os.path.dirname(lora_path) if lora_path else '',
+                'stages': {},
+            }
+            self.loras[lora_name] = entry
+        stages = entry['stages']
+        stages[stage] = stages.get(stage, 0.0) + elapsed_ms
+
+    def summary(self) -> dict[str, Any]:
+        loras = []
+        for entry in self.loras.values():
+            stages = {stage: round(value, 3) for stage, value in entry['stages'].items()}
+            loras.append(
+                {
+                    'name': entry['name'],
+                    'folder': entry['folder'],
+                    'stages': stages,
+                    'total_ms': round(sum(entry['stages'].values()), 3),
+                }
+            )
+        return {
+            'total_ms': round(sum(self.totals.values()), 3),
+            'stages': {stage: round(value, 3) for stage, value in self.totals.items()},
+            'loras': loras,
+        }
+
+
+class LoraTimingStats:
+    def __init__(self, window: int = DEFAULT_TIMING_WINDOW) -> None:
+        self.window = max(1, int(window))
+        self._lock = threading.Lock()
+        self._runs = 0
+        self._stages: dict[str, deque[float]] = {}
+        self._loras: dict[str, deque[float]] = {}
+        self._folders: dict[str, deque[float]] = {}
+
+    def record(self, summary: dict[str, Any]) -> None:
+        with self._lock:
+            self._runs += 1
+            self._push(self._stages, 'total', summary.get('total_ms', 0.0))
+            for stage, value in summary.get('stages', {}).items():
+                self._push(self._stages, stage, value)
+            for entry in summary.get('loras', []):
+                value = entry.get('total_ms', 0.0)
+                self._push(self._loras, entry.get('name', ''), value)
+                folder = entry.get('folder', '')
+                if folder:
+                    self._push(self._folders, folder, value)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                'runs': self._runs,
+                'window': self.window,
+                'stages': {name: _describe(values) for name, values in self._stages.items()},
+                'loras': _describe_sorted(self._loras),
+                'folders': _describe_sorted(self._folders),
+            }
+
+    def _push(self, target: dict[str, deque[float]], key: str, value: Any) -> None:
+        if not key:
+            return
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            return
+        values = target.get(key)
+        if values is None:
+            values = deque(maxlen=self.window)
+            target[key] = values
+        values.append(number)
+
+
+def _percentile(sorted_values: list[float], percent: int) -> float:
+    if not sorted_values:
+        return 0.0
+    # nearest-rank 方式
+    rank = max(1, -(-len(sorted_values) * percent // 100))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _describe(values: deque[float]) -> dict[str, Any]:
+    ordered = sorted(values)
+    output: dict[str, Any] = {'count': len(ordered)}
+    for percent in _PERCENTILES:
+        output[f'p{percent}'] = round(_percentile(ordered, percent), 3)
+    output['max'] = round(ordered[-1], 3) if ordered else 0.0
+    return output
+
+
+def _describe_sorted(source: dict[str, deque[float]]) -> list[dict[str, Any]]:
+    described = [{'name': name, **_describe(values)} for name, values in source.items()]
+    described.sort(key=lambda item: (-item['p90'], item['name']))
+    return described
+
+
+_STATS = LoraTimingStats()
+
+
+def record_lora_timings(summary: dict[str, Any]) -> None:
+    _STATS.record(summary)
+
+
+def get_lora_timing_stats() -> dict[str, Any]:
+    return _STATS.snapshot()
@@ -0,0 +1,202 @@
+import bisect
+import math
+import os
+import threading
+import time
+from typing import Any, Callable
+
+from .compact_store import CompactTriggerStore, PostingList, TagTable
+from .trigger_words import extract_lora_trigger_frequencies
+
+DEFAULT_SEARCH_LIMIT = 50
+DEFAULT_SYNC_INTERVAL_SECONDS = 10.0
+
+
+def normalize_trigger_tag(value: Any) -> str:
+    text = '' if value is None else str(value)
+    text = text.replace('\\(', '(').replace('\\)', ')').replace('_', ' ')
+    return ' '.join(text.split()).casefold()
+
+
+class TriggerTagIndex:
+    def __init__(
+        self,
+        extract: Callable[[str], list[tuple[str, float]]] = extract_lora_trigger_frequencies,
+    ) -> None:
+        self._extract = extract
+        self._lock = threading.RLock()
+        self._store = CompactTriggerStore()
+        # タグも LoRA 名も id に置き換え、転置リストは array の列で持つ
+        self._lora_ids = TagTable()
+        self._postings: dict[int, PostingList] = {}
+        self._display: dict[int, str] = {}
+        self._sorted_tags: list[str] | None = None
+        self._last_sync = 0.0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._store)
+
+    def update(self, lora_name: str, lora_path: str) -> bool:
+        signature = _file_signature(lora_path)
+        if signature is None:
+            return self.remove(lora_name)
+        with self._lock:
+            entry = self._store.catalog_entry(lora_name)
+            if entry is not None and entry.signature() == signature:
+                return False
+        frequencies = self._extract(lora_path)
+        tags: dict[str, float] = {}
+        display: dict[str, str] = {}
+        for tag, count in frequencies:
+            key = normalize_trigger_tag(tag)
+            if not key:
+                continue
+            display.setdefault(key, str(tag).strip())
+            tags[key] = _merge_count(tags.get(key), count)
+        with self._lock:
+            self._drop_postings(lora_name)
+            mtime_ns, size, dir_mtime_ns = signature
+            self._store.put_catalog_entry(lora_name, lora_path, size, mtime_ns, dir_mtime_ns)
+            self._store.put(lora_name, tags.items())
+            lora_id = self._lora_ids.lookup(lora_name)
+            if lora_id is None:
+                lora_id = self._lora_ids.intern(lora_name)
+            record = self._store.record(lora_name)
+            for tag_id, count in zip(record.tag_ids, record.counts):
+                postings = self._postings.get(tag_id)
+                if postings is None:
+                    postings = PostingList()
+                    self._postings[tag_id] = postings
+                    key = self._store.tags.tag(tag_id)
+                    # 表示名が正規化後と同じなら持たない
+                    if display[key] != key:
+                        self._display[tag_id] = display[key]
+                    self._sorted_tags = None
+                postings.add(lora_id, count)
+        return True
+
+    def remove(self, lora_name: str) -> bool:
+        with self._lock:
+            if lora_name not in self._store:
+                return False
+            self._drop_postings(lora_name)
+            self._store.remove(lora_name)
+            lora_id = self._lora_ids.lookup(lora_name)
+            if lora_id is not None:
+                self._lora_ids.release(lora_id)
+        return True
+
+    def sync(self, lora_paths: dict[str, str]) -> int:
+        changed = 0
+        with self._lock:
+            stale = [name for name in self._store if name not in lora_paths]
+        for name in stale:
+            if self.remove(name):
+                changed += 1
+        for name, path in lora_paths.items():
+            if self.update(name, path):
+                changed += 1
+        with self._lock:
+            self._last_sync = time.monotonic()
+        return changed
+
+    def sync_if_stale(
+        self,
+        load_lora_paths: Callable[[], dict[str, str]],
+        max_age: float = DEFAULT_SYNC_INTERVAL_SECONDS,
+    ) -> int:
+        with self._lock:
+            if self._last_sync and time.monotonic() - self._last_sync < max_age:
+                return 0
+        return self.sync(load_lora_paths())
+
+    def search(
+        self,
+        query: Any,
+        mode: str = 'prefix',
+        limit: int = DEFAULT_SEARCH_LIMIT,
+    ) -> list[dict[str, Any]]:
+        needle = normalize_trigger_tag(query)
+        if not needle:
+            return []
+        with self._lock:
+            tags = self._store.tags
+            if mode == 'substring':
+                matches = [tag_id for tag_id in self._postings if needle in tags.tag(tag_id)]
+            else:
+                matches = self._prefix_matches(needle)
+            matches.sort(
+                key=lambda tag_id: (tags.tag(tag_id) != needle, -len(self._postings[tag_id]), tags.tag(tag_id))
+            )
+            results = []
+            for tag_id in matches[: max(0, int(limit))]:
+                loras = sorted(
+                    ((self._lora_ids.tag(lora_id), count) for lora_id, count in self._postings[tag_id].items()),
+                    key=lambda item: (-item[1], item[0].casefold()),
+                )
+                results.append(
+                    {
+                        'tag': self._display.get(tag_id, tags.tag(tag_id)),
+                        'loras': [{'name': name, 'count': count} for name, count in loras],
+                    }
+                )
+        return results
+
+    def _prefix_matches(self, needle: str) -> list[int]:
+        tags = self._store.tags
+        if self._sorted_tags is None:
+            self._sorted_tags = sorted(tags.tag(tag_id) for tag_id in self._postings)
+        sorted_tags = self._sorted_tags
+        start = bisect.bisect_left(sorted_tags, needle)
+        end = start
+        while end < len(sorted_tags) and sorted_tags[end].startswith(needle):
+            end += 1
+        return [tags.lookup(tag) for tag in sorted_tags[start:end]]
+
+    def _drop_postings(self, lora_name: str) -> None:
+        record = self._store.record(lora_name)
+        lora_id = self._lora_ids.lookup(lora_name)
+        if record is None or lora_id is None:
+            return
+        for tag_id in record.tag_ids:
+            postings = self._postings.get(tag_id)
+            if postings is None:
+                continue
+            postings.remove(lora_id)
+            if not postings:
+                del self._postings[tag_id]
+                self._display.pop(tag_id, None)
+                self._sorted_tags = None
+
+
+def _file_signature(path: str) -> tuple[int, int, int] | None:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    try:
+        # サイドカー JSON の追加・更新も拾うためディレクトリの mtime も含める
+        dir_mtime = os.stat(os.path.dirname(path) or '.').st_mtime_ns
+    except OSError:
+        dir_mtime = 0
+    return (stat.st_mtime_ns, stat.st_size, dir_mtime)
+
+
+def _merge_count(current: float | None, count: Any) -> float:
+    try:
+        value = float(count)
+    except (TypeError, ValueError):
+        value = 1.0
+    if current is None:
+        return value
+    if math.isinf(current) or math.isinf(value):
+        return float('inf')
+    return current + value
+
+
+_INDEX = TriggerTagIndex()
+
+
+def get_trigger_index() -> TriggerTagIndex:
+    return _INDEX
@@ -3,6 +3,8 @@ import math
 import os
 from typing import Any
 
+from ...craftgear_common.safetensors_header import read_safetensors_metadata
+
 USE_SS_TAG_FREQUENCY = True
 USE_TRAINED_WORDS = True
 USE_TRIGGER_WORDS = True
@@ -11,14 +13,14 @@ USE_SS_TAG_STRINGS = False
 
 def extract_lora_triggers(lora_path: str) -> list[str]:
     sidecar_triggers, _frequencies = _extract_sidecar_triggers_and_frequencies(lora_path)
-    metadata = _read_safetensors_metadata(lora_path)
+    metadata = read_safetensors_metadata(lora_path)
     metadata_triggers = _extract_triggers_from_metadata(metadata) if metadata else []
     return _merge_trigger_lists(sidecar_triggers, metadata_triggers)
 
 
 def extract_lora_trigger_frequencies(lora_path: str) -> list[tuple[str, float]]:
     sidecar_triggers, sidecar_frequencies = _extract_sidecar_triggers_and_frequencies(lora_path)
-    metadata = _read_safetensors_metadata(lora_path)
+    metadata = read_safetensors_metadata(lora_path)
     metadata_frequencies = _extract_trigger_frequencies_from_metadata(metadata) if metadata else []
     if not sidecar_triggers:
         return metadata_frequencies
@@ -42,27 +44,6 @@ def filter_lora_triggers(triggers: list[str], selection_text: str) -> list[str]:
     return [trigger for trigger in triggers if trigger in selected]
 
 
-def _read_safetensors_metadata(lora_path: str) -> dict[str, Any]:
-    if os.path.splitext(lora_path)[1].lower() != ".safetensors":
-        return {}
-    try:
-        with open(lora_path, "rb") as file:
-            header_size_bytes = file.read(8)
-            if len(header_size_bytes) != 8:
-                return {}
-            header_size = int.from_bytes(header_size_bytes, "little", signed=False)
-            if header_size <= 0:
-                return {}
-            header = file.read(header_size)
-        header_json = json.loads(header)
-    except (OSError, ValueError, json.JSONDecodeError):
-        return {}
-    metadata = header_json.get("__metadata__")
-    if isinstance(metadata, dict):
-        return metadata
-    return {}
-
-
 def _read_json_if_dict(path: str) -> dict[str, Any]:
     try:
         with open(path, "r", encoding="utf-8") as file:
@@ -0,0 +1,3 @@
+from craftgear_common.tests.bootstrap import install
+
+install()
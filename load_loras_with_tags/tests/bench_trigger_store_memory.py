@@ -0,0 +1,103 @@
+import random
+import sys
+import tracemalloc
+from typing import Any, Callable
+from unittest import mock
+
+from load_loras_with_tags.logic import trigger_index
+from load_loras_with_tags.logic.compact_store import CompactTriggerStore
+from load_loras_with_tags.logic.trigger_index import TriggerTagIndex
+
+
+def build_synthetic_frequencies(
+    lora_count: int,
+    tags_per_lora: int,
+    vocabulary_size: int,
+    seed: int = 0,
+) -> dict[str, list[tuple[str, float]]]:
+    rng = random.Random(seed)
+    vocabulary = [f'tag_{index}' for index in range(vocabulary_size)]
+    weights = [1.0 / (rank + 1) for rank in range(vocabulary_size)]
+    output: dict[str, list[tuple[str, float]]] = {}
+    for index in range(lora_count):
+        picked = dict.fromkeys(rng.choices(vocabulary, weights=weights, k=tags_per_lora))
+        # trigger_words.py は LoRA ごとに JSON をデコードするので、同じタグでも別オブジェクトになる
+        output[f'lora_{index}.safetensors'] = [
+            (tag.encode('utf-8').decode('utf-8'), float(rng.randint(1, 500))) for tag in picked
+        ]
+    return output
+
+
+def build_plain(source: dict[str, list[tuple[str, float]]]) -> dict[str, Any]:
+    return {
+        name: {
+            'triggers': [tag.encode('utf-8').decode('utf-8') for tag, _count in frequencies],
+            'frequencies': [(tag.encode('utf-8').decode('utf-8'), count) for tag, count in frequencies],
+        }
+        for name, frequencies in source.items()
+    }
+
+
+def build_compact(source: dict[str, list[tuple[str, float]]]) -> CompactTriggerStore:
+    store = CompactTriggerStore()
+    for name, frequencies in source.items():
+        store.put(name, frequencies)
+        store.put_catalog_entry(name, f'/models/loras/{name}', 100_000_000, 0)
+    return store
+
+
+def build_dict_index(source: dict[str, list[tuple[str, float]]]) -> tuple[CompactTriggerStore, dict[str, Any]]:
+    # 以前の TriggerTagIndex と同じく、タグ文字列 -> {LoRA 名: 回数} の dict で転置リストを持つ
+    store = build_compact(source)
+    postings: dict[str, dict[str, float]] = {}
+    display: dict[str, str] = {}
+    for name in source:
+        for tag, count in store.frequencies(name):
+            key = trigger_index.normalize_trigger_tag(tag)
+            display.setdefault(key, tag)
+            postings.setdefault(key, {})[name] = count
+    return store, {'postings': postings, 'display': display}
+
+
+def build_index(source: dict[str, list[tuple[str, float]]]) -> TriggerTagIndex:
+    index = TriggerTagIndex(extract=lambda path: source[path.rsplit('/', 1)[-1]])
+    # ファイルを作らずに済むよう、更新判定のシグネチャだけ固定値にする
+    with mock.patch.object(trigger_index, '_file_signature', return_value=(0, 100_000_000, 0)):
+        for name in source:
+            index.update(name, f'/models/loras/{name}')
+    return index
+
+
+def measure_bytes(builder: Callable[[], Any]) -> int:
+    tracemalloc.start()
+    try:
+        baseline, _peak = tracemalloc.get_traced_memory()
+        result = builder()
+        current, _peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return current - baseline
+
+
+def main(argv: list[str]) -> int:
+    lora_count = int(argv[1]) if len(argv) > 1 else 5000
+    tags_per_lora = int(argv[2]) if len(argv) > 2 else 300
+    vocabulary_size = int(argv[3]) if len(argv) > 3 else 30000
+    source = build_synthetic_frequencies(lora_count, tags_per_lora, vocabulary_size)
+    plain_bytes = measure_bytes(lambda: build_plain(source))
+    compact_bytes = measure_bytes(lambda: build_compact(source))
+    dict_index_bytes = measure_bytes(lambda: build_dict_index(source))
+    index_bytes = measure_bytes(lambda: build_index(source))
+    print(f'loras={lora_count} tags/lora={tags_per_lora} vocabulary={vocabulary_size}')
+    print(f'plain      : {plain_bytes / 1024 / 1024:8.1f} MiB')
+    print(f'compact    : {compact_bytes / 1024 / 1024:8.1f} MiB')
+    print(f'ratio      : {plain_bytes / max(compact_bytes, 1):8.1f}x')
+    print(f'dict index : {dict_index_bytes / 1024 / 1024:8.1f} MiB')
+    print(f'index      : {index_bytes / 1024 / 1024:8.1f} MiB')
+    print(f'ratio      : {dict_index_bytes / max(index_bytes, 1):8.1f}x')
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main(sys.argv))
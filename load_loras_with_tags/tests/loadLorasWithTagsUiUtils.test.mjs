@@ -27,6 +27,10 @@ import {
   shouldBlurTagFilterOnKey,
   buildStrengthRangeCss,
   buildStrengthRangeProgressBackground,
+  formatLoraTimingSummary,
+  resolvePreviewThumbnailSize,
+  collectPreviewBatchNames,
+  readPreviewBatch,
   strengthRangeInputClass,
   strengthRangeThumbSize,
   strengthRangeTrackHeight,
@@ -760,4 +764,44 @@ describe('loadLorasWithTagsUiUtils', () => {
     assert.equal(shouldSelectLoraDialogFilterOnOpen('None'), false);
     assert.equal(shouldSelectLoraDialogFilterOnOpen('lora_name'), true);
   });
+
+  it('formats the latest LoRA timing summary', () => {
+    assert.equal(formatLoraTimingSummary(undefined), '');
+    assert.equal(formatLoraTimingSummary([]), '');
+    assert.equal(formatLoraTimingSummary([{ total_ms: 0 }]), '');
+    assert.equal(formatLoraTimingSummary([{ total_ms: 12.4 }]), '12 ms');
+    assert.equal(formatLoraTimingSummary([{ total_ms: 1 }, { total_ms: 2345 }]), '2.35 s');
+  });
+
+  it('resolves preview thumbnail size from panel width, pixel ratio and zoom', () => {
+    assert.equal(resolvePreviewThumbnailSize(360, 1, 1), 360);
+    assert.equal(resolvePreviewThumbnailSize(360, 2, 2), 1440);
+    assert.equal(resolvePreviewThumbnailSize(360, undefined, 0.5), 360);
+    assert.equal(resolvePreviewThumbnailSize(0, 2, 2), 0);
+  });
+
+  it('collects preview batch names that are not requested yet', () => {
+    const requested = new Set(['b.safetensors']);
+    assert.deepEqual(
+      collectPreviewBatchNames(
+        ['None', 'a.safetensors', 'b.safetensors', 'a.safetensors', null, 'c.safetensors', 'd.safetensors'],
+        requested,
+        2,
+      ),
+      ['a.safetensors', 'c.safetensors'],
+    );
+    assert.deepEqual(collectPreviewBatchNames(undefined, requested), []);
+  });
+
+  it('reads image parts from a preview batch response', async () => {
+    const formData = new FormData();
+    formData.append('a.safetensors', new Blob(['png'], { type: 'image/png' }), 'a.png');
+    formData.append('b.safetensors', new Blob([], { type: 'image/png' }), 'b.png');
+    formData.append('c.safetensors', 'text');
+    formData.append('d.safetensors', new Blob(['{}'], { type: 'application/json' }), 'd.json');
+    const previews = readPreviewBatch(formData);
+    assert.deepEqual([...previews.keys()], ['a.safetensors']);
+    assert.equal(await previews.get('a.safetensors').text(), 'png');
+    assert.equal(readPreviewBatch(null).size, 0);
+  });
 });
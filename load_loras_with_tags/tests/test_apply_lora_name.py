@@ -43,7 +43,7 @@ class LoadLorasWithTagsApplyLoraNameTest(unittest.TestCase):
             lora_on_1=True,
             tag_selection_1='',
             tags='alpha',
-        )
+        )['result']
 
         self.assertEqual(calls.get('filename'), 'example.safetensors')
         self.assertEqual(result, ('model', 'clip', 'alpha'))
@@ -69,7 +69,7 @@ class LoadLorasWithTagsApplyLoraNameTest(unittest.TestCase):
             lora_on_1=True,
             tag_selection_1='',
             tags='alpha',
-        )
+        )['result']
 
         self.assertEqual(calls.get('filename'), 'example.safetensors')
         self.assertEqual(result, ('model', 'clip', 'alpha'))
@@ -0,0 +1,82 @@
+import unittest
+
+from load_loras_with_tags.logic.compact_store import CompactTriggerStore, TagTable
+from load_loras_with_tags.tests.bench_trigger_store_memory import (
+    build_compact,
+    build_dict_index,
+    build_index,
+    build_plain,
+    build_synthetic_frequencies,
+    measure_bytes,
+)
+
+
+class TagTableTest(unittest.TestCase):
+    def test_intern_reuses_ids(self) -> None:
+        table = TagTable()
+        first = table.intern('1girl')
+        self.assertEqual(table.intern('1girl'), first)
+        self.assertNotEqual(table.intern('solo'), first)
+        self.assertEqual(table.tag(first), '1girl')
+        self.assertEqual(table.lookup('missing'), None)
+        self.assertEqual(len(table), 2)
+
+    def test_release_frees_and_reuses_ids(self) -> None:
+        table = TagTable()
+        first = table.intern('1girl')
+        table.intern('1girl')
+        table.release(first)
+        self.assertEqual(table.lookup('1girl'), first)
+        table.release(first)
+        self.assertIsNone(table.lookup('1girl'))
+        self.assertEqual(len(table), 0)
+        self.assertEqual(table.intern('solo'), first)
+
+
+class CompactTriggerStoreTest(unittest.TestCase):
+    def test_round_trips_frequencies(self) -> None:
+        store = CompactTriggerStore()
+        store.put('a.safetensors', [('1girl', 10.0), ('solo', float('inf'))])
+        store.put('b.safetensors', [('1girl', 3.0)])
+        self.assertEqual(store.frequencies('a.safetensors'), [('1girl', 10.0), ('solo', float('inf'))])
+        self.assertEqual(store.triggers('b.safetensors'), ['1girl'])
+        self.assertEqual(len(store.tags), 2)
+        self.assertIn('a.safetensors', store)
+        self.assertEqual(store.frequencies('missing'), [])
+
+    def test_catalog_entries_and_remove(self) -> None:
+        store = CompactTriggerStore()
+        store.put('a.safetensors', [('x', 1.0)])
+        store.put_catalog_entry('a.safetensors', '/loras/a.safetensors', 10, 20, 30)
+        entry = store.catalog_entry('a.safetensors')
+        self.assertEqual(entry.signature(), (20, 10, 30))
+        self.assertTrue(store.remove('a.safetensors'))
+        self.assertIsNone(store.catalog_entry('a.safetensors'))
+        self.assertFalse(store.remove('a.safetensors'))
+        self.assertEqual(len(store), 0)
+        self.assertEqual(len(store.tags), 0)
+
+    def test_put_keeps_ids_of_shared_tags(self) -> None:
+        store = CompactTriggerStore()
+        store.put('a.safetensors', [('1girl', 1.0), ('solo', 2.0)])
+        tag_id = store.tags.lookup('1girl')
+        store.put('a.safetensors', [('1girl', 3.0), ('smile', 4.0)])
+        self.assertEqual(store.tags.lookup('1girl'), tag_id)
+        self.assertIsNone(store.tags.lookup('solo'))
+        self.assertEqual(store.frequencies('a.safetensors'), [('1girl', 3.0), ('smile', 4.0)])
+
+    def test_uses_less_memory_than_plain_structures(self) -> None:
+        source = build_synthetic_frequencies(200, 100, 2000)
+        plain_bytes = measure_bytes(lambda: build_plain(source))
+        compact_bytes = measure_bytes(lambda: build_compact(source))
+        self.assertLess(compact_bytes * 3, plain_bytes)
+
+    def test_index_postings_use_less_memory_than_dicts(self) -> None:
+        source = build_synthetic_frequencies(200, 100, 2000)
+        dict_bytes = measure_bytes(lambda: build_dict_index(source))
+        index_bytes = measure_bytes(lambda: build_index(source))
+        self.assertLess(index_bytes, dict_bytes)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import hashlib
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from load_loras_with_tags.logic import lora_fingerprint
+from load_loras_with_tags.logic.lora_fingerprint import lora_content_key
+from craftgear_common.hash_store import DEFAULT_ALGORITHM, HashStore
+
+
+class LoraFingerprintTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._cache_patch = mock.patch.dict(lora_fingerprint._DIGEST_CACHE, clear=True)
+        self._cache_patch.start()
+        self._store_patch = mock.patch.object(lora_fingerprint, 'get_hash_store', return_value=None)
+        self._store_patch.start()
+
+    def tearDown(self) -> None:
+        self._store_patch.stop()
+        self._cache_patch.stop()
+
+    def _write(self, path: str, payload: bytes) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as file:
+            file.write(payload)
+
+    def test_identical_files_share_key(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            first = os.path.join(temp_dir, 'a', 'style.safetensors')
+            second = os.path.join(temp_dir, 'b', 'style_copy.safetensors')
+            self._write(first, b'same-bytes')
+            self._write(second, b'same-bytes')
+            self.assertEqual(lora_content_key(first), lora_content_key(second))
+            self.assertEqual(lora_content_key(first), 'sha256:' + hashlib.sha256(b'same-bytes').hexdigest())
+
+    def test_different_files_have_different_keys(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            first = os.path.join(temp_dir, 'a.safetensors')
+            second = os.path.join(temp_dir, 'b.safetensors')
+            self._write(first, b'alpha')
+            self._write(second, b'beta')
+            self.assertNotEqual(lora_content_key(first), lora_content_key(second))
+
+    def test_digest_is_reused_until_file_changes(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'a.safetensors')
+            self._write(path, b'alpha')
+            with mock.patch.object(lora_fingerprint, 'sha256_file', wraps=lora_fingerprint.sha256_file) as hashed:
+                first = lora_content_key(path)
+                self.assertEqual(lora_content_key(path), first)
+                self.assertEqual(hashed.call_count, 1)
+                self._write(path, b'changed')
+                self.assertNotEqual(lora_content_key(path), first)
+                self.assertEqual(hashed.call_count, 2)
+
+    def test_digest_survives_restart_through_hash_store(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'a.safetensors')
+            self._write(path, b'alpha')
+            store = HashStore(os.path.join(temp_dir, 'hashes.sqlite3'))
+            try:
+                with mock.patch.object(lora_fingerprint, 'get_hash_store', return_value=store):
+                    first = lora_content_key(path)
+                    lora_fingerprint._DIGEST_CACHE.clear()
+                    with mock.patch.object(lora_fingerprint, 'sha256_file') as hashed:
+                        self.assertEqual(lora_content_key(path), first)
+                        hashed.assert_not_called()
+                stat = os.stat(path)
+                # メタデータ側の AutoV2 も同じ計算結果から引ける
+                self.assertEqual(
+                    store.get(path, stat.st_mtime_ns, stat.st_size, DEFAULT_ALGORITHM),
+                    first[len('sha256:'):][:10],
+                )
+            finally:
+                store.close()
+
+    def test_missing_file_falls_back_to_path(self) -> None:
+        self.assertEqual(lora_content_key('/nonexistent/a.safetensors'), '/nonexistent/a.safetensors')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import tempfile
+import time
+import unittest
+
+from load_loras_with_tags.logic.lora_prefetch import LoraPrefetcher
+
+
+class LoraPrefetcherTest(unittest.TestCase):
+    def _write(self, path: str, size: int) -> None:
+        with open(path, 'wb') as file:
+            file.write(b'\x00' * size)
+
+    def _wait_until_warm(self, prefetcher: LoraPrefetcher, path: str) -> bool:
+        deadline = time.monotonic() + 5.0
+        while time.monotonic() < deadline:
+            if prefetcher.is_warm(path):
+                return True
+            time.sleep(0.01)
+        return False
+
+    def test_request_missing_file(self) -> None:
+        prefetcher = LoraPrefetcher(budget_bytes=1024, chunk_pause=0)
+        self.assertEqual(prefetcher.request('/nonexistent/a.safetensors'), 'not_found')
+
+    def test_request_over_budget(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'big.safetensors')
+            self._write(path, 2048)
+            prefetcher = LoraPrefetcher(budget_bytes=1024, chunk_pause=0)
+            self.assertEqual(prefetcher.request(path), 'over_budget')
+
+    def test_request_warms_in_background(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'a.safetensors')
+            self._write(path, 512)
+            prefetcher = LoraPrefetcher(budget_bytes=1024, chunk_pause=0)
+            self.assertEqual(prefetcher.request(path), 'queued')
+            self.assertTrue(self._wait_until_warm(prefetcher, path))
+            self.assertEqual(prefetcher.request(path), 'warm')
+
+    def test_rewarms_after_modification(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'a.safetensors')
+            self._write(path, 16)
+            prefetcher = LoraPrefetcher(budget_bytes=1024, chunk_pause=0)
+            self.assertTrue(prefetcher.warm_now(path))
+            self._write(path, 32)
+            self.assertFalse(prefetcher.is_warm(path))
+
+    def test_backs_off_while_prompt_runs(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'a.safetensors')
+            self._write(path, 512)
+            busy = [True]
+            prefetcher = LoraPrefetcher(budget_bytes=1024, chunk_pause=0, is_busy=lambda: busy[0], busy_poll=0.01)
+            self.assertEqual(prefetcher.request(path), 'queued')
+            time.sleep(0.1)
+            self.assertFalse(prefetcher.is_warm(path))
+            busy[0] = False
+            self.assertTrue(self._wait_until_warm(prefetcher, path))
+
+    def test_budget_evicts_oldest(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            first = os.path.join(temp_dir, 'a.safetensors')
+            second = os.path.join(temp_dir, 'b.safetensors')
+            self._write(first, 600)
+            self._write(second, 600)
+            prefetcher = LoraPrefetcher(budget_bytes=1000, chunk_pause=0)
+            self.assertTrue(prefetcher.warm_now(first))
+            self.assertTrue(prefetcher.warm_now(second))
+            self.assertFalse(prefetcher.is_warm(first))
+            self.assertTrue(prefetcher.is_warm(second))
+
+
+if __name__ == '__main__':
+    unittest.main()
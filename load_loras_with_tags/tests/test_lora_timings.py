@@ -0,0 +1,70 @@
+import unittest
+
+from load_loras_with_tags.logic.lora_timings import (
+    LoraTimingRecorder,
+    LoraTimingStats,
+)
+
+
+class LoraTimingRecorderTest(unittest.TestCase):
+    def test_summary_accumulates_per_stage_and_lora(self) -> None:
+        recorder = LoraTimingRecorder()
+        recorder.add('catalog', 0.002)
+        recorder.add('load', 0.010, 'a.safetensors', '/share/a.safetensors')
+        recorder.add('patch', 0.005, 'a.safetensors', '/share/a.safetensors')
+        recorder.add('load', 0.001, 'b.safetensors', '/local/b.safetensors')
+        summary = recorder.summary()
+        self.assertEqual(summary['stages'], {'catalog': 2.0, 'triggers': 0.0, 'load': 11.0, 'patch': 5.0})
+        self.assertEqual(summary['total_ms'], 18.0)
+        self.assertEqual(
+            summary['loras'][0],
+            {
+                'name': 'a.safetensors',
+                'folder': '/share',
+                'stages': {'load': 10.0, 'patch': 5.0},
+                'total_ms': 15.0,
+            },
+        )
+
+    def test_measure_records_elapsed_time(self) -> None:
+        recorder = LoraTimingRecorder()
+        with recorder.measure('triggers', 'a.safetensors'):
+            pass
+        summary = recorder.summary()
+        self.assertGreaterEqual(summary['stages']['triggers'], 0.0)
+        self.assertEqual(summary['loras'][0]['name'], 'a.safetensors')
+
+
+class LoraTimingStatsTest(unittest.TestCase):
+    def _summary(self, name: str, folder: str, value: float) -> dict:
+        return {
+            'total_ms': value,
+            'stages': {'load': value},
+            'loras': [{'name': name, 'folder': folder, 'stages': {'load': value}, 'total_ms': value}],
+        }
+
+    def test_snapshot_reports_percentiles(self) -> None:
+        stats = LoraTimingStats(window=100)
+        for value in range(1, 101):
+            stats.record(self._summary('a', '/share', float(value)))
+        snapshot = stats.snapshot()
+        self.assertEqual(snapshot['runs'], 100)
+        self.assertEqual(snapshot['stages']['load']['p50'], 50.0)
+        self.assertEqual(snapshot['stages']['load']['p90'], 90.0)
+        self.assertEqual(snapshot['stages']['load']['p99'], 99.0)
+        self.assertEqual(snapshot['stages']['load']['max'], 100.0)
+
+    def test_window_drops_old_samples_and_sorts_slowest_first(self) -> None:
+        stats = LoraTimingStats(window=2)
+        stats.record(self._summary('fast', '/local', 500.0))
+        stats.record(self._summary('fast', '/local', 1.0))
+        stats.record(self._summary('fast', '/local', 1.0))
+        stats.record(self._summary('slow', '/share', 50.0))
+        snapshot = stats.snapshot()
+        self.assertEqual([item['name'] for item in snapshot['loras']], ['slow', 'fast'])
+        self.assertEqual(snapshot['loras'][1]['max'], 1.0)
+        self.assertEqual(snapshot['folders'][0]['name'], '/share')
+
+
+if __name__ == '__main__':
+    unittest.main()
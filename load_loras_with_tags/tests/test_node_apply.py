@@ -44,7 +44,7 @@ class LoadLorasWithTagsApplyTest(unittest.TestCase):
                 lora_strength_1=1.0,
                 lora_on_1=False,
                 tags='alpha',
-            )
+            )['result']
 
             self.assertEqual((model, clip), ('model', 'clip'))
             self.assertEqual(tags, 'alpha')
@@ -55,6 +55,69 @@ class LoadLorasWithTagsApplyTest(unittest.TestCase):
             load_loras_with_tags_node.comfy.sd.load_lora_for_models = original_apply
             load_loras_with_tags_node.folder_paths.get_full_path = original_full_path
 
+    def test_reports_stage_timings_in_ui(self) -> None:
+        original_load = load_loras_with_tags_node.comfy.utils.load_torch_file
+        original_apply = load_loras_with_tags_node.comfy.sd.load_lora_for_models
+        original_full_path = load_loras_with_tags_node.folder_paths.get_full_path
+
+        try:
+            load_loras_with_tags_node.comfy.utils.load_torch_file = mock.Mock(return_value={'lora': True})
+            load_loras_with_tags_node.comfy.sd.load_lora_for_models = mock.Mock(
+                return_value=('model_lora', 'clip_lora')
+            )
+            load_loras_with_tags_node.folder_paths.get_full_path = lambda *_args, **_kwargs: '/tmp/test.safetensors'
+
+            node = load_loras_with_tags_node.LoadLorasWithTags()
+            output = node.apply(
+                'model',
+                'clip',
+                lora_name_1='a.safetensors',
+                lora_strength_1=1.0,
+                lora_on_1=True,
+            )
+
+            timings = output['ui']['lora_timings'][0]
+            self.assertEqual(set(timings['stages']), {'catalog', 'triggers', 'load', 'patch'})
+            self.assertEqual(timings['loras'][0]['name'], 'a.safetensors')
+            self.assertEqual(set(timings['loras'][0]['stages']), {'triggers', 'load', 'patch'})
+        finally:
+            load_loras_with_tags_node.comfy.utils.load_torch_file = original_load
+            load_loras_with_tags_node.comfy.sd.load_lora_for_models = original_apply
+            load_loras_with_tags_node.folder_paths.get_full_path = original_full_path
+
+    def test_shares_loaded_lora_between_identical_files(self) -> None:
+        original_load = load_loras_with_tags_node.comfy.utils.load_torch_file
+        original_apply = load_loras_with_tags_node.comfy.sd.load_lora_for_models
+        original_full_path = load_loras_with_tags_node.folder_paths.get_full_path
+        original_key = load_loras_with_tags_node.lora_content_key
+
+        try:
+            load_mock = mock.Mock(return_value={'lora': True})
+            load_loras_with_tags_node.comfy.utils.load_torch_file = load_mock
+            load_loras_with_tags_node.comfy.sd.load_lora_for_models = lambda model, clip, *_args: (model, clip)
+            load_loras_with_tags_node.folder_paths.get_full_path = lambda _category, name: f'/tmp/{name}'
+            load_loras_with_tags_node.lora_content_key = lambda _path: 'sha256:abc:10'
+
+            node = load_loras_with_tags_node.LoadLorasWithTags()
+            node.apply(
+                'model',
+                'clip',
+                lora_name_1='a/style.safetensors',
+                lora_strength_1=1.0,
+                lora_on_1=True,
+                lora_name_2='b/style_copy.safetensors',
+                lora_strength_2=0.5,
+                lora_on_2=True,
+            )
+
+            load_mock.assert_called_once()
+            self.assertEqual(list(node.loaded_loras), ['sha256:abc:10'])
+        finally:
+            load_loras_with_tags_node.comfy.utils.load_torch_file = original_load
+            load_loras_with_tags_node.comfy.sd.load_lora_for_models = original_apply
+            load_loras_with_tags_node.folder_paths.get_full_path = original_full_path
+            load_loras_with_tags_node.lora_content_key = original_key
+
     def test_skips_when_lora_path_missing(self) -> None:
         original_full_path = load_loras_with_tags_node.folder_paths.get_full_path
         try:
@@ -67,7 +130,7 @@ class LoadLorasWithTagsApplyTest(unittest.TestCase):
                 lora_strength_1=1.0,
                 lora_on_1=True,
                 tags='alpha',
-            )
+            )['result']
             self.assertEqual((model, clip), ('model', 'clip'))
             self.assertEqual(tags, 'alpha')
         finally:
@@ -93,7 +156,7 @@ class LoadLorasWithTagsApplyTest(unittest.TestCase):
                 lora_strength_1=0,
                 lora_on_1=True,
                 tags='alpha',
-            )
+            )['result']
 
             self.assertEqual((model, clip), ('model', 'clip'))
             self.assertEqual(tags, 'alpha')
@@ -132,7 +195,7 @@ class LoadLorasWithTagsApplyTest(unittest.TestCase):
                 lora_strength_1=1.0,
                 lora_on_1=True,
                 tags='alpha',
-            )
+            )['result']
 
             self.assertEqual((model, clip), ('model_lora', 'clip_lora'))
             self.assertEqual(tags, 'alpha')
@@ -182,7 +245,7 @@ class LoadLorasWithTagsApplyTest(unittest.TestCase):
                 'clip',
                 loras_json='[{"name":"foo"},{"name":"bar"}]',
                 tags='alpha',
-            )
+            )['result']
 
             self.assertEqual((model, clip), ('model_lora_lora', 'clip_lora_lora'))
             self.assertEqual(tags, 'alpha')
@@ -236,7 +299,7 @@ class LoadLorasWithTagsApplyTest(unittest.TestCase):
                 'clip',
                 loras_json=['[{"name":"foo"},{"name":"bar"}]'],
                 tags='alpha',
-            )
+            )['result']
 
             self.assertEqual((model, clip), ('model_lora_lora', 'clip_lora_lora'))
             self.assertEqual(tags, 'alpha')
@@ -281,7 +344,7 @@ class LoadLorasWithTagsApplyTest(unittest.TestCase):
                 lora_on_1=True,
                 loras_json='[{"name":"json"}]',
                 tags='alpha',
-            )
+            )['result']
 
             self.assertEqual(tags, 'alpha')
             self.assertEqual(calls, ['json.safetensors'])
@@ -321,7 +384,7 @@ class LoadLorasWithTagsApplyTest(unittest.TestCase):
                 lora_on_1=False,
                 loras_json='[{"name":"json"}]',
                 tags='alpha',
-            )
+            )['result']
 
             self.assertEqual(tags, 'alpha')
             self.assertEqual(calls, ['json.safetensors'])
@@ -354,7 +417,7 @@ class LoadLorasWithTagsApplyTest(unittest.TestCase):
                 lora_strength_2=0,
                 lora_on_2=True,
                 tags='',
-            )
+            )['result']
 
             self.assertEqual(tags, 'alpha,beta')
         finally:
@@ -381,7 +444,7 @@ class LoadLorasWithTagsApplyTest(unittest.TestCase):
                 lora_strength_1=0,
                 lora_on_1=True,
                 tags='',
-            )
+            )['result']
 
             self.assertEqual(tags, 'Alpha')
         finally:
@@ -412,7 +475,7 @@ class LoadLorasWithTagsApplyTest(unittest.TestCase):
                 lora_strength_1=0,
                 lora_on_1=True,
                 tags='alpha(beta)',
-            )
+            )['result']
 
             self.assertEqual(tags, 'alpha\\(beta\\),gamma\\(delta\\)')
         finally:
@@ -444,7 +507,7 @@ class LoadLorasWithTagsApplyTest(unittest.TestCase):
                 lora_strength_1=0,
                 lora_on_1=True,
                 tags='alpha\\(beta\\)',
-            )
+            )['result']
 
             self.assertEqual(tags, 'alpha\\(beta\\),gamma\\(delta\\)')
         finally:
@@ -476,7 +539,7 @@ class LoadLorasWithTagsApplyTest(unittest.TestCase):
                 lora_strength_1=0,
                 lora_on_1=True,
                 tags='(beta:0.8)',
-            )
+            )['result']
 
             self.assertEqual(tags, '(beta:0.8),(gamma:1.2)')
         finally:
@@ -508,7 +571,7 @@ class LoadLorasWithTagsApplyTest(unittest.TestCase):
                 lora_strength_1=0,
                 lora_on_1=True,
                 tags='\\(beta:0.8\\)',
-            )
+            )['result']
 
             self.assertEqual(tags, '(beta:0.8),(gamma:1.2)')
         finally:
@@ -540,7 +603,7 @@ class LoadLorasWithTagsApplyTest(unittest.TestCase):
                 lora_strength_1=0,
                 lora_on_1=True,
                 tags='(best quality:1.2),character (series), good quality',
-            )
+            )['result']
 
             self.assertEqual(
                 tags,
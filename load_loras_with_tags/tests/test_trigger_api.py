@@ -1,4 +1,6 @@
 import asyncio
+import gzip
+import json
 import os
 import sys
 import tempfile
@@ -17,17 +19,28 @@ class _DummyWebModule(types.SimpleNamespace):
     def __init__(self) -> None:
         super().__init__(
             Request=object,
+            Response=self.Response,
+            StreamResponse=object,
             json_response=self.json_response,
             FileResponse=self.FileResponse,
         )
 
     @staticmethod
-    def json_response(payload, status: int = 200):
-        return _DummyResponse(payload, status=status)
+    def json_response(payload, status: int = 200, headers=None):
+        response = _DummyResponse(payload, status=status)
+        response.headers = headers or {}
+        return response
+
+    class Response(_DummyResponse):
+        def __init__(self, body: bytes = b'', status: int = 200, headers=None) -> None:
+            super().__init__(None, status=status)
+            self.body = body
+            self.headers = headers or {}
 
     class FileResponse(_DummyResponse):
-        def __init__(self, path: str) -> None:
+        def __init__(self, path: str, headers=None) -> None:
             super().__init__(None, status=200, path=path)
+            self.headers = headers or {}
 
 
 class _DummyRoutes:
@@ -37,6 +50,9 @@ class _DummyRoutes:
 
         return decorator
 
+    def get(self, _path: str):
+        return self.post(_path)
+
 
 class _DummyPromptServer:
     def __init__(self) -> None:
@@ -44,9 +60,11 @@ class _DummyPromptServer:
 
 
 class _DummyRequest:
-    def __init__(self, payload, raise_error: bool = False) -> None:
+    def __init__(self, payload, raise_error: bool = False, headers=None, query=None) -> None:
         self._payload = payload
         self._raise_error = raise_error
+        self.headers = headers or {}
+        self.query = query or {}
 
     async def json(self):
         if self._raise_error:
@@ -141,6 +159,67 @@ class TriggerApiTest(unittest.IsolatedAsyncioTestCase):
             {'triggers': ['alpha'], 'frequencies': {'alpha': 'Infinity', 'beta': 2.0}},
         )
 
+    async def test_get_lora_triggers_revalidates_with_etag(self) -> None:
+        original_extract = self.trigger_api.extract_lora_triggers
+        original_frequencies = self.trigger_api.extract_lora_trigger_frequencies
+        calls = []
+        self.trigger_api.extract_lora_triggers = lambda path: calls.append(path) or ['alpha']
+        self.trigger_api.extract_lora_trigger_frequencies = lambda _path: [('alpha', 1.0)]
+        try:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                lora_path = os.path.join(temp_dir, 'alpha.safetensors')
+                with open(lora_path, 'wb') as file:
+                    file.write(b'')
+                self.trigger_api.folder_paths.get_full_path = lambda *_args, **_kwargs: lora_path
+                first = await self.trigger_api.get_lora_triggers(
+                    _DummyRequest(None, query={'lora_name': 'alpha.safetensors'})
+                )
+                etag = first.headers['ETag']
+                cached = await self.trigger_api.get_lora_triggers(
+                    _DummyRequest(None, query={'lora_name': 'alpha.safetensors'}, headers={'If-None-Match': etag})
+                )
+                with open(os.path.join(temp_dir, 'alpha.json'), 'w', encoding='utf-8') as file:
+                    file.write('{}')
+                changed = await self.trigger_api.get_lora_triggers(
+                    _DummyRequest(None, query={'lora_name': 'alpha.safetensors'}, headers={'If-None-Match': etag})
+                )
+        finally:
+            self.trigger_api.extract_lora_triggers = original_extract
+            self.trigger_api.extract_lora_trigger_frequencies = original_frequencies
+        self.assertEqual(first.data, {'triggers': ['alpha'], 'frequencies': {'alpha': 1.0}})
+        self.assertEqual(first.headers['Cache-Control'], 'private, no-cache')
+        self.assertIn('Last-Modified', first.headers)
+        self.assertEqual(cached.status, 304)
+        self.assertEqual(cached.headers['ETag'], etag)
+        self.assertEqual(changed.status, 200)
+        self.assertNotEqual(changed.headers['ETag'], etag)
+        self.assertEqual(len(calls), 2)
+
+    async def test_search_lora_triggers_compresses_large_results(self) -> None:
+        class _Index:
+            def __len__(self) -> int:
+                return 1
+
+            def sync_if_stale(self, _loader):
+                return 0
+
+            def search(self, query, mode='prefix', limit=50):
+                return [{'tag': f'{query}_{index}', 'loras': []} for index in range(300)]
+
+        original_get_index = self.trigger_api.get_trigger_index
+        self.trigger_api.get_trigger_index = lambda: _Index()
+        try:
+            response = await self.trigger_api.search_lora_triggers(
+                _DummyRequest({'query': 'blue'}, headers={'Accept-Encoding': 'gzip, deflate'})
+            )
+            plain = await self.trigger_api.search_lora_triggers(_DummyRequest({'query': 'blue'}))
+        finally:
+            self.trigger_api.get_trigger_index = original_get_index
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(response.headers['Vary'], 'Accept-Encoding')
+        self.assertEqual(json.loads(gzip.decompress(response.body)), plain.data)
+        self.assertNotIn('Content-Encoding', plain.headers)
+
     async def test_open_lora_folder_validation(self) -> None:
         response = await self.trigger_api.open_lora_folder(_DummyRequest({'lora_name': 'None'}))
         self.assertEqual(response.data, {'ok': False, 'error': 'invalid_lora'})
@@ -209,3 +288,125 @@ class TriggerApiTest(unittest.IsolatedAsyncioTestCase):
             self.trigger_api.select_lora_preview_path = lambda *_args, **_kwargs: preview_path
             response = await self.trigger_api.load_lora_preview(_DummyRequest({'lora_name': 'demo.safetensors'}))
             self.assertEqual(response.path, preview_path)
+
+    async def test_get_lora_preview_returns_not_modified(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            lora_path = os.path.join(temp_dir, 'demo.safetensors')
+            preview_path = os.path.join(temp_dir, 'demo.png')
+            for path in (lora_path, preview_path):
+                with open(path, 'wb') as file:
+                    file.write(b'image')
+            self.trigger_api.folder_paths.get_full_path = lambda *_args, **_kwargs: lora_path
+            self.trigger_api.select_lora_preview_path = lambda *_args, **_kwargs: preview_path
+            first = await self.trigger_api.get_lora_preview(
+                _DummyRequest(None, query={'lora_name': 'demo.safetensors'})
+            )
+            etag = first.headers['ETag']
+            cached = await self.trigger_api.get_lora_preview(
+                _DummyRequest(None, query={'lora_name': 'demo.safetensors'}, headers={'If-None-Match': f'W/{etag}'})
+            )
+        self.assertEqual(first.path, preview_path)
+        self.assertEqual(first.headers['Cache-Control'], 'private, no-cache')
+        self.assertEqual(cached.status, 304)
+        self.assertEqual(cached.headers['ETag'], etag)
+
+    async def test_load_lora_preview_serves_thumbnail(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            lora_path = os.path.join(temp_dir, 'demo.safetensors')
+            preview_path = os.path.join(temp_dir, 'demo.png')
+            thumbnail_path = os.path.join(temp_dir, 'thumb.webp')
+            for path in (lora_path, preview_path, thumbnail_path):
+                with open(path, 'wb') as file:
+                    file.write(b'')
+            self.trigger_api.folder_paths.get_full_path = lambda *_args, **_kwargs: lora_path
+            self.trigger_api.select_lora_preview_path = lambda *_args, **_kwargs: preview_path
+            requested = []
+            original_select_preview_file = self.trigger_api.select_preview_file
+            self.trigger_api.select_preview_file = (
+                lambda path, size: requested.append((path, size)) or (thumbnail_path, 'image/webp')
+            )
+            try:
+                response = await self.trigger_api.load_lora_preview(
+                    _DummyRequest({'lora_name': 'demo.safetensors', 'size': 512})
+                )
+            finally:
+                self.trigger_api.select_preview_file = original_select_preview_file
+        self.assertEqual(requested, [(preview_path, 512)])
+        self.assertEqual(response.path, thumbnail_path)
+        self.assertEqual(response.headers['Content-Type'], 'image/webp')
+
+    async def test_load_lora_preview_batch_returns_multipart(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            lora_path = os.path.join(temp_dir, 'demo.safetensors')
+            with open(lora_path, 'wb') as file:
+                file.write(b'')
+            with open(os.path.join(temp_dir, 'demo.png'), 'wb') as file:
+                file.write(b'image')
+            self.trigger_api.folder_paths.get_full_path = (
+                lambda _folder, name: lora_path if name == 'demo.safetensors' else None
+            )
+            response = await self.trigger_api.load_lora_preview_batch(
+                _DummyRequest({'lora_names': ['demo.safetensors', 'missing.safetensors'], 'size': 0})
+            )
+        self.assertTrue(response.headers['Content-Type'].startswith('multipart/form-data; boundary='))
+        self.assertIn(b'name="demo.safetensors"; filename="demo.png"', response.body)
+        self.assertIn(b'Content-Type: image/png\r\n\r\nimage\r\n', response.body)
+        self.assertNotIn(b'missing.safetensors', response.body)
+
+    async def test_load_lora_preview_batch_rejects_invalid_names(self) -> None:
+        response = await self.trigger_api.load_lora_preview_batch(_DummyRequest({}, raise_error=True))
+        self.assertEqual(response.status, 400)
+        self.assertEqual(response.data, {'ok': False, 'error': 'invalid_lora_names'})
+
+    async def test_prefetch_lora_validation(self) -> None:
+        response = await self.trigger_api.prefetch_lora(_DummyRequest({}, raise_error=True))
+        self.assertEqual(response.data, {'ok': False, 'error': 'invalid_lora'})
+        self.trigger_api.folder_paths.get_full_path = lambda *_args, **_kwargs: ''
+        response = await self.trigger_api.prefetch_lora(_DummyRequest({'lora_name': 'demo.safetensors'}))
+        self.assertEqual(response.data, {'ok': False, 'error': 'not_found'})
+
+    async def test_prefetch_lora_queues_request(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            lora_path = os.path.join(temp_dir, 'demo.safetensors')
+            with open(lora_path, 'wb') as file:
+                file.write(b'')
+            calls = []
+            self.trigger_api.folder_paths.get_full_path = lambda *_args, **_kwargs: lora_path
+            self.trigger_api.request_lora_prefetch = lambda path: calls.append(path) or 'queued'
+            response = await self.trigger_api.prefetch_lora(_DummyRequest({'lora_name': 'demo.safetensors'}))
+            self.assertEqual(response.data, {'ok': True, 'status': 'queued'})
+            self.assertEqual(calls, [lora_path])
+
+    async def test_load_lora_timings_returns_stats(self) -> None:
+        self.trigger_api.get_lora_timing_stats = lambda: {'runs': 1}
+        response = await self.trigger_api.load_lora_timings(_DummyRequest({}))
+        self.assertEqual(response.data, {'runs': 1})
+
+    async def test_search_lora_triggers_empty_query(self) -> None:
+        response = await self.trigger_api.search_lora_triggers(_DummyRequest({}, raise_error=True))
+        self.assertEqual(response.data, {'results': []})
+
+    async def test_search_lora_triggers_returns_matches(self) -> None:
+        class _Index:
+            def __len__(self) -> int:
+                return 3
+
+            def sync_if_stale(self, _loader):
+                return 0
+
+            def search(self, query, mode='prefix', limit=50):
+                return [{'tag': query, 'mode': mode, 'loras': [{'name': 'a.safetensors', 'count': float('inf')}]}]
+
+        self.trigger_api.get_trigger_index = lambda: _Index()
+        response = await self.trigger_api.search_lora_triggers(
+            _DummyRequest({'query': 'blue', 'mode': 'substring'})
+        )
+        self.assertEqual(
+            response.data,
+            {
+                'results': [
+                    {'tag': 'blue', 'mode': 'substring', 'loras': [{'name': 'a.safetensors', 'count': 'Infinity'}]}
+                ],
+                'indexed': 3,
+            },
+        )
@@ -0,0 +1,109 @@
+import os
+import tempfile
+import unittest
+
+from load_loras_with_tags.logic.trigger_index import (
+    TriggerTagIndex,
+    normalize_trigger_tag,
+)
+
+
+class TriggerTagIndexTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.frequencies: dict[str, list[tuple[str, float]]] = {}
+        self.extract_calls: list[str] = []
+
+        def extract(path: str) -> list[tuple[str, float]]:
+            self.extract_calls.append(path)
+            return self.frequencies.get(path, [])
+
+        self.index = TriggerTagIndex(extract=extract)
+
+    def tearDown(self) -> None:
+        self._temp_dir.cleanup()
+
+    def _lora(self, name: str, frequencies: list[tuple[str, float]]) -> str:
+        path = os.path.join(self._temp_dir.name, name)
+        with open(path, 'wb') as file:
+            file.write(name.encode('utf-8'))
+        self.frequencies[path] = frequencies
+        return path
+
+    def test_normalize_trigger_tag(self) -> None:
+        self.assertEqual(normalize_trigger_tag('  Blue_Eyes '), 'blue eyes')
+        self.assertEqual(normalize_trigger_tag('saber \\(fate\\)'), 'saber (fate)')
+        self.assertEqual(normalize_trigger_tag(None), '')
+
+    def test_prefix_search_orders_loras_by_frequency(self) -> None:
+        first = self._lora('a.safetensors', [('1girl', 10.0), ('blue_eyes', 3.0)])
+        second = self._lora('b.safetensors', [('1girl', 50.0), ('blonde hair', 2.0)])
+        third = self._lora('c.safetensors', [('bluesky', float('inf'))])
+        self.index.sync({'a.safetensors': first, 'b.safetensors': second, 'c.safetensors': third})
+
+        results = self.index.search('blu')
+        self.assertEqual([item['tag'] for item in results], ['blue_eyes', 'bluesky'])
+        results = self.index.search('1girl')
+        self.assertEqual(
+            results[0]['loras'],
+            [{'name': 'b.safetensors', 'count': 50.0}, {'name': 'a.safetensors', 'count': 10.0}],
+        )
+
+    def test_substring_search(self) -> None:
+        path = self._lora('a.safetensors', [('long hair', 1.0), ('hair ornament', 1.0), ('eyes', 1.0)])
+        self.index.sync({'a.safetensors': path})
+        tags = {item['tag'] for item in self.index.search('hair', mode='substring')}
+        self.assertEqual(tags, {'long hair', 'hair ornament'})
+        self.assertEqual(self.index.search('hair', limit=1)[0]['tag'], 'hair ornament')
+
+    def test_sync_is_incremental(self) -> None:
+        first = self._lora('a.safetensors', [('alpha', 1.0)])
+        second = self._lora('b.safetensors', [('beta', 1.0)])
+        self.assertEqual(self.index.sync({'a.safetensors': first, 'b.safetensors': second}), 2)
+        self.extract_calls.clear()
+        self.assertEqual(self.index.sync({'a.safetensors': first, 'b.safetensors': second}), 0)
+        self.assertEqual(self.extract_calls, [])
+
+        self.assertEqual(self.index.sync({'a.safetensors': first}), 1)
+        self.assertEqual(self.index.search('beta'), [])
+        self.assertEqual(len(self.index), 1)
+
+    def test_update_replaces_old_tags(self) -> None:
+        path = self._lora('a.safetensors', [('alpha', 1.0)])
+        self.index.update('a.safetensors', path)
+        self.frequencies[path] = [('gamma', 2.0)]
+        with open(path, 'ab') as file:
+            file.write(b'changed')
+        self.assertTrue(self.index.update('a.safetensors', path))
+        self.assertEqual(self.index.search('alpha'), [])
+        self.assertEqual(self.index.search('gam')[0]['loras'], [{'name': 'a.safetensors', 'count': 2.0}])
+
+    def test_removed_loras_release_tag_ids(self) -> None:
+        first = self._lora('a.safetensors', [('1girl', 1.0), ('solo', 2.0)])
+        second = self._lora('b.safetensors', [('1girl', 3.0)])
+        self.index.sync({'a.safetensors': first, 'b.safetensors': second})
+        self.index.sync({'b.safetensors': second})
+        tags = self.index._store.tags
+        self.assertIsNone(tags.lookup('solo'))
+        self.assertEqual(len(tags), 1)
+        self.assertIsNone(self.index._lora_ids.lookup('a.safetensors'))
+        self.assertEqual(self.index.search('solo'), [])
+        self.assertEqual(
+            self.index.search('1girl'),
+            [{'tag': '1girl', 'loras': [{'name': 'b.safetensors', 'count': 3.0}]}],
+        )
+
+    def test_sync_if_stale_throttles(self) -> None:
+        calls = []
+
+        def load():
+            calls.append(True)
+            return {}
+
+        self.index.sync_if_stale(load, max_age=60.0)
+        self.index.sync_if_stale(load, max_age=60.0)
+        self.assertEqual(len(calls), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -14,30 +14,6 @@ class TriggerWordsExtraTest(unittest.TestCase):
         self.assertEqual(trigger_words.filter_lora_triggers(['a'], '{bad'), ['a'])
         self.assertEqual(trigger_words.filter_lora_triggers(['a', 'b'], '["b"]'), ['b'])
 
-    def test_read_safetensors_metadata_invalid(self) -> None:
-        with tempfile.TemporaryDirectory() as temp_dir:
-            txt_path = os.path.join(temp_dir, 'demo.txt')
-            with open(txt_path, 'wb') as file:
-                file.write(b'')
-            self.assertEqual(trigger_words._read_safetensors_metadata(txt_path), {})
-            bad_path = os.path.join(temp_dir, 'bad.safetensors')
-            with open(bad_path, 'wb') as file:
-                file.write(b'1234')
-            self.assertEqual(trigger_words._read_safetensors_metadata(bad_path), {})
-            zero_path = os.path.join(temp_dir, 'zero.safetensors')
-            with open(zero_path, 'wb') as file:
-                file.write((0).to_bytes(8, 'little'))
-            self.assertEqual(trigger_words._read_safetensors_metadata(zero_path), {})
-
-    def test_read_safetensors_metadata_invalid_json(self) -> None:
-        with tempfile.TemporaryDirectory() as temp_dir:
-            path = os.path.join(temp_dir, 'bad.safetensors')
-            payload = b'{not-json'
-            with open(path, 'wb') as file:
-                file.write(len(payload).to_bytes(8, 'little'))
-                file.write(payload)
-            self.assertEqual(trigger_words._read_safetensors_metadata(path), {})
-
     def test_parse_trained_word_values(self) -> None:
         values = [
             {'word': 'alpha'},
@@ -123,15 +99,6 @@ class TriggerWordsExtraTest(unittest.TestCase):
     def test_filter_lora_triggers_non_list(self) -> None:
         self.assertEqual(trigger_words.filter_lora_triggers(['a'], '{"a":1}'), ['a'])
 
-    def test_read_safetensors_metadata_non_dict(self) -> None:
-        with tempfile.TemporaryDirectory() as temp_dir:
-            path = os.path.join(temp_dir, 'meta.safetensors')
-            payload = json.dumps({'__metadata__': 'oops'}).encode('utf-8')
-            with open(path, 'wb') as file:
-                file.write(len(payload).to_bytes(8, 'little'))
-                file.write(payload)
-            self.assertEqual(trigger_words._read_safetensors_metadata(path), {})
-
     def test_extract_trained_words_non_dict(self) -> None:
         self.assertEqual(trigger_words._extract_trained_words(['alpha']), [])
 
@@ -184,7 +151,7 @@ class TriggerWordsExtraTest(unittest.TestCase):
             return_value=(['alpha'], [('alpha', 1.0)]),
         ), mock.patch.object(
             trigger_words,
-            '_read_safetensors_metadata',
+            'read_safetensors_metadata',
             return_value={'meta': True},
         ), mock.patch.object(
             trigger_words,
@@ -7,6 +7,8 @@ import comfy.utils
 import folder_paths
 
 from ...logic.lora_catalog import collect_lora_names
+from ...logic.lora_fingerprint import lora_content_key
+from ...logic.lora_timings import LoraTimingRecorder, record_lora_timings
 from ...logic.trigger_words import (
     extract_lora_triggers,
     filter_lora_triggers,
@@ -308,15 +310,17 @@ class LoadLorasWithTags:
                 return f'LoRA not found: {resolved}'
         return True
 
-    def apply(self, model: Any, clip: Any, **kwargs: Any) -> tuple[Any, Any, str]:
+    def apply(self, model: Any, clip: Any, **kwargs: Any) -> dict[str, Any]:
         current_model = model
         current_clip = clip
         all_triggers: list[str] = []
+        timings = LoraTimingRecorder()
         input_tags = split_tags(kwargs.get('tags', ''))
-        lora_choices = collect_lora_names(
-            folder_paths.get_folder_paths('loras'),
-            folder_paths.supported_pt_extensions,
-        )
+        with timings.measure('catalog'):
+            lora_choices = collect_lora_names(
+                folder_paths.get_folder_paths('loras'),
+                folder_paths.supported_pt_extensions,
+            )
         lora_choices = ['None'] + lora_choices
         metadata_jobs: list[tuple[str, Any, str]] = []
         for raw_name in parse_loras_json(kwargs.get('loras_json', '')):
@@ -345,23 +349,32 @@ class LoadLorasWithTags:
             lora_path = folder_paths.get_full_path('loras', lora_name)
             if not lora_path:
                 continue
-            triggers = extract_lora_triggers(lora_path)
-            selected_triggers = filter_lora_triggers(triggers, tag_selection)
+            with timings.measure('triggers', lora_name, lora_path):
+                triggers = extract_lora_triggers(lora_path)
+                selected_triggers = filter_lora_triggers(triggers, tag_selection)
             all_triggers.extend(selected_triggers)
             if lora_strength == 0:
                 continue
-            lora = self.loaded_loras.get(lora_path)
-            if lora is None:
-                lora = comfy.utils.load_torch_file(lora_path, safe_load=True)
-                self.loaded_loras[lora_path] = lora
-            current_model, current_clip = comfy.sd.load_lora_for_models(
-            current_model,
-            current_clip,
-            lora,
-            lora_strength,
-            lora_strength,
-        )
+            with timings.measure('load', lora_name, lora_path):
+                lora_key = lora_content_key(lora_path)
+                lora = self.loaded_loras.get(lora_key)
+                if lora is None:
+                    lora = comfy.utils.load_torch_file(lora_path, safe_load=True)
+                    self.loaded_loras[lora_key] = lora
+            with timings.measure('patch', lora_name, lora_path):
+                current_model, current_clip = comfy.sd.load_lora_for_models(
+                    current_model,
+                    current_clip,
+                    lora,
+                    lora_strength,
+                    lora_strength,
+                )
 
         escaped_input_tags = escape_tags(input_tags)
         escaped_triggers = escape_tags(dedupe_tags(all_triggers))
-        return (current_model, current_clip, ','.join(escaped_input_tags + escaped_triggers))
+        timing_summary = timings.summary()
+        record_lora_timings(timing_summary)
+        return {
+            'ui': {'lora_timings': [timing_summary]},
+            'result': (current_model, current_clip, ','.join(escaped_input_tags + escaped_triggers)),
+        }
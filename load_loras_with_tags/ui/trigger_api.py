@@ -1,3 +1,4 @@
+import asyncio
 import math
 import os
 import subprocess
@@ -9,11 +10,34 @@ import server
 import folder_paths
 from aiohttp import web
 
+from ...craftgear_common.http_cache import (
+    cache_headers,
+    combined_validators,
+    is_not_modified,
+    sidecar_json_paths,
+)
+from ...craftgear_common.http_compression import json_response
+from ...craftgear_common.http_routes import is_prompt_running, preview_file_response
+from ...craftgear_common.preview_batch import (
+    DEFAULT_BATCH_PREVIEW_SIZE,
+    collect_preview_batch,
+    encode_multipart_previews,
+    parse_batch_names,
+)
+from ...craftgear_common.preview_thumbnails import select_preview_file
+
+from ..logic.lora_catalog import collect_lora_names
+from ..logic.trigger_index import DEFAULT_SEARCH_LIMIT, get_trigger_index
 from ..logic.trigger_words import (
     extract_lora_trigger_frequencies,
     extract_lora_triggers,
 )
 from ..logic.lora_preview import DEFAULT_IMAGE_EXTENSIONS, select_lora_preview_path
+from ..logic.lora_prefetch import get_lora_prefetcher, request_lora_prefetch
+from ..logic.lora_timings import get_lora_timing_stats
+
+
+get_lora_prefetcher().set_busy_check(is_prompt_running)
 
 
 def _open_folder(path: str) -> bool:
@@ -30,31 +54,71 @@ def _open_folder(path: str) -> bool:
         return False
 
 
-@server.PromptServer.instance.routes.post("/my_custom_node/lora_triggers")
-async def load_lora_triggers(request: web.Request) -> web.Response:
-    try:
-        data: dict[str, Any] = await request.json()
-    except Exception:
-        data = {}
+def _json_count(count: Any) -> Any:
+    if isinstance(count, (int, float)) and not math.isfinite(count):
+        return "Infinity"
+    return count
+
+
+def _collect_lora_paths() -> dict[str, str]:
+    names = collect_lora_names(
+        folder_paths.get_folder_paths("loras"),
+        folder_paths.supported_pt_extensions,
+    )
+    paths: dict[str, str] = {}
+    for name in names:
+        path = folder_paths.get_full_path("loras", name)
+        if path:
+            paths[name] = path
+    return paths
+
+
+def _trigger_validators(lora_path: str) -> tuple[str, float] | None:
+    if not os.path.isfile(lora_path):
+        return None
+    # トリガーは LoRA 本体と同じディレクトリのサイドカー JSON から作られる
+    return combined_validators([lora_path, *sidecar_json_paths(lora_path)], "lora_triggers")
+
+
+async def _lora_triggers_response(request: web.Request, data: Any) -> web.Response:
     lora_name = data.get("lora_name") if isinstance(data, dict) else ""
     if not lora_name or lora_name == "None":
         return web.json_response({"triggers": []})
     lora_path = folder_paths.get_full_path("loras", lora_name)
     if not lora_path:
         return web.json_response({"triggers": []})
+    headers: dict[str, str] = {}
+    validators = _trigger_validators(lora_path)
+    if validators is not None:
+        headers = cache_headers(*validators)
+        if is_not_modified(request.headers, *validators):
+            return web.Response(status=304, headers=headers)
     triggers = extract_lora_triggers(lora_path)
     frequencies = extract_lora_trigger_frequencies(lora_path)
-    return web.json_response(
+    return json_response(
+        request,
         {
             "triggers": triggers,
-            "frequencies": {
-                tag: ("Infinity" if isinstance(count, (int, float)) and not math.isfinite(count) else count)
-                for tag, count in frequencies
-            },
-        }
+            "frequencies": {tag: _json_count(count) for tag, count in frequencies},
+        },
+        headers,
     )
 
 
+@server.PromptServer.instance.routes.post("/my_custom_node/lora_triggers")
+async def load_lora_triggers(request: web.Request) -> web.Response:
+    try:
+        data: dict[str, Any] = await request.json()
+    except Exception:
+        data = {}
+    return await _lora_triggers_response(request, data)
+
+
+@server.PromptServer.instance.routes.get("/my_custom_node/lora_triggers")
+async def get_lora_triggers(request: web.Request) -> web.Response:
+    return await _lora_triggers_response(request, dict(request.query))
+
+
 @server.PromptServer.instance.routes.post("/my_custom_node/open_lora_folder")
 async def open_lora_folder(request: web.Request) -> web.Response:
     try:
@@ -74,19 +138,102 @@ async def open_lora_folder(request: web.Request) -> web.Response:
     return web.json_response({"ok": opened})
 
 
+async def _lora_preview_response(request: web.Request, data: Any) -> web.StreamResponse:
+    lora_name = data.get("lora_name") if isinstance(data, dict) else ""
+    if not lora_name or lora_name == "None":
+        return web.json_response({"ok": False, "error": "invalid_lora"}, status=400)
+    lora_path = folder_paths.get_full_path("loras", lora_name)
+    if not lora_path or not os.path.exists(lora_path):
+        return web.json_response({"ok": False, "error": "not_found"}, status=404)
+    preview_path = select_lora_preview_path(lora_path, DEFAULT_IMAGE_EXTENSIONS)
+    if not preview_path:
+        return web.json_response({"ok": False, "error": "no_preview"}, status=404)
+    return await preview_file_response(request, preview_path, data.get("size"), select_preview_file)
+
+
 @server.PromptServer.instance.routes.post("/my_custom_node/lora_preview")
 async def load_lora_preview(request: web.Request) -> web.StreamResponse:
+    try:
+        data: dict[str, Any] = await request.json()
+    except Exception:
+        data = {}
+    return await _lora_preview_response(request, data)
+
+
+@server.PromptServer.instance.routes.get("/my_custom_node/lora_preview")
+async def get_lora_preview(request: web.Request) -> web.StreamResponse:
+    return await _lora_preview_response(request, dict(request.query))
+
+
+def _lora_preview_batch(lora_names: list[str], size: Any) -> tuple[bytes, str]:
+    entries = collect_preview_batch(
+        lora_names,
+        lambda name: folder_paths.get_full_path("loras", name),
+        size,
+    )
+    return encode_multipart_previews(entries)
+
+
+@server.PromptServer.instance.routes.post("/my_custom_node/lora_preview_batch")
+async def load_lora_preview_batch(request: web.Request) -> web.Response:
+    try:
+        data: dict[str, Any] = await request.json()
+    except Exception:
+        data = {}
+    if not isinstance(data, dict):
+        data = {}
+    lora_names = parse_batch_names(data.get("lora_names"))
+    if lora_names is None:
+        return web.json_response({"ok": False, "error": "invalid_lora_names"}, status=400)
+    # プレビューのない LoRA はパートを含めず、クライアントは個別取得にフォールバックする
+    body, content_type = await asyncio.get_running_loop().run_in_executor(
+        None, _lora_preview_batch, lora_names, data.get("size", DEFAULT_BATCH_PREVIEW_SIZE)
+    )
+    return web.Response(body=body, headers={"Content-Type": content_type})
+
+
+@server.PromptServer.instance.routes.post("/my_custom_node/lora_prefetch")
+async def prefetch_lora(request: web.Request) -> web.Response:
     try:
         data: dict[str, Any] = await request.json()
     except Exception:
         data = {}
     lora_name = data.get("lora_name") if isinstance(data, dict) else ""
     if not lora_name or lora_name == "None":
-        return web.json_response({"ok": False, "error": "invalid_lora"}, status=400)
+        return web.json_response({"ok": False, "error": "invalid_lora"})
     lora_path = folder_paths.get_full_path("loras", lora_name)
     if not lora_path or not os.path.exists(lora_path):
-        return web.json_response({"ok": False, "error": "not_found"}, status=404)
-    preview_path = select_lora_preview_path(lora_path, DEFAULT_IMAGE_EXTENSIONS)
-    if not preview_path:
-        return web.json_response({"ok": False, "error": "no_preview"}, status=404)
-    return web.FileResponse(preview_path)
+        return web.json_response({"ok": False, "error": "not_found"})
+    status = request_lora_prefetch(lora_path)
+    return web.json_response({"ok": status in ("queued", "warm"), "status": status})
+
+
+@server.PromptServer.instance.routes.get("/my_custom_node/lora_timings")
+async def load_lora_timings(request: web.Request) -> web.Response:
+    return json_response(request, get_lora_timing_stats())
+
+
+@server.PromptServer.instance.routes.post("/my_custom_node/lora_trigger_search")
+async def search_lora_triggers(request: web.Request) -> web.Response:
+    try:
+        data: dict[str, Any] = await request.json()
+    except Exception:
+        data = {}
+    if not isinstance(data, dict):
+        data = {}
+    query = str(data.get("query") or "").strip()
+    if not query:
+        return web.json_response({"results": []})
+    mode = "substring" if data.get("mode") == "substring" else "prefix"
+    try:
+        limit = int(data.get("limit", DEFAULT_SEARCH_LIMIT))
+    except (TypeError, ValueError):
+        limit = DEFAULT_SEARCH_LIMIT
+    index = get_trigger_index()
+    # 初回構築はファイル数に比例して重いのでイベントループを塞がない
+    await asyncio.get_running_loop().run_in_executor(None, index.sync_if_stale, _collect_lora_paths)
+    results = index.search(query, mode=mode, limit=limit)
+    for result in results:
+        for lora in result["loras"]:
+            lora["count"] = _json_count(lora["count"])
+    return json_response(request, {"results": results, "indexed": len(index)})
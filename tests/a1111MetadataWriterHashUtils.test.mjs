@@ -0,0 +1,36 @@
+import { describe, expect, it } from 'vitest';
+
+import { collectWorkflowModelNames } from '../web/a1111_metadata_writer/js/a1111MetadataWriterHashUtils.js';
+
+describe('collectWorkflowModelNames', () => {
+  it('collects checkpoint and LoRA names from widgets', () => {
+    const nodes = [
+      { widgets: [{ name: 'ckpt_name', value: 'base.safetensors' }] },
+      {
+        widgets: [
+          { name: 'ckpt_name_1', value: 'slot.safetensors' },
+          { name: 'ckpt_name_2', value: 'None' },
+        ],
+      },
+      {
+        widgets: [
+          { name: 'lora_name_1', value: { value: 'style.safetensors' } },
+          { name: 'lora_name_2', value: 'style.safetensors' },
+          { name: 'lora_strength_1', value: 1 },
+        ],
+      },
+      { widgets: [{ name: 'lora_name', value: 'detail.safetensors' }] },
+    ];
+    expect(collectWorkflowModelNames(nodes)).toEqual({
+      checkpoint_names: ['base.safetensors', 'slot.safetensors'],
+      lora_names: ['style.safetensors', 'detail.safetensors'],
+    });
+  });
+
+  it('returns empty lists without nodes', () => {
+    expect(collectWorkflowModelNames(undefined)).toEqual({
+      checkpoint_names: [],
+      lora_names: [],
+    });
+  });
+});
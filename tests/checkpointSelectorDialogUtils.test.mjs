@@ -10,6 +10,7 @@ import {
   checkpointDialogPreviewPadding,
   checkpointDialogPreviewWidth,
   checkpointDialogWidth,
+  formatCheckpointInfoBadge,
   getCheckpointHighlightSegments,
   isMissingCheckpointOption,
   missingCheckpointLabelColor,
@@ -132,3 +133,26 @@ describe('CheckpointSelector preview zoom', () => {
     ).toEqual({ x: -100, y: -100 });
   });
 });
+
+describe('formatCheckpointInfoBadge', () => {
+  it('joins architecture, dtype and size', () => {
+    expect(
+      formatCheckpointInfoBadge({
+        architecture: 'SDXL',
+        dtype: 'fp16',
+        size: 6.9 * 1024 * 1024 * 1024,
+      }),
+    ).toBe('SDXL · fp16 · 6.9 GB');
+  });
+
+  it('skips unknown architecture and shows small sizes in MB', () => {
+    expect(
+      formatCheckpointInfoBadge({ architecture: 'unknown', size: 300 * 1024 * 1024 }),
+    ).toBe('300 MB');
+  });
+
+  it('returns empty text for missing entries', () => {
+    expect(formatCheckpointInfoBadge(null)).toBe('');
+    expect(formatCheckpointInfoBadge({ error: 'not_found' })).toBe('');
+  });
+});
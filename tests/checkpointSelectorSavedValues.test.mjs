@@ -4,6 +4,7 @@ import {
   buildCheckpointSavedValues,
   resolveSavedCheckpointValue,
   resolveSavedStride,
+  resolveSavedToggleValues,
 } from '../web/checkpoint_selector/js/checkpointSelectorSavedValuesUtils.js';
 
 const createSlot = (name, active) => ({
@@ -20,6 +21,20 @@ describe('checkpoint selector saved values utils', () => {
     expect(values).toEqual(['modelA', true, '', false]);
   });
 
+  it('appends component toggles after the slots', () => {
+    const values = buildCheckpointSavedValues(
+      [createSlot('modelA', true)],
+      [{ value: false }, { value: true }],
+    );
+    expect(values).toEqual(['modelA', true, false, true]);
+  });
+
+  it('resolves saved toggles only when present', () => {
+    expect(resolveSavedToggleValues(['a', true, false, true], 1, 2)).toEqual([false, true]);
+    expect(resolveSavedToggleValues(['a', true], 1, 2)).toBe(null);
+    expect(resolveSavedToggleValues(['a', true, false], 1, 0)).toBe(null);
+  });
+
   it('resolves saved stride', () => {
     expect(resolveSavedStride([], 2)).toBe(0);
     expect(resolveSavedStride(['a', true, 'b', false], 2)).toBe(2);
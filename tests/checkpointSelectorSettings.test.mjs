@@ -1,10 +1,12 @@
 import { describe, expect, it } from 'vitest';
 
 import {
+  DEFAULT_CHECKPOINT_CACHE_BUDGET_GB,
   DEFAULT_CHECKPOINT_PREVIEW_ZOOM_SCALE,
   DEFAULT_CHECKPOINT_FONT_SIZE,
   normalizeCheckpointPreviewZoomScale,
   normalizeCheckpointFontSize,
+  normalizeCheckpointCacheBudgetGb,
 } from '../web/checkpoint_selector/js/checkpointSelectorSettings.js';
 
 describe('normalizeCheckpointPreviewZoomScale', () => {
@@ -56,3 +58,19 @@ describe('normalizeCheckpointFontSize', () => {
     expect(normalizeCheckpointFontSize('20')).toBe(20);
   });
 });
+
+describe('normalizeCheckpointCacheBudgetGb', () => {
+  it('returns default when value is invalid or negative', () => {
+    expect(normalizeCheckpointCacheBudgetGb('abc')).toBe(
+      DEFAULT_CHECKPOINT_CACHE_BUDGET_GB,
+    );
+    expect(normalizeCheckpointCacheBudgetGb(-1)).toBe(
+      DEFAULT_CHECKPOINT_CACHE_BUDGET_GB,
+    );
+  });
+
+  it('accepts zero to disable the cache', () => {
+    expect(normalizeCheckpointCacheBudgetGb(0)).toBe(0);
+    expect(normalizeCheckpointCacheBudgetGb('8')).toBe(8);
+  });
+});
@@ -12,11 +12,14 @@ describe('craftgearSettings', () => {
       'craftgear.loadLorasWithTags.previewZoomScale',
       'craftgear.checkpointSelector.previewZoomScale',
       'craftgear.checkpointSelector.fontSize',
+      'craftgear.checkpointSelector.cacheBudgetGb',
+      'craftgear.checkpointSelector.preloadNextSlot',
       'craftgear.loadLorasWithTags.loraStrengthMin',
       'craftgear.loadLorasWithTags.loraStrengthMax',
       'craftgear.loadLorasWithTags.fontSize',
       'craftgear.commentableMultilineText.fontSize',
       'craftgear.tagToggleText.fontSize',
+      'craftgear.a1111MetadataWriter.backgroundHashing',
     ]);
 
     const categories = craftgearSettings.map((setting) => setting.category);
@@ -27,11 +30,14 @@ describe('craftgearSettings', () => {
       ['craftgear', 'Load Loras With Tags', 'Preview hover zoom scale'],
       ['craftgear', 'Checkpoint Selector', 'Preview hover zoom scale'],
       ['craftgear', 'Checkpoint Selector', 'Font Size'],
+      ['craftgear', 'Checkpoint Selector', 'Loaded checkpoint cache (GB)'],
+      ['craftgear', 'Checkpoint Selector', 'Preload recently used slot in background'],
       ['craftgear', 'Load Loras With Tags', 'LoRA strength minimum'],
       ['craftgear', 'Load Loras With Tags', 'LoRA strength maximum'],
       ['craftgear', 'Load Loras With Tags', 'Font Size'],
       ['craftgear', 'Commentable Multiline Text', 'Font Size'],
       ['craftgear', 'Toggle Tags', 'Font Size'],
+      ['craftgear', 'A1111 Metadata Writer', 'Hash new models in background'],
     ]);
   });
 });
@@ -2,6 +2,12 @@ import sys
 import types
 import unittest
 import json
+import os
+import tempfile
+
+from craftgear_common.tests.bootstrap import install
+
+install()
 
 # Stub external modules used by the node
 folder_paths = types.SimpleNamespace(
@@ -24,6 +30,8 @@ sys.modules['folder_paths'] = folder_paths
 sys.modules['comfy'] = comfy
 sys.modules['comfy.sd'] = comfy.sd
 
+from checkpoint_selector.logic.checkpoint_cache import get_checkpoint_cache  # noqa: E402
+from checkpoint_selector.logic.checkpoint_preload import get_checkpoint_preloader  # noqa: E402
 from checkpoint_selector.ui.node import CheckpointSelector  # noqa: E402
 
 
@@ -31,6 +39,7 @@ class CheckpointSelectorNodeTest(unittest.TestCase):
     def setUp(self) -> None:
         comfy_sd_calls.clear()
         folder_paths.get_full_path = _default_get_full_path
+        get_checkpoint_cache().clear()
 
     def test_loads_active_slot_checkpoint(self) -> None:
         node = CheckpointSelector()
@@ -88,6 +97,129 @@ class CheckpointSelectorNodeTest(unittest.TestCase):
         )
         self.assertEqual(comfy_sd_calls[-1]["args"][0], "/tmp/ckptB.safetensors")
 
+    def test_switching_back_reuses_cached_checkpoint(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for name in ('ckptA.safetensors', 'ckptB.safetensors'):
+                with open(os.path.join(temp_dir, name), 'wb') as file:
+                    file.write(b'\x00' * 16)
+            folder_paths.get_full_path = lambda _category, name: os.path.join(temp_dir, name)
+            node = CheckpointSelector()
+            cache = get_checkpoint_cache()
+            original_budget = cache.budget_bytes
+            cache.set_budget(1024)
+            try:
+                for active in (1, 2, 1, 2):
+                    node.load_checkpoint(
+                        ckpt_name_1='ckptA.safetensors',
+                        slot_active_1=active == 1,
+                        ckpt_name_2='ckptB.safetensors',
+                        slot_active_2=active == 2,
+                    )
+            finally:
+                cache.set_budget(original_budget)
+
+        self.assertEqual(len(comfy_sd_calls), 2)
+
+    def test_preload_requests_previous_checkpoint(self) -> None:
+        preloader = get_checkpoint_preloader()
+        requested = []
+        original_request = preloader.request
+        preloader.request = lambda path: requested.append(path) or 'queued'
+        preloader.set_enabled(True)
+        try:
+            node = CheckpointSelector()
+            for active in (1, 2):
+                node.load_checkpoint(
+                    ckpt_name_1='ckptA.safetensors',
+                    slot_active_1=active == 1,
+                    ckpt_name_2='ckptB.safetensors',
+                    slot_active_2=active == 2,
+                )
+        finally:
+            preloader.set_enabled(False)
+            preloader.request = original_request
+
+        self.assertEqual(requested, ['/tmp/ckptB.safetensors', '/tmp/ckptA.safetensors'])
+
+    def test_preload_disabled_by_default(self) -> None:
+        node = CheckpointSelector()
+        node.load_checkpoint(
+            ckpt_name_1='ckptA.safetensors',
+            slot_active_1=True,
+            ckpt_name_2='ckptB.safetensors',
+        )
+        self.assertEqual(get_checkpoint_preloader().stats()['pending'], [])
+
+    def test_skips_disabled_clip_and_vae(self) -> None:
+        node = CheckpointSelector()
+        node.load_checkpoint(
+            ckpt_name_1='ckptA.safetensors',
+            slot_active_1=True,
+            load_clip=False,
+            load_vae=False,
+        )
+        kwargs = comfy_sd_calls[-1]['kwargs']
+        self.assertFalse(kwargs['output_clip'])
+        self.assertFalse(kwargs['output_vae'])
+
+        node.load_checkpoint(
+            ckpt_name_1='ckptA.safetensors',
+            slot_active_1=True,
+            load_clip=False,
+            load_vae=True,
+        )
+        kwargs = comfy_sd_calls[-1]['kwargs']
+        self.assertFalse(kwargs['output_clip'])
+        self.assertTrue(kwargs['output_vae'])
+
+    def test_loads_all_components_by_default(self) -> None:
+        node = CheckpointSelector()
+        node.load_checkpoint(ckpt_name_1='ckptA.safetensors', slot_active_1=True)
+        kwargs = comfy_sd_calls[-1]['kwargs']
+        self.assertTrue(kwargs['output_clip'])
+        self.assertTrue(kwargs['output_vae'])
+
+    def _cache_signature(self, prompt, node_id):
+        # ComfyUI の get_input_data と同じく、IS_CHANGED にはリンク以外の入力だけを渡し、dynprompt の無い PROMPT は空になる
+        inputs = prompt[node_id]['inputs']
+        input_types = CheckpointSelector.INPUT_TYPES()
+        declared = {**input_types['required'], **input_types.get('optional', {})}
+        kwargs = {name: value for name, value in inputs.items() if name in declared and not isinstance(value, list)}
+        for name, kind in input_types.get('hidden', {}).items():
+            kwargs[name] = {} if kind == 'PROMPT' else node_id
+        is_changed = getattr(CheckpointSelector, 'IS_CHANGED', None)
+        changed = is_changed(**kwargs) if is_changed is not None else False
+        widgets = tuple(sorted((name, repr(value)) for name, value in inputs.items() if not isinstance(value, list)))
+        return (prompt[node_id]['class_type'], changed, widgets)
+
+    def test_component_toggles_change_comfy_cache_signature(self) -> None:
+        prompt = {
+            '1': {
+                'class_type': 'CheckpointSelector',
+                'inputs': {
+                    'ckpt_name_1': 'ckptA.safetensors',
+                    'slot_active_1': True,
+                    'load_clip': True,
+                    'load_vae': False,
+                },
+            },
+            '2': {'class_type': 'KSampler', 'inputs': {'model': ['1', 0]}},
+        }
+        self.assertEqual(
+            set(CheckpointSelector.INPUT_TYPES()['optional']) & {'load_clip', 'load_vae'},
+            {'load_clip', 'load_vae'},
+        )
+        first = self._cache_signature(prompt, '1')
+        # 出力をつなぎ直しただけでは ComfyUI はキャッシュ済みの結果を再利用する
+        prompt['3'] = {'class_type': 'VAEDecode', 'inputs': {'vae': ['1', 2]}}
+        self.assertEqual(self._cache_signature(prompt, '1'), first)
+        prompt['1']['inputs']['load_vae'] = True
+        self.assertNotEqual(self._cache_signature(prompt, '1'), first)
+
+        CheckpointSelector().load_checkpoint(**prompt['1']['inputs'])
+        kwargs = comfy_sd_calls[-1]['kwargs']
+        self.assertTrue(kwargs['output_clip'])
+        self.assertTrue(kwargs['output_vae'])
 
 if __name__ == '__main__':
     unittest.main()
@@ -21,7 +21,7 @@ class RootInitTest(unittest.TestCase):
         sys.modules['torch.nn'] = fake_nn
         sys.modules['torch.nn.functional'] = fake_nn.functional
         sys.modules['server'] = types.SimpleNamespace(
-            PromptServer=types.SimpleNamespace(instance=types.SimpleNamespace(routes=types.SimpleNamespace(post=lambda _p: (lambda h: h))))
+            PromptServer=types.SimpleNamespace(instance=types.SimpleNamespace(routes=types.SimpleNamespace(post=lambda _p: (lambda h: h), get=lambda _p: (lambda h: h))))
         )
         sys.modules['aiohttp'] = types.SimpleNamespace(
             web=types.SimpleNamespace(Request=object, Response=object, json_response=lambda payload: payload)
@@ -59,7 +59,7 @@ class RootInitTest(unittest.TestCase):
 
     def test_run_root_init(self) -> None:
         sys.modules['server'] = types.SimpleNamespace(
-            PromptServer=types.SimpleNamespace(instance=types.SimpleNamespace(routes=types.SimpleNamespace(post=lambda _p: (lambda h: h))))
+            PromptServer=types.SimpleNamespace(instance=types.SimpleNamespace(routes=types.SimpleNamespace(post=lambda _p: (lambda h: h), get=lambda _p: (lambda h: h))))
         )
         sys.modules['aiohttp'] = types.SimpleNamespace(
             web=types.SimpleNamespace(Request=object, Response=object, json_response=lambda payload: payload)
@@ -0,0 +1,34 @@
+const CHECKPOINT_WIDGET_PATTERN = /^ckpt_name(_\d+)?$/;
+const LORA_WIDGET_PATTERN = /^lora_name(_\d+)?$/;
+
+const readWidgetName = (value) => {
+  const resolved =
+    value && typeof value === 'object' ? value.value ?? value.name : value;
+  if (typeof resolved !== 'string') {
+    return '';
+  }
+  const text = resolved.trim();
+  return text && text !== 'None' ? text : '';
+};
+
+export const collectWorkflowModelNames = (nodes) => {
+  const checkpointNames = new Set();
+  const loraNames = new Set();
+  for (const node of Array.isArray(nodes) ? nodes : []) {
+    for (const widget of node?.widgets ?? []) {
+      const name = readWidgetName(widget?.value);
+      if (!name) {
+        continue;
+      }
+      if (CHECKPOINT_WIDGET_PATTERN.test(widget?.name ?? '')) {
+        checkpointNames.add(name);
+      } else if (LORA_WIDGET_PATTERN.test(widget?.name ?? '')) {
+        loraNames.add(name);
+      }
+    }
+  }
+  return {
+    checkpoint_names: [...checkpointNames],
+    lora_names: [...loraNames],
+  };
+};
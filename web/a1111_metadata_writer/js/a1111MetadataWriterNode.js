@@ -1,4 +1,8 @@
 import { app } from '../../../../scripts/app.js';
+import { api } from '../../../../scripts/api.js';
+
+import { collectWorkflowModelNames } from './a1111MetadataWriterHashUtils.js';
+import { BACKGROUND_HASHING_SETTING_ID } from './a1111MetadataWriterSettings.js';
 
 const TARGET_NODE_CLASS = 'A1111MetadataWriter';
 const OVERWRITE_NAME = 'overwrite';
@@ -47,8 +51,46 @@ const attach = (node) => {
     setSuffixDisabled(node);
 };
 
+let backgroundHashingSent = null;
+
+const isBackgroundHashingEnabled = () =>
+    app?.extensionManager?.setting?.get?.(BACKGROUND_HASHING_SETTING_ID) === true;
+
+const requestBackgroundHashing = async () => {
+    const enabled = isBackgroundHashingEnabled();
+    if (!enabled && backgroundHashingSent === false) {
+        return;
+    }
+    backgroundHashingSent = enabled;
+    // フォルダの走査はサーバー側でフォルダの更新時刻が変わったときだけ行われる
+    const payload = enabled
+        ? { enabled, ...collectWorkflowModelNames(app?.graph?._nodes) }
+        : { enabled };
+    try {
+        await api.fetchApi('/my_custom_node/model_hash_scan', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(payload),
+        });
+    } catch (_error) {
+        backgroundHashingSent = null;
+    }
+};
+
 app.registerExtension({
     name: 'craftgear.a1111MetadataWriter',
     nodeCreated: attach,
     loadedGraphNode: attach,
+    setup() {
+        // 実行中の一時停止と再開はサーバー側のワーカーが行うので、ここでは設定の切り替えだけを伝える
+        api.addEventListener('execution_start', () => {
+            if (isBackgroundHashingEnabled() !== backgroundHashingSent) {
+                void requestBackgroundHashing();
+            }
+        });
+        void requestBackgroundHashing();
+    },
+    afterConfigureGraph() {
+        void requestBackgroundHashing();
+    },
 });
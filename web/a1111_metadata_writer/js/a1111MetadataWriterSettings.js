@@ -0,0 +1,3 @@
+export const BACKGROUND_HASHING_SETTING_ID =
+  'craftgear.a1111MetadataWriter.backgroundHashing';
+export const DEFAULT_BACKGROUND_HASHING = false;
@@ -2,8 +2,11 @@ import { api } from '../../../../scripts/api.js';
 import { app } from '../../../../scripts/app.js';
 import { $el } from '../../../../scripts/ui.js';
 import {
+  CHECKPOINT_CACHE_BUDGET_SETTING_ID,
+  CHECKPOINT_PRELOAD_SETTING_ID,
   CHECKPOINT_PREVIEW_ZOOM_SCALE_SETTING_ID,
   CHECKPOINT_FONT_SIZE_SETTING_ID,
+  normalizeCheckpointCacheBudgetGb,
   normalizeCheckpointPreviewZoomScale,
 } from './checkpointSelectorSettings.js';
 import {
@@ -19,6 +22,7 @@ import {
   checkpointDialogSelectedIconSize,
   checkpointDialogWidth,
   enforceSingleActiveSlot,
+  formatCheckpointInfoBadge,
   getCheckpointHighlightSegments,
   isPointInRect,
   markDirty,
@@ -37,10 +41,18 @@ import {
   setWidgetHidden,
   updateVisibleSlots,
 } from './checkpointSelectorUiUtils.js';
+import {
+  collectPreviewBatchNames,
+  createPreviewCache,
+  previewBatchThumbnailSize,
+  readPreviewBatch,
+  resolvePreviewThumbnailSize,
+} from '../../craftgear_common/js/previewUtils.js';
 import {
   buildCheckpointSavedValues,
   resolveSavedCheckpointValue,
   resolveSavedStride,
+  resolveSavedToggleValues,
 } from './checkpointSelectorSavedValuesUtils.js';
 
 const TARGET_NODE_CLASS = 'CheckpointSelector';
@@ -51,6 +63,8 @@ const ROW_GAP = 1;
 const SIDE_MARGIN = 8;
 const DIALOG_ID = 'craftgear-checkpoint-selector-dialog';
 const MIN_NODE_HEIGHT = 60;
+const TOGGLE_WIDGET_HEIGHT = 24;
+const COMPONENT_TOGGLE_NAMES = ['load_clip', 'load_vae'];
 const LABEL_RADIUS = 6;
 const LABEL_TEXT_PADDING_X = 6;
 const LABEL_TEXT_PADDING_Y = 2;
@@ -58,6 +72,8 @@ const MODEL_JSON_INPUT_NAME = 'model_json';
 const MODEL_JSON_INPUT_TYPE = 'STRING';
 const checkpointAutoFillTargetNodes = new Set();
 let checkpointAutoFillApiEventHooked = false;
+let checkpointCacheSettingsSent = null;
+let checkpointCacheSettingsEventHooked = false;
 let dialogKeydownHandler = null;
 
 const normalizeNodeId = (value) => {
@@ -436,6 +452,13 @@ const applySavedValues = (state, savedValues) => {
       slot.activeWidget.value = activeValue;
     }
   });
+  const toggles = state.toggles || [];
+  const toggleValues = resolveSavedToggleValues(savedValues, state.slots.length, toggles.length);
+  if (toggleValues) {
+    toggles.forEach((widget, index) => {
+      setWidgetValue(widget, toggleValues[index]);
+    });
+  }
   updateVisibleSlots(state);
   resizeNodeToRows(state);
 };
@@ -480,8 +503,9 @@ const insertBeforeWidget = (node, targetWidget, widgets) => {
 const resizeNodeToRows = (state) => {
   const visibleRows = state.slots.filter((slot) => !slot.rowWidget?.hidden);
   const rowsHeight = visibleRows.length * (ROW_HEIGHT + ROW_GAP);
+  const togglesHeight = (state.toggles?.length ?? 0) * TOGGLE_WIDGET_HEIGHT;
   const padding = 12;
-  const height = Math.max(MIN_NODE_HEIGHT, rowsHeight + padding);
+  const height = Math.max(MIN_NODE_HEIGHT, rowsHeight + togglesHeight + padding);
   const width = Math.max(180, state.node.size?.[0] ?? 180);
   state.node.size = [width, height];
 };
@@ -641,15 +665,46 @@ const getCheckpointPreviewZoomScale = () => {
   return normalizeCheckpointPreviewZoomScale(value);
 };
 
+const resolveCheckpointPreviewSize = () =>
+  resolvePreviewThumbnailSize(
+    checkpointDialogPreviewWidth,
+    window.devicePixelRatio,
+    getCheckpointPreviewZoomScale(),
+  );
+
+const checkpointPreviewCache = createPreviewCache();
+
+const fetchCheckpointPreviewBatch = async (checkpointNames) => {
+  if (!Array.isArray(checkpointNames) || checkpointNames.length === 0) {
+    return new Map();
+  }
+  try {
+    const response = await api.fetchApi('/my_custom_node/checkpoint_preview_batch', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({
+        checkpoint_names: checkpointNames,
+        size: previewBatchThumbnailSize,
+      }),
+    });
+    const contentType = response.headers.get('Content-Type') || '';
+    if (!response.ok || !contentType.startsWith('multipart/form-data')) {
+      return null;
+    }
+    return readPreviewBatch(await response.formData());
+  } catch (_error) {
+    return null;
+  }
+};
+
 const fetchCheckpointPreviewUrl = async (checkpointName) => {
   if (!checkpointName || checkpointName === 'None') {
     return null;
   }
-  const response = await api.fetchApi('/my_custom_node/checkpoint_preview', {
-    method: 'POST',
-    headers: { 'Content-Type': 'application/json' },
-    body: JSON.stringify({ checkpoint_name: checkpointName }),
-  });
+  const size = resolveCheckpointPreviewSize();
+  // GET にしてブラウザの HTTP キャッシュで ETag の再検証を効かせる
+  const query = new URLSearchParams({ checkpoint_name: checkpointName, size: String(size) });
+  const response = await api.fetchApi(`/my_custom_node/checkpoint_preview?${query}`);
   if (!response.ok) {
     return null;
   }
@@ -664,6 +719,53 @@ const fetchCheckpointPreviewUrl = async (checkpointName) => {
   return URL.createObjectURL(blob);
 };
 
+const syncCheckpointCacheSettings = async () => {
+  const budgetGb = normalizeCheckpointCacheBudgetGb(
+    app?.extensionManager?.setting?.get?.(CHECKPOINT_CACHE_BUDGET_SETTING_ID),
+  );
+  const preload =
+    app?.extensionManager?.setting?.get?.(CHECKPOINT_PRELOAD_SETTING_ID) === true;
+  const payload = JSON.stringify({ budget_gb: budgetGb, preload });
+  if (payload === checkpointCacheSettingsSent) {
+    return;
+  }
+  checkpointCacheSettingsSent = payload;
+  try {
+    await api.fetchApi('/my_custom_node/checkpoint_cache', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: payload,
+    });
+  } catch (_error) {
+    checkpointCacheSettingsSent = null;
+  }
+};
+
+const ensureCheckpointCacheSettingsEventHook = () => {
+  if (checkpointCacheSettingsEventHooked) {
+    return;
+  }
+  checkpointCacheSettingsEventHooked = true;
+  // 設定変更は次の実行開始時にサーバーへ反映する
+  api.addEventListener('execution_start', () => {
+    void syncCheckpointCacheSettings();
+  });
+  void syncCheckpointCacheSettings();
+};
+
+const fetchCheckpointInfo = async (checkpointNames) => {
+  const response = await api.fetchApi('/my_custom_node/checkpoint_info', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ checkpoint_names: checkpointNames }),
+  });
+  if (!response.ok) {
+    return {};
+  }
+  const data = await response.json();
+  return data?.items && typeof data.items === 'object' ? data.items : {};
+};
+
 const openCheckpointFolder = async (checkpointName) => {
   const response = await api.fetchApi('/my_custom_node/open_checkpoint_folder', {
     method: 'POST',
@@ -709,6 +811,7 @@ const openDialog = (slot, state) => {
   let previewZoomPoint = null;
   let lastPreviewLabel = '';
   let isFilterComposing = false;
+  let checkpointInfo = {};
   const previewZoomScale = getCheckpointPreviewZoomScale();
   const isPreviewZoomEnabled = previewZoomScale > 1;
   const fontSizes = getCheckpointFontSizes();
@@ -1058,8 +1161,13 @@ const openDialog = (slot, state) => {
     }
     lastPreviewLabel = normalized;
     const requestId = (previewRequestToken += 1);
+    const batchedPreview = checkpointPreviewCache.get(normalized);
+    if (batchedPreview) {
+      // まとめ取得した小さいサムネイルを先に出し、表示サイズのものが届いたら差し替える
+      setPreviewUrl(URL.createObjectURL(batchedPreview));
+    }
     const previewUrl = await fetchCheckpointPreviewUrl(normalized);
-    if (requestId !== previewRequestToken) {
+    if (requestId !== previewRequestToken || (!previewUrl && batchedPreview)) {
       if (previewUrl) {
         URL.revokeObjectURL(previewUrl);
       }
@@ -1068,6 +1176,26 @@ const openDialog = (slot, state) => {
     setPreviewUrl(previewUrl);
   };
 
+  const requestVisiblePreviewBatch = () => {
+    const names = collectPreviewBatchNames(
+      visibleOptions.map((entry) => entry.label),
+      checkpointPreviewCache,
+    );
+    if (names.length === 0) {
+      return;
+    }
+    // 取得中の名前も記録し、フィルター変更や開き直しで同じ名前を二重に要求しない
+    names.forEach((name) => checkpointPreviewCache.set(name, null));
+    // 一覧に見えている分のプレビューを 1 往復でまとめて取得しておく
+    void fetchCheckpointPreviewBatch(names).then((previews) => {
+      if (!previews) {
+        names.forEach((name) => checkpointPreviewCache.delete(name));
+        return;
+      }
+      previews.forEach((blob, name) => checkpointPreviewCache.set(name, blob));
+    });
+  };
+
   const updatePreviewByVisibleIndex = (index) => {
     if (!Number.isFinite(index)) {
       return;
@@ -1229,6 +1357,7 @@ const openDialog = (slot, state) => {
       setPreviewUrl(null);
       return;
     }
+    requestVisiblePreviewBatch();
     selectedVisibleIndex = visibleOptions.findIndex(
       (entry) => entry.index === selectedOptionIndex,
     );
@@ -1273,6 +1402,15 @@ const openDialog = (slot, state) => {
         },
       });
       renderLabel(labelContainer, entry.displayLabel, normalizedQuery);
+      const infoBadge = $el('span', {
+        textContent: formatCheckpointInfoBadge(checkpointInfo[entry.label]),
+        style: {
+          flex: '0 0 auto',
+          opacity: 0.6,
+          fontSize: `${fontSizes.small}px`,
+          whiteSpace: 'nowrap',
+        },
+      });
       const openIconWrap = $el('span', {
         title: 'Open folder',
         style: {
@@ -1299,9 +1437,11 @@ const openDialog = (slot, state) => {
         applySelection(entry.label);
         void openCheckpointFolder(entry.label);
       };
-      button.append(iconWrap, labelContainer, openIconWrap);
+      button.append(iconWrap, labelContainer, infoBadge, openIconWrap);
       renderedButtons.push({
         button,
+        label: entry.label,
+        infoBadge,
         optionIndex: entry.index,
         iconWrap,
         openIconWrap,
@@ -1366,12 +1506,33 @@ const openDialog = (slot, state) => {
     }
   };
 
+  const loadCheckpointInfo = async () => {
+    const names = options.filter(
+      (label) => typeof label === 'string' && label && label !== 'None',
+    );
+    if (names.length === 0) {
+      return;
+    }
+    try {
+      checkpointInfo = await fetchCheckpointInfo(names);
+    } catch (_error) {
+      return;
+    }
+    // 再描画せずに表示中の行だけ更新してホバーや選択状態を保つ
+    renderedButtons.forEach((entry) => {
+      entry.infoBadge.textContent = formatCheckpointInfoBadge(
+        checkpointInfo[entry.label],
+      );
+    });
+  };
+
   search.oninput = () => renderList();
   dialogKeydownHandler = handleDialogKeyDown;
   document.addEventListener('keydown', dialogKeydownHandler, true);
   search.addEventListener('keydown', handleDialogKeyDown);
   renderList();
   focusInputLater();
+  void loadCheckpointInfo();
 };
 
 const handleRowMouse = (event, pos, slot, state) => {
@@ -1427,6 +1588,7 @@ const setupNode = (node) => {
   const state = {
     node,
     slots,
+    toggles: COMPONENT_TOGGLE_NAMES.map((name) => getWidget(node, name)).filter(Boolean),
   };
 
   const resolveConnectedInputData = (inputName) => {
@@ -1565,7 +1727,7 @@ const setupNode = (node) => {
     const originalSerialize = node.onSerialize;
     node.onSerialize = function (o) {
       originalSerialize?.apply(this, arguments);
-      o.widgets_values = buildCheckpointSavedValues(slots);
+      o.widgets_values = buildCheckpointSavedValues(slots, state.toggles);
     };
   }
 
@@ -1614,6 +1776,7 @@ const setupNode = (node) => {
     syncAutoCheckpointFromExecutionOutput(output, originSlot);
   checkpointAutoFillTargetNodes.add(node);
   ensureModelJsonAutoFillEventHook();
+  ensureCheckpointCacheSettingsEventHook();
 
   if (!node.__checkpointSelectorRemovedWrapped) {
     node.__checkpointSelectorRemovedWrapped = true;
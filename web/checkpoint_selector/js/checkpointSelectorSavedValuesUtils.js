@@ -27,7 +27,7 @@ const resolveSavedCheckpointValue = (value, options) => {
   return String(value);
 };
 
-const buildCheckpointSavedValues = (slots) => {
+const buildCheckpointSavedValues = (slots, toggles = []) => {
   if (!Array.isArray(slots)) {
     return [];
   }
@@ -36,7 +36,26 @@ const buildCheckpointSavedValues = (slots) => {
     values.push(slot?.ckptWidget?.value ?? '');
     values.push(!!slot?.activeWidget?.value);
   });
+  // load_clip / load_vae はスロットの後ろに並べ、旧形式の保存値と区別できるようにする
+  (Array.isArray(toggles) ? toggles : []).forEach((widget) => {
+    values.push(widget?.value !== false);
+  });
   return values;
 };
 
-export { buildCheckpointSavedValues, resolveSavedCheckpointValue, resolveSavedStride };
+const resolveSavedToggleValues = (values, slotCount, toggleCount) => {
+  if (!Array.isArray(values) || toggleCount <= 0) {
+    return null;
+  }
+  if (values.length !== slotCount * 2 + toggleCount) {
+    return null;
+  }
+  return values.slice(slotCount * 2).map((value) => value !== false);
+};
+
+export {
+  buildCheckpointSavedValues,
+  resolveSavedCheckpointValue,
+  resolveSavedStride,
+  resolveSavedToggleValues,
+};
@@ -4,6 +4,12 @@ export const DEFAULT_CHECKPOINT_PREVIEW_ZOOM_SCALE = 2;
 export const CHECKPOINT_FONT_SIZE_SETTING_ID =
   'craftgear.checkpointSelector.fontSize';
 export const DEFAULT_CHECKPOINT_FONT_SIZE = 16;
+export const CHECKPOINT_CACHE_BUDGET_SETTING_ID =
+  'craftgear.checkpointSelector.cacheBudgetGb';
+export const DEFAULT_CHECKPOINT_CACHE_BUDGET_GB = 0;
+export const CHECKPOINT_PRELOAD_SETTING_ID =
+  'craftgear.checkpointSelector.preloadNextSlot';
+export const DEFAULT_CHECKPOINT_PRELOAD = false;
 
 export const normalizeCheckpointPreviewZoomScale = (value) => {
   const parsed = Number(value);
@@ -20,3 +26,11 @@ export const normalizeCheckpointFontSize = (value) => {
   }
   return parsed;
 };
+
+export const normalizeCheckpointCacheBudgetGb = (value) => {
+  const parsed = Number(value);
+  if (!Number.isFinite(parsed) || parsed < 0) {
+    return DEFAULT_CHECKPOINT_CACHE_BUDGET_GB;
+  }
+  return parsed;
+};
@@ -242,6 +242,36 @@ export const isMissingCheckpointOption = (rawValue, options) => {
 
 export const missingCheckpointLabelColor = MISSING_CHECKPOINT_LABEL_COLOR;
 
+const formatCheckpointSize = (bytes) => {
+  const size = Number(bytes);
+  if (!Number.isFinite(size) || size <= 0) {
+    return '';
+  }
+  const gigabytes = size / (1024 * 1024 * 1024);
+  if (gigabytes >= 1) {
+    return `${gigabytes.toFixed(1)} GB`;
+  }
+  return `${Math.max(1, Math.round(size / (1024 * 1024)))} MB`;
+};
+
+export const formatCheckpointInfoBadge = (info) => {
+  if (!info || typeof info !== 'object' || info.error === 'not_found') {
+    return '';
+  }
+  const parts = [];
+  if (info.architecture && info.architecture !== 'unknown') {
+    parts.push(String(info.architecture));
+  }
+  if (info.dtype) {
+    parts.push(String(info.dtype));
+  }
+  const size = formatCheckpointSize(info.size);
+  if (size) {
+    parts.push(size);
+  }
+  return parts.join(' · ');
+};
+
 export const resolveCheckpointFontSizes = (value) => {
   const normalized = normalizeCheckpointFontSize(value);
   const safeBase = Math.max(CHECKPOINT_MIN_FONT_SIZE, Math.round(normalized));
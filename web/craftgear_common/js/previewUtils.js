@@ -0,0 +1,93 @@
+const previewThumbnailMaxSize = 1024;
+
+const resolvePreviewThumbnailSize = (panelWidth, pixelRatio, zoomScale) => {
+  const width = Number(panelWidth);
+  if (!Number.isFinite(width) || width <= 0) {
+    return 0;
+  }
+  const ratio = Number(pixelRatio);
+  const zoom = Number(zoomScale);
+  const safeRatio = Number.isFinite(ratio) && ratio > 0 ? ratio : 1;
+  const safeZoom = Number.isFinite(zoom) && zoom > 1 ? zoom : 1;
+  // ホバーズームでもぼやけないよう拡大後の実ピクセル数で要求し、サーバーの最大サムネイルで頭打ちにする
+  return Math.min(previewThumbnailMaxSize, Math.ceil(width * safeRatio * safeZoom));
+};
+
+const previewBatchLimit = 48;
+// 一覧用のまとめ取得は最小サムネイルにし、拡大表示のサイズは選んだものだけ個別に取る
+const previewBatchThumbnailSize = 256;
+const previewCacheLimit = 512;
+
+const createPreviewCache = (limit = previewCacheLimit) => {
+  // ダイアログを開き直しても同じプレビューを取り直さないよう、モジュール単位で保持する
+  const entries = new Map();
+  const has = (name) => entries.has(name);
+  const get = (name) => {
+    if (!entries.has(name)) {
+      return undefined;
+    }
+    const value = entries.get(name);
+    entries.delete(name);
+    entries.set(name, value);
+    return value;
+  };
+  const set = (name, blob) => {
+    entries.delete(name);
+    entries.set(name, blob ?? null);
+    while (entries.size > limit) {
+      entries.delete(entries.keys().next().value);
+    }
+  };
+  const remove = (name) => {
+    entries.delete(name);
+  };
+  return { has, get, set, delete: remove };
+};
+
+const collectPreviewBatchNames = (labels, requested, limit = previewBatchLimit) => {
+  const names = [];
+  const seen = new Set();
+  for (const label of Array.isArray(labels) ? labels : []) {
+    if (names.length >= limit) {
+      break;
+    }
+    if (typeof label !== "string" || !label || label === "None") {
+      continue;
+    }
+    if (seen.has(label) || requested?.has?.(label)) {
+      continue;
+    }
+    seen.add(label);
+    names.push(label);
+  }
+  return names;
+};
+
+const readPreviewBatch = (formData) => {
+  const previews = new Map();
+  if (!formData || typeof formData.entries !== "function") {
+    return previews;
+  }
+  for (const [name, value] of formData.entries()) {
+    // プレビューのないモデルはパート自体が無いので画像パートだけを拾う
+    if (!value || typeof value === "string" || !value.size) {
+      continue;
+    }
+    if (!String(value.type || "").startsWith("image/")) {
+      continue;
+    }
+    previews.set(name, value);
+  }
+  return previews;
+};
+
+export {
+  previewThumbnailMaxSize,
+  resolvePreviewThumbnailSize,
+  previewBatchLimit,
+  previewBatchThumbnailSize,
+  previewCacheLimit,
+  createPreviewCache,
+  collectPreviewBatchNames,
+  readPreviewBatch,
+};
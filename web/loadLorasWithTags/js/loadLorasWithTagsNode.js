@@ -117,12 +117,20 @@ import {
   shouldCloseStrengthPopupOnInnerClick,
   shouldToggleTagSelectionOnKey,
   shouldBlurTagFilterOnKey,
+  formatLoraTimingSummary,
   buildStrengthRangeCss,
   buildStrengthRangeProgressBackground,
   strengthRangeInputClass,
   strengthRangeThumbSize,
   strengthRangeTrackHeight,
 } from "./loadLorasWithTagsUiUtils.js";
+import {
+  collectPreviewBatchNames,
+  createPreviewCache,
+  previewBatchThumbnailSize,
+  readPreviewBatch,
+  resolvePreviewThumbnailSize,
+} from "../../craftgear_common/js/previewUtils.js";
 import {
   COPY_SOURCE_MISSING_MESSAGE,
   resolveCopySourceMessage,
@@ -518,11 +526,9 @@ const setComboWidgetValue = (widget, value) => {
 };
 
 const fetchTriggers = async (loraName) => {
-  const response = await api.fetchApi("/my_custom_node/lora_triggers", {
-    method: "POST",
-    headers: { "Content-Type": "application/json" },
-    body: JSON.stringify({ lora_name: loraName }),
-  });
+  // GET にしてブラウザの HTTP キャッシュで ETag の再検証を効かせる
+  const query = new URLSearchParams({ lora_name: loraName });
+  const response = await api.fetchApi(`/my_custom_node/lora_triggers?${query}`);
   if (!response.ok) {
     return { triggers: [], frequencies: {} };
   }
@@ -578,15 +584,42 @@ const applySlotSelectionOnLoraChange = (slot, loraLabel, targetNode) => {
   })();
 };
 
+const resolveLoraPreviewSize = () =>
+  resolvePreviewThumbnailSize(
+    LORA_PREVIEW_PANEL_WIDTH,
+    window.devicePixelRatio,
+    getLoraPreviewZoomScale(),
+  );
+
+const loraPreviewCache = createPreviewCache();
+
+const fetchLoraPreviewBatch = async (loraNames) => {
+  if (!Array.isArray(loraNames) || loraNames.length === 0) {
+    return new Map();
+  }
+  try {
+    const response = await api.fetchApi('/my_custom_node/lora_preview_batch', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ lora_names: loraNames, size: previewBatchThumbnailSize }),
+    });
+    const contentType = response.headers.get('Content-Type') || '';
+    if (!response.ok || !contentType.startsWith('multipart/form-data')) {
+      return null;
+    }
+    return readPreviewBatch(await response.formData());
+  } catch (_error) {
+    return null;
+  }
+};
+
 const fetchLoraPreviewUrl = async (loraName) => {
   if (!loraName || loraName === 'None') {
     return null;
   }
-  const response = await api.fetchApi('/my_custom_node/lora_preview', {
-    method: 'POST',
-    headers: { 'Content-Type': 'application/json' },
-    body: JSON.stringify({ lora_name: loraName }),
-  });
+  const size = resolveLoraPreviewSize();
+  const query = new URLSearchParams({ lora_name: loraName, size: String(size) });
+  const response = await api.fetchApi(`/my_custom_node/lora_preview?${query}`);
   if (!response.ok) {
     return null;
   }
@@ -601,6 +634,22 @@ const fetchLoraPreviewUrl = async (loraName) => {
   return URL.createObjectURL(blob);
 };
 
+const prefetchLora = async (loraName) => {
+  if (!loraName || loraName === 'None') {
+    return false;
+  }
+  try {
+    const response = await api.fetchApi('/my_custom_node/lora_prefetch', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ lora_name: loraName }),
+    });
+    return response.ok;
+  } catch {
+    return false;
+  }
+};
+
 const openLoraFolder = async (loraName) => {
   const response = await api.fetchApi('/my_custom_node/open_lora_folder', {
     method: 'POST',
@@ -1885,6 +1934,17 @@ const setupLoadLorasUi = (node) => {
         };
         drawHeaderButton(copyRect, COPY_BUTTON_LABEL, headerHoverState.copy);
         drawHeaderButton(appendRect, APPEND_BUTTON_LABEL, headerHoverState.append);
+        const timingText = node.__loadLorasTimingText ?? "";
+        const timingRight = copyRect.x - INNER_MARGIN * 2;
+        if (
+          timingText &&
+          timingRight - ctx.measureText(timingText).width >=
+            labelRect.x + labelRect.width + INNER_MARGIN
+        ) {
+          ctx.fillStyle = "#8a8a8a";
+          ctx.textAlign = "right";
+          ctx.fillText(timingText, timingRight, midY);
+        }
         ctx.textAlign = "right";
         ctx.restore();
       },
@@ -3351,8 +3411,13 @@ const setupLoadLorasUi = (node) => {
       }
       lastPreviewLabel = normalized;
       const requestId = (previewRequestToken += 1);
+      const batchedPreview = loraPreviewCache.get(normalized);
+      if (batchedPreview) {
+        // まとめ取得した小さいサムネイルを先に出し、表示サイズのものが届いたら差し替える
+        setPreviewUrl(URL.createObjectURL(batchedPreview));
+      }
       const previewUrl = await fetchLoraPreviewUrl(normalized);
-      if (requestId !== previewRequestToken) {
+      if (requestId !== previewRequestToken || (!previewUrl && batchedPreview)) {
         if (previewUrl) {
           URL.revokeObjectURL(previewUrl);
         }
@@ -3361,6 +3426,26 @@ const setupLoadLorasUi = (node) => {
       setPreviewUrl(previewUrl);
     };
 
+    const requestVisiblePreviewBatch = () => {
+      const names = collectPreviewBatchNames(
+        visibleOptions.map((entry) => entry.label),
+        loraPreviewCache,
+      );
+      if (names.length === 0) {
+        return;
+      }
+      // 取得中の名前も記録し、フィルター変更や開き直しで同じ名前を二重に要求しない
+      names.forEach((name) => loraPreviewCache.set(name, null));
+      // 一覧に見えている分のプレビューを 1 往復でまとめて取得しておく
+      void fetchLoraPreviewBatch(names).then((previews) => {
+        if (!previews) {
+          names.forEach((name) => loraPreviewCache.delete(name));
+          return;
+        }
+        previews.forEach((blob, name) => loraPreviewCache.set(name, blob));
+      });
+    };
+
     const updatePreviewByVisibleIndex = (visibleIndex) => {
       if (!Number.isFinite(visibleIndex)) {
         return;
@@ -3379,6 +3464,7 @@ const setupLoadLorasUi = (node) => {
       setWidgetValue(slot.toggleWidget, prevToggle);
       if (prevLabel !== nextLabel) {
         applySlotSelectionOnLoraChange(slot, nextLabel, targetNode);
+        void prefetchLora(nextLabel);
       }
       slot.__loadLorasLoraFilter = normalizeDialogFilterValue(
         filterInput.value,
@@ -3585,6 +3671,7 @@ const setupLoadLorasUi = (node) => {
         );
         return;
       }
+      requestVisiblePreviewBatch();
       const resolvedSelection = resolveFilteredSelection(
         visibleOptions,
         selectedOptionIndex,
@@ -4194,6 +4281,8 @@ const setupLoadLorasUi = (node) => {
     const originalOnExecuted = node.onExecuted;
     node.onExecuted = function (output) {
       const result = originalOnExecuted?.apply(this, arguments);
+      node.__loadLorasTimingText = formatLoraTimingSummary(output?.lora_timings);
+      markDirty(node);
       syncAutoLorasFromConnectedInput();
       return result;
     };
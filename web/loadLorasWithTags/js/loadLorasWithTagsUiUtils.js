@@ -1110,6 +1110,18 @@ const shouldBlurTagFilterOnKey = (event, isTextInput) => {
   return key === "ArrowUp" || key === "ArrowDown";
 };
 
+const formatLoraTimingSummary = (timings) => {
+  const entry = Array.isArray(timings) ? timings[timings.length - 1] : timings;
+  const total = Number(entry?.total_ms);
+  if (!Number.isFinite(total) || total <= 0) {
+    return "";
+  }
+  if (total >= 1000) {
+    return `${(total / 1000).toFixed(2)} s`;
+  }
+  return `${Math.round(total)} ms`;
+};
+
 const getStepDecimals = (step) => {
   if (!Number.isFinite(step)) {
     return 0;
@@ -1421,4 +1433,5 @@ export {
   shouldCloseStrengthPopupOnInnerClick,
   shouldToggleTagSelectionOnKey,
   shouldBlurTagFilterOnKey,
+  formatLoraTimingSummary,
 };
@@ -27,7 +27,15 @@ import {
   DEFAULT_CHECKPOINT_PREVIEW_ZOOM_SCALE,
   CHECKPOINT_FONT_SIZE_SETTING_ID,
   DEFAULT_CHECKPOINT_FONT_SIZE,
+  CHECKPOINT_CACHE_BUDGET_SETTING_ID,
+  DEFAULT_CHECKPOINT_CACHE_BUDGET_GB,
+  CHECKPOINT_PRELOAD_SETTING_ID,
+  DEFAULT_CHECKPOINT_PRELOAD,
 } from "../../checkpoint_selector/js/checkpointSelectorSettings.js";
+import {
+  BACKGROUND_HASHING_SETTING_ID,
+  DEFAULT_BACKGROUND_HASHING,
+} from "../../a1111_metadata_writer/js/a1111MetadataWriterSettings.js";
 
 const craftgearSettings = [
   {
@@ -96,6 +104,28 @@ const craftgearSettings = [
     },
     defaultValue: DEFAULT_CHECKPOINT_FONT_SIZE,
   },
+  {
+    id: CHECKPOINT_CACHE_BUDGET_SETTING_ID,
+    name: "Loaded checkpoint cache (GB)",
+    type: "number",
+    category: ["craftgear", "Checkpoint Selector", "Loaded checkpoint cache (GB)"],
+    attrs: {
+      min: 0,
+      step: 1,
+    },
+    defaultValue: DEFAULT_CHECKPOINT_CACHE_BUDGET_GB,
+  },
+  {
+    id: CHECKPOINT_PRELOAD_SETTING_ID,
+    name: "Preload recently used slot in background",
+    type: "boolean",
+    category: [
+      "craftgear",
+      "Checkpoint Selector",
+      "Preload recently used slot in background",
+    ],
+    defaultValue: DEFAULT_CHECKPOINT_PRELOAD,
+  },
   {
     id: LORA_STRENGTH_MIN_SETTING_ID,
     name: "LoRA strength minimum",
@@ -151,6 +181,17 @@ const craftgearSettings = [
     },
     defaultValue: tagToggleDefaultFontSize,
   },
+  {
+    id: BACKGROUND_HASHING_SETTING_ID,
+    name: "Hash new models in background",
+    type: "boolean",
+    category: [
+      "craftgear",
+      "A1111 Metadata Writer",
+      "Hash new models in background",
+    ],
+    defaultValue: DEFAULT_BACKGROUND_HASHING,
+  },
 ];
 
 export { craftgearSettings };